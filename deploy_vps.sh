@@ -90,10 +90,13 @@ mkdir -p static/css static/js static/images
 sudo chown -R 1000:1000 static staticfiles media 2>/dev/null || true
 sudo chmod -R 755 static staticfiles media
 
-# Create database file with proper permissions
-touch db.sqlite3
-sudo chown 1000:1000 db.sqlite3 2>/dev/null || true
-sudo chmod 644 db.sqlite3
+# Database directory, mounted whole so SQLite's -wal/-shm files persist
+mkdir -p data
+if [ -f db.sqlite3 ] && [ ! -e data/db.sqlite3 ]; then
+    mv db.sqlite3 data/db.sqlite3
+fi
+sudo chown -R 1000:1000 data 2>/dev/null || true
+sudo chmod 755 data
 
 # Clean up any existing containers
 print_status "Cleaning up existing containers..."
@@ -9,8 +9,22 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
+from django.views.static import serve
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drug_interaction.settings')
 
-application = get_asgi_application() 
\ No newline at end of file
+application = get_asgi_application()
+
+
+class StaticRootFilesHandler(ASGIStaticFilesHandler):
+    """Serve collected files from STATIC_ROOT (WhiteNoise only wraps WSGI)"""
+
+    def serve(self, request):
+        return serve(request, self.file_path(request.path), document_root=settings.STATIC_ROOT)
+
+
+if 'whitenoise.middleware.WhiteNoiseMiddleware' not in settings.MIDDLEWARE:
+    application = StaticRootFilesHandler(application)
@@ -82,6 +82,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Serve the home, search and stats views as async views
+# (drugs.async_views). Meant for ASGI deployments (gunicorn with uvicorn
+# workers, see the Dockerfile). WhiteNoise's middleware is sync-only and
+# would run every request through Django's single sync thread, so it is
+# dropped and drug_interaction.asgi serves STATIC_ROOT instead.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+if ASYNC_VIEWS:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'drug_interaction.urls'
 
 TEMPLATES = [
@@ -103,16 +112,67 @@ TEMPLATES = [
 WSGI_APPLICATION = 'drug_interaction.wsgi.application'
 
 # Database
-import os
-from decouple import config
+from decouple import Csv
+from django.core.exceptions import ImproperlyConfigured
 
-# Use SQLite for both development and production (simpler setup)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE selects the primary database: "sqlite" (default, simplest setup)
+# or "postgresql" (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT).
+# Connections are reused for DB_CONN_MAX_AGE seconds (0 reconnects on every
+# request); behind a transaction-pooling PgBouncer set DB_POOLER=True.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
+if DB_ENGINE == 'postgresql':
+    PRIMARY_DATABASE = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('DB_NAME', default='drug_interaction'),
+        'USER': config('DB_USER', default='postgres'),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default='localhost'),
+        'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # Server-side cursors do not survive transaction pooling
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_POOLER', default=False, cast=bool),
     }
-}
+elif DB_ENGINE == 'sqlite':
+    # drugs.backends.sqlite3 applies these PRAGMAs on every new connection;
+    # WAL lets readers proceed during admin writes. Its -wal/-shm files sit
+    # next to NAME, so containers must mount the directory, not the file
+    PRIMARY_DATABASE = {
+        'ENGINE': 'drugs.backends.sqlite3',
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+                'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),
+                'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+                'cache_size': config('SQLITE_CACHE_SIZE', default=-64 * 1024, cast=int),  # negative: KiB
+                'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),  # ms
+            },
+        },
+    }
+else:
+    raise ImproperlyConfigured(f'Unsupported DB_ENGINE: {DB_ENGINE!r} (use sqlite or postgresql)')
+
+DATABASES = {'default': PRIMARY_DATABASE}
+
+# Read replicas: "host[:port]" entries for PostgreSQL, database file paths
+# for SQLite (e.g. Litestream copies). drugs.routers sends the reads of the
+# public views to them; writes, the admin and imports use the primary.
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    if DB_ENGINE == 'postgresql':
+        host, _, port = replica.partition(':')
+        location = {'HOST': host, 'PORT': port or PRIMARY_DATABASE['PORT']}
+    else:
+        location = {'NAME': replica}
+    DATABASES[f'replica{index}'] = {**PRIMARY_DATABASE, **location, 'TEST': {'MIRROR': 'default'}}
+
+if len(DATABASES) > 1:
+    DATABASE_ROUTERS = ['drugs.routers.ReplicaRouter']
+    MIDDLEWARE.insert(0, 'drugs.middleware.ReplicaRoutingMiddleware')
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -160,6 +220,68 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Caches. "search" holds interaction search result ids (drugs.searchcache).
+# LocMemCache evicts least recently used entries past MAX_ENTRIES; for a
+# shared cache point SEARCH_CACHE_BACKEND at FileBasedCache or RedisCache
+# (Redis evicts by its own maxmemory-policy, e.g. allkeys-lru).
+SEARCH_CACHE_BACKEND = config('SEARCH_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': {
+        'BACKEND': SEARCH_CACHE_BACKEND,
+        'LOCATION': config('SEARCH_CACHE_LOCATION', default='search-results'),
+        'TIMEOUT': config('SEARCH_CACHE_TTL', default=600, cast=int),
+    },
+}
+if 'redis' not in SEARCH_CACHE_BACKEND:
+    CACHES['search']['OPTIONS'] = {
+        'MAX_ENTRIES': config('SEARCH_CACHE_MAX_ENTRIES', default=5000, cast=int),
+    }
+
+# Render list/search API responses from values() rows instead of model
+# instances (same JSON, much less per-row overhead)
+API_FAST_SERIALIZATION = config('API_FAST_SERIALIZATION', default=True, cast=bool)
+
+# Seconds the home page / API statistics snapshot is cached per worker
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=60, cast=int)
+
+# Per-request timing (drugs.perf): Server-Timing headers, JSON log lines on
+# the "drugs.perf" logger (PERF_LOG) and per-route percentiles of the last
+# PERF_BUFFER_SIZE requests at /api/_perf/ (staff only). When off, none of
+# the hooks are installed.
+PERF_INSTRUMENTATION = config('PERF_INSTRUMENTATION', default=False, cast=bool)
+PERF_LOG = config('PERF_LOG', default=True, cast=bool)
+PERF_BUFFER_SIZE = config('PERF_BUFFER_SIZE', default=1000, cast=int)
+if PERF_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'drugs.middleware.PerfMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'drugs.perf.TimedDjangoTemplates'
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'][0] = 'drugs.perf.TimedJSONRenderer'
+
+# Prometheus metrics at /metrics (drugs.metrics). PROMETHEUS_MULTIPROC_DIR
+# is a directory shared by the gunicorn workers and management commands, so
+# every scrape sees server-wide totals; gunicorn.conf.py empties it on start.
+# Only clients in METRICS_ALLOWED_IPS (addresses or networks, checked
+# against REMOTE_ADDR) may scrape; everyone else gets 403.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    # prometheus_client reads it from the environment when first imported
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'drugs.perf': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 CORS_ALLOWED_ORIGINS = [
@@ -5,9 +5,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from drugs import views as drug_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('drugs.api_urls')),
     path('', include('drugs.web_urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) 
\ No newline at end of file
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.METRICS_ENABLED:
+    # Where Prometheus scrapes by default
+    urlpatterns.insert(0, path('metrics', drug_views.prometheus_metrics, name='metrics'))
+ 
\ No newline at end of file
@@ -4,12 +4,28 @@ from unfold.admin import ModelAdmin
 from .models import Drug, DrugInteraction
 
 
+class WorstSeverityFilter(admin.SimpleListFilter):
+    """Lọc thuốc theo mức độ tương tác nặng nhất (Drug.risk_level)"""
+    title = 'Mức độ tương tác nặng nhất'
+    parameter_name = 'worst_severity'
+
+    def lookups(self, request, model_admin):
+        return [('none', 'Không có tương tác')] + DrugInteraction.SEVERITY_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value() == 'none':
+            return queryset.filter(risk_level=0)
+        if self.value() in DrugInteraction.RISK_LEVELS:
+            return queryset.filter(risk_level=DrugInteraction.RISK_LEVELS[self.value()])
+        return queryset
+
+
 @admin.register(Drug)
 class DrugAdmin(ModelAdmin):
-    list_display = ['id', 'ten_thuoc', 'phan_loai', 'nuoc_dk', 'sys_created_on', 'status_badge']
-    list_filter = ['phan_loai', 'nuoc_dk', 'sys_created_on']
-    search_fields = ['ten_thuoc', 'hoat_chat', 'id', 'nhom_thuoc']
-    readonly_fields = ['sys_created_on', 'sys_updated_on', 'sys_id']
+    list_display = ['id', 'ten_thuoc', 'phan_loai', 'nuoc_dk', 'sys_created_on', 'status_badge', 'interaction_count', 'risk_badge']
+    list_filter = ['phan_loai', 'nuoc_dk', 'sys_created_on', WorstSeverityFilter]
+    search_fields = ['ten_thuoc', 'hoat_chat', 'id', 'nhom_thuoc', 'ten_thuoc_norm', 'hoat_chat_norm']
+    readonly_fields = ['sys_created_on', 'sys_updated_on', 'sys_id'] + Drug.SUMMARY_FIELDS
     ordering = ['ten_thuoc']
     
     # Unfold specific configurations
@@ -20,6 +36,10 @@ class DrugAdmin(ModelAdmin):
         ('Thông tin cơ bản', {
             'fields': ('id', 'ten_thuoc', 'hoat_chat', 'phan_loai', 'nhom_thuoc', 'nuoc_dk')
         }),
+        ('Tóm tắt tương tác', {
+            'fields': ('interaction_count', 'contraindicated_count', 'major_count', 'moderate_count', 'minor_count', 'interactions_updated_at'),
+            'classes': ('collapse',)
+        }),
         ('Thông tin bổ sung', {
             'fields': ('source_data', 'source_pdf', 'meta_data'),
             'classes': ('collapse',)
@@ -37,6 +57,19 @@ class DrugAdmin(ModelAdmin):
         else:
             return format_html('<span class="badge bg-success">Không kê đơn</span>')
     status_badge.short_description = 'Phân loại'
+    
+    def risk_badge(self, obj):
+        """Hiển thị mức độ tương tác nặng nhất từ bảng tóm tắt"""
+        severity = obj.worst_severity
+        if severity is None:
+            return format_html('<span class="text-muted">—</span>')
+        return format_html(
+            '<span class="badge bg-{}">{}</span>',
+            DrugInteraction.SEVERITY_COLORS[severity],
+            DrugInteraction.SEVERITY_LABELS[severity],
+        )
+    risk_badge.short_description = 'Nặng nhất'
+    risk_badge.admin_order_field = 'risk_level'
 
 
 @admin.register(DrugInteraction)
@@ -46,6 +79,7 @@ class DrugInteractionAdmin(ModelAdmin):
     search_fields = ['drug1__ten_thuoc', 'drug2__ten_thuoc', 'mechanism', 'consequence', 'management']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    list_select_related = ['drug1', 'drug2']
     
     # Unfold specific configurations
     list_per_page = 15
@@ -64,6 +98,14 @@ class DrugInteractionAdmin(ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Chỉ tải các cột cần cho trang danh sách"""
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.with_drugs(fields=['severity', 'created_at'])
+        return queryset
+    
     def severity_badge(self, obj):
         """Hiển thị badge cho mức độ tương tác"""
         colors = {
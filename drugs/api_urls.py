@@ -1,9 +1,10 @@
+from django.conf import settings
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'drugs', views.DrugViewSet)
@@ -23,9 +24,13 @@ schema_view = get_schema_view(
     permission_classes=(permissions.AllowAny,),
 )
 
+# With ASYNC_VIEWS (ASGI deployments) statistics are served by an async view.
+# DRF views stay sync (authentication, throttling, renderers), so the
+# prescription check is always the viewset's action.
 urlpatterns = [
     path('', include(router.urls)),
-    path('stats/', views.api_stats, name='api_stats'),
+    path('stats/', (async_views if settings.ASYNC_VIEWS else views).api_stats, name='api_stats'),
+    path('_perf/', views.api_perf, name='api_perf'),
     
     # Swagger URLs
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
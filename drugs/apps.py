@@ -3,4 +3,11 @@ from django.apps import AppConfig
 
 class DrugsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'drugs' 
\ No newline at end of file
+    name = 'drugs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import perf
+        if perf.enabled():
+            from django.db.backends.signals import connection_created
+            connection_created.connect(perf.install_execute_wrapper)
@@ -0,0 +1,64 @@
+"""
+Async versions of the busiest views, served when ``settings.ASYNC_VIEWS``
+is on and the site runs under an ASGI server (see the Dockerfile).
+
+They return the same responses as their ``drugs.views`` counterparts but
+use the async ORM and cache APIs, so a single ASGI worker keeps serving
+other requests while a client is slow to send or receive. Database work
+itself still runs in Django's sync thread (as all async ORM calls do in
+Django 4.2); the gain is in concurrent connections, not query speed.
+"""
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from . import metrics, search, searchcache, stats
+from .conditional import adata_condition, astats_condition
+from .views import WEB_SEARCH_LIMIT, stats_payload, web_search_context, web_search_queryset
+
+
+@astats_condition
+async def home(request):
+    """Home page with search functionality and dynamic statistics"""
+    snapshot = await stats.aget_stats()
+
+    context = {
+        'total_drugs': snapshot['total_drugs'],
+        'total_interactions': snapshot['total_interactions'],
+        'severity_breakdown': snapshot['severity_breakdown'],
+    }
+    return render(request, 'drugs/home.html', context)
+
+
+@adata_condition
+async def search_interactions(request):
+    """Search for drug interactions"""
+    query = request.GET.get('q', '')
+    severity = request.GET.get('severity', '')
+
+    interactions = web_search_queryset()
+    metrics.record_severity(severity, 'filter')
+
+    cache_key = await searchcache.amake_key('web', page_size=WEB_SEARCH_LIMIT, q=query, severity=severity)
+    cached = await searchcache.aget(cache_key) if cache_key else None
+    if cached is not None:
+        ids = cached[0]
+        rows = await interactions.ain_bulk(ids)
+        results = [rows[pk] for pk in ids if pk in rows]
+    else:
+        if query:
+            interactions = await search.asearch_interactions(interactions, query, fuzzy=True)
+
+        if severity:
+            interactions = interactions.filter(severity=severity)
+
+        results = [interaction async for interaction in interactions[:WEB_SEARCH_LIMIT]]
+        if cache_key:
+            await searchcache.astore(cache_key, [interaction.id for interaction in results], len(results))
+
+    return render(request, 'drugs/search.html', web_search_context(results, query, severity))
+
+
+@astats_condition
+async def api_stats(request):
+    """API endpoint for getting application statistics"""
+    return JsonResponse(stats_payload(await stats.aget_stats()))
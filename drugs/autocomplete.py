@@ -0,0 +1,107 @@
+"""
+In-process prefix index for drug type-ahead.
+
+Each worker keeps sorted arrays of ``(normalized key, drug id)`` built
+from ``Drug.ten_thuoc_norm`` and ``Drug.hoat_chat_norm``. A lookup is a
+``bisect`` into each array followed by a short forward scan, so it never
+touches the database beyond the check of the drugs' ``DataVersion`` that
+decides when the index must be rebuilt (see ``drugs.workercache``).
+"""
+import bisect
+
+from .models import DataVersion, Drug
+from .text import normalize_text
+from .workercache import WorkerCache
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class PrefixIndex:
+    """
+    Sorted key arrays searched in order of preference: drug names, then
+    active ingredients, then later words of either ("amox" finds
+    "Viên nang amoxicillin").
+
+    The word tier holds ``(word, drug id, field, offset)`` entries rather
+    than the text from each word on, which would grow with the square of
+    the word count; the rest of the text is sliced from ``texts`` for the
+    few entries a multi-word prefix has to check.
+    """
+
+    def __init__(self, rows=(), version=0):
+        self.version = version
+        self.drugs = {}
+        self.texts = {}
+        names, ingredients, words = [], [], []
+        for drug_id, name, ingredient, name_norm, ingredient_norm in rows:
+            self.drugs[drug_id] = (name, ingredient)
+            self.texts[drug_id] = (name_norm, ingredient_norm)
+            if name_norm:
+                names.append((name_norm, drug_id))
+            if ingredient_norm:
+                ingredients.append((ingredient_norm, drug_id))
+            for field, text in enumerate((name_norm, ingredient_norm)):
+                offset = text.find(' ')
+                while offset != -1:
+                    end = text.find(' ', offset + 1)
+                    words.append((text[offset + 1:None if end == -1 else end], drug_id, field, offset + 1))
+                    offset = end
+        self.tiers = [sorted(names), sorted(ingredients)]
+        self.words = sorted(words)
+
+    @classmethod
+    def load(cls, version):
+        rows = Drug.objects.order_by().values_list(
+            'id', 'ten_thuoc', 'hoat_chat', 'ten_thuoc_norm', 'hoat_chat_norm'
+        ).iterator(chunk_size=5000)
+        return cls(rows, version)
+
+    def __len__(self):
+        return len(self.drugs)
+
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        """Return up to ``limit`` ``(id, name, ingredient)`` tuples"""
+        prefix = normalize_text(prefix)
+        if not prefix or limit < 1:
+            return []
+        found = {}
+        for keys in self.tiers:
+            position = bisect.bisect_left(keys, (prefix,))
+            while position < len(keys) and len(found) < limit:
+                key, drug_id = keys[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(drug_id, None)
+                position += 1
+            if len(found) >= limit:
+                break
+        else:
+            self._search_words(prefix, limit, found)
+        return [(drug_id,) + self.drugs[drug_id] for drug_id in found]
+
+    def _search_words(self, prefix, limit, found):
+        # A multi-word prefix must match its first word exactly and the
+        # text from there on; a single word only has to start a word
+        head, space, rest = prefix.partition(' ')
+        position = bisect.bisect_left(self.words, (head,))
+        while position < len(self.words) and len(found) < limit:
+            word, drug_id, field, offset = self.words[position]
+            if not (word == head if space else word.startswith(head)):
+                break
+            if not space or self.texts[drug_id][field].startswith(prefix, offset):
+                found.setdefault(drug_id, None)
+            position += 1
+
+
+_cache = WorkerCache('autocomplete', PrefixIndex.load, DataVersion.DRUGS)
+
+
+def get_index():
+    """Return this worker's index, rebuilding it if the drugs changed"""
+    return _cache.get()
+
+
+def clear():
+    """Drop the cached index (used after bulk writes in this process)"""
+    _cache.clear()
@@ -0,0 +1,45 @@
+"""
+SQLite backend that applies tuning PRAGMAs to every new connection.
+
+Configured through ``OPTIONS['pragmas']`` (see ``settings.DATABASES``),
+e.g. ``{'journal_mode': 'wal', 'synchronous': 'normal'}``. In WAL mode
+readers no longer wait for a writer's commit, ``synchronous=normal`` is
+safe with WAL (a power loss can only drop the last transactions, never
+corrupt the file), ``mmap_size`` serves reads from the page cache without
+copying, ``cache_size`` (negative: KiB) enlarges the per-connection page
+cache and ``busy_timeout`` (ms) makes writers wait for the lock instead of
+failing. Persistent connections (``CONN_MAX_AGE``) keep that cache warm.
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout', 'temp_store')
+
+_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas):
+    """``PRAGMA`` statements for a ``{name: value}`` mapping"""
+    statements = []
+    for name, value in pragmas.items():
+        if name not in PRAGMAS or not _VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(f'Unsupported SQLite pragma: {name} = {value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not an argument of sqlite3.connect()
+        self.pragmas = pragma_statements(params.pop('pragmas', {}))
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for statement in self.pragmas:
+            conn.execute(statement)
+        return conn
@@ -0,0 +1,11 @@
+"""
+Reproducible benchmarks on synthetic data.
+
+``dataset`` generates deterministic drug and interaction exports at a
+given scale (``manage.py generate_dataset``); ``suite`` imports one into a
+fresh test database and times the search, list, detail and statistics
+endpoints in process (``manage.py run_benchmarks``), writing JSON that
+can be compared with the run of another commit. ``http`` starts a local
+gunicorn and sends raw HTTP requests for the load testing commands
+(``benchmark_asgi``, ``load_test``).
+"""
@@ -0,0 +1,235 @@
+"""
+Deterministic synthetic DrugBank.vn-style exports.
+
+A ``Dataset`` is defined by its interaction count and a seed: the same
+pair always yields the same records, in the same order, on every machine,
+so benchmark runs on different commits load identical data. Records use
+the ``import_drugbank`` formats (drugs as CSV, interactions as JSON Lines).
+
+Drugs get Vietnamese registration data (brand name and strength, active
+ingredients, therapeutic group, country) and interactions Vietnamese
+mechanism, consequence and management text. A few popular drugs take
+part in many interactions, as in the real data, and severities follow
+``SEVERITY_WEIGHTS``.
+"""
+import csv
+import datetime
+import json
+import os
+import random
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# Interactions per drug on average
+INTERACTIONS_PER_DRUG = 5
+
+SEVERITY_WEIGHTS = {
+    'contraindicated': 5,
+    'major': 25,
+    'moderate': 50,
+    'minor': 20,
+}
+
+DRUG_COLUMNS = [
+    'id', 'ten_thuoc', 'hoat_chat', 'phan_loai', 'nhom_thuoc', 'nuoc_dk',
+    'source_data', 'sys_id', 'sys_created_on', 'sys_updated_on',
+]
+
+# Active ingredient -> therapeutic group
+INGREDIENTS = {
+    'Paracetamol': 'Thuốc giảm đau, hạ sốt',
+    'Ibuprofen': 'Thuốc chống viêm không steroid',
+    'Diclofenac': 'Thuốc chống viêm không steroid',
+    'Meloxicam': 'Thuốc chống viêm không steroid',
+    'Aspirin': 'Thuốc chống kết tập tiểu cầu',
+    'Clopidogrel': 'Thuốc chống kết tập tiểu cầu',
+    'Warfarin': 'Thuốc chống đông máu',
+    'Amoxicillin': 'Thuốc kháng sinh',
+    'Cefuroxim': 'Thuốc kháng sinh',
+    'Ceftriaxon': 'Thuốc kháng sinh',
+    'Azithromycin': 'Thuốc kháng sinh',
+    'Clarithromycin': 'Thuốc kháng sinh',
+    'Ciprofloxacin': 'Thuốc kháng sinh',
+    'Levofloxacin': 'Thuốc kháng sinh',
+    'Metronidazol': 'Thuốc kháng sinh',
+    'Rifampicin': 'Thuốc điều trị lao',
+    'Itraconazol': 'Thuốc kháng nấm',
+    'Fluconazol': 'Thuốc kháng nấm',
+    'Ketoconazol': 'Thuốc kháng nấm',
+    'Omeprazol': 'Thuốc điều trị loét dạ dày',
+    'Esomeprazol': 'Thuốc điều trị loét dạ dày',
+    'Metformin': 'Thuốc điều trị đái tháo đường',
+    'Gliclazid': 'Thuốc điều trị đái tháo đường',
+    'Amlodipin': 'Thuốc tim mạch',
+    'Losartan': 'Thuốc tim mạch',
+    'Bisoprolol': 'Thuốc tim mạch',
+    'Digoxin': 'Thuốc tim mạch',
+    'Amiodaron': 'Thuốc chống loạn nhịp',
+    'Simvastatin': 'Thuốc hạ lipid máu',
+    'Atorvastatin': 'Thuốc hạ lipid máu',
+    'Rosuvastatin': 'Thuốc hạ lipid máu',
+    'Carbamazepin': 'Thuốc chống động kinh',
+    'Phenytoin': 'Thuốc chống động kinh',
+    'Sertralin': 'Thuốc chống trầm cảm',
+    'Fluoxetin': 'Thuốc chống trầm cảm',
+    'Prednisolon': 'Thuốc corticoid',
+    'Dexamethason': 'Thuốc corticoid',
+    'Levothyroxin': 'Thuốc tuyến giáp',
+    'Loratadin': 'Thuốc kháng histamin',
+    'Cetirizin': 'Thuốc kháng histamin',
+}
+INGREDIENT_NAMES = list(INGREDIENTS)
+
+BRAND_PREFIXES = [
+    'Ha', 'Pa', 'Me', 'Do', 'Sa', 'Vi', 'Tra', 'Bi', 'Ce', 'Amo', 'Lo', 'Ni',
+    'Tana', 'Agi', 'Pyme', 'Bo', 'Mek', 'Glo', 'Da', 'Sta',
+]
+BRAND_SUFFIXES = [
+    'col', 'fen', 'pharm', 'xin', 'dol', 'zol', 'mycin', 'cef', 'tin', 'lax',
+    'pril', 'sartan', 'vas', 'met', 'cort', 'lor', 'gesic', 'fort',
+]
+STRENGTHS = ['50mg', '100mg', '250mg', '500mg', '850mg', '1g', '5mg', '10mg', '20mg', '40mg']
+FORMS = ['', ' viên nén', ' viên nang', ' bao phim', ' sủi', ' siro', ' tiêm']
+COUNTRIES = [
+    ('Việt Nam', 60), ('Ấn Độ', 12), ('Hàn Quốc', 8), ('Pháp', 5), ('Đức', 4),
+    ('Trung Quốc', 4), ('Hungary', 3), ('Thái Lan', 2), ('Ý', 2),
+]
+CLASSIFICATIONS = [('Thuốc kê đơn', 70), ('Thuốc không kê đơn', 30)]
+
+MECHANISMS = [
+    '{a} ức chế CYP3A4, làm tăng nồng độ {b} trong huyết tương',
+    '{a} cảm ứng CYP3A4, làm giảm nồng độ {b} trong huyết tương',
+    '{a} ức chế CYP2C9, làm giảm chuyển hóa {b}',
+    '{a} và {b} cùng kéo dài khoảng QT',
+    '{a} làm giảm hấp thu {b} qua đường tiêu hóa',
+    '{a} và {b} cùng gây độc tính trên thận',
+    'Hiệp đồng tác dụng chống đông giữa {a} và {b}',
+    '{a} cạnh tranh liên kết protein huyết tương với {b}',
+]
+CONSEQUENCES = [
+    'Tăng nguy cơ xuất huyết',
+    'Tăng nguy cơ loạn nhịp tim, xoắn đỉnh',
+    'Tăng nguy cơ tiêu cơ vân',
+    'Giảm hiệu quả điều trị',
+    'Tăng độc tính trên thận',
+    'Hạ đường huyết',
+    'Tăng nguy cơ hội chứng serotonin',
+    'Tăng tác dụng không mong muốn trên tiêu hóa',
+]
+MANAGEMENT = {
+    'contraindicated': 'Chống chỉ định phối hợp.',
+    'major': 'Tránh phối hợp. Nếu bắt buộc, theo dõi chặt chẽ lâm sàng và xét nghiệm.',
+    'moderate': 'Theo dõi lâm sàng, hiệu chỉnh liều {b} khi cần.',
+    'minor': 'Không cần hiệu chỉnh liều; theo dõi các dấu hiệu bất thường.',
+}
+
+CREATED_FROM = datetime.datetime(2019, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Dataset:
+    """``interactions`` interaction records among ``interactions / 5`` drugs"""
+
+    def __init__(self, interactions, seed=0):
+        if interactions < 1:
+            raise ValueError('interactions must be positive')
+        self.interaction_count = interactions
+        self.drug_count = max(interactions // INTERACTIONS_PER_DRUG, 20)
+        self.seed = seed
+
+    @classmethod
+    def for_scale(cls, scale, seed=0):
+        return cls(SCALES[scale], seed)
+
+    def drug_id(self, index):
+        return f'VN-{index // 1000:03d}-{index % 1000:03d}'
+
+    def ingredients(self, index):
+        """Active ingredients of drug ``index`` (one, sometimes two)"""
+        rng = random.Random(f'{self.seed}:ingredients:{index}')
+        first = rng.choice(INGREDIENT_NAMES)
+        if rng.random() < 0.15:
+            return [first, rng.choice([name for name in INGREDIENT_NAMES if name != first])]
+        return [first]
+
+    def drug(self, index):
+        rng = random.Random(f'{self.seed}:drug:{index}')
+        ingredients = self.ingredients(index)
+        name = (
+            f'{rng.choice(BRAND_PREFIXES)}{rng.choice(BRAND_SUFFIXES)} '
+            f'{rng.choice(STRENGTHS)}{rng.choice(FORMS)}'
+        )
+        created = CREATED_FROM + datetime.timedelta(minutes=rng.randrange(5 * 365 * 24 * 60))
+        updated = created + datetime.timedelta(days=rng.randrange(365))
+        drug_id = self.drug_id(index)
+        return {
+            'id': drug_id,
+            'ten_thuoc': name,
+            'hoat_chat': ' + '.join(ingredients),
+            'phan_loai': _weighted(rng, CLASSIFICATIONS),
+            'nhom_thuoc': INGREDIENTS[ingredients[0]],
+            'nuoc_dk': _weighted(rng, COUNTRIES),
+            'source_data': f'https://drugbank.vn/services/drugbank/api/public/thuoc?id={drug_id}',
+            'sys_id': f'{rng.getrandbits(128):032x}',
+            'sys_created_on': created.isoformat(),
+            'sys_updated_on': updated.isoformat(),
+        }
+
+    def drugs(self):
+        for index in range(self.drug_count):
+            yield self.drug(index)
+
+    def interactions(self):
+        """
+        Distinct unordered pairs; the first drug is drawn with a skew towards
+        low indices, so those act as widely prescribed "hub" drugs.
+        """
+        rng = random.Random(f'{self.seed}:interactions')
+        severities = list(SEVERITY_WEIGHTS.items())
+        count = self.drug_count
+        primary = [self.ingredients(index)[0] for index in range(count)]
+        seen = set()
+        produced = 0
+        while produced < self.interaction_count:
+            first = int(count * rng.random() ** 2)
+            second = rng.randrange(count)
+            if first == second:
+                continue
+            key = min(first, second) * count + max(first, second)
+            if key in seen:
+                continue
+            seen.add(key)
+            produced += 1
+            a, b = primary[first], primary[second]
+            severity = _weighted(rng, severities)
+            yield {
+                'drug1_id': self.drug_id(first),
+                'drug2_id': self.drug_id(second),
+                'mechanism': rng.choice(MECHANISMS).format(a=a, b=b),
+                'consequence': rng.choice(CONSEQUENCES),
+                'management': MANAGEMENT[severity].format(a=a, b=b),
+                'severity': severity,
+            }
+
+    def write(self, directory):
+        """Write ``drugs.csv`` and ``interactions.jsonl``; return both paths"""
+        os.makedirs(directory, exist_ok=True)
+        drugs_path = os.path.join(directory, 'drugs.csv')
+        interactions_path = os.path.join(directory, 'interactions.jsonl')
+        with open(drugs_path, 'w', encoding='utf-8', newline='') as handle:
+            writer = csv.DictWriter(handle, DRUG_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.drugs())
+        with open(interactions_path, 'w', encoding='utf-8') as handle:
+            for record in self.interactions():
+                handle.write(json.dumps(record, ensure_ascii=False))
+                handle.write('\n')
+        return drugs_path, interactions_path
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
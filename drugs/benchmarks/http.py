@@ -0,0 +1,93 @@
+"""
+Minimal HTTP load generation against a local gunicorn, shared by the
+``benchmark_asgi`` and ``load_test`` commands.
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+WSGI_APP = 'drug_interaction.wsgi:application'
+ASGI_APP = 'drug_interaction.asgi:application'
+
+
+class ServerError(Exception):
+    pass
+
+
+async def request(port, method, path, body, trickle=0.0):
+    """Send one HTTP/1.1 request and return the response status"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        head = f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+        if body is not None:
+            head += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+        data = head.encode() + b'\r\n' + (body or b'')
+        if trickle:
+            # A slow client: the request line now, the rest at the end
+            writer.write(data[:16])
+            await writer.drain()
+            await asyncio.sleep(trickle)
+            data = data[16:]
+        writer.write(data)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+def percentiles(latencies):
+    """p50, p95 and p99 in milliseconds (NaN with fewer than two samples)"""
+    if len(latencies) < 2:
+        return (float('nan'),) * 3
+    cuts = statistics.quantiles(latencies, n=100)
+    return tuple(cuts[index] * 1000 for index in (49, 94, 98))
+
+
+class Server:
+    """
+    A local gunicorn process running ``arguments`` (worker class options
+    and application) with ``env`` added to the environment
+    """
+
+    def __init__(self, name, arguments, env, workers):
+        self.name = name
+        self.arguments = arguments
+        self.env = env
+        self.workers = workers
+
+    def __enter__(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{self.port}',
+             '--workers', str(self.workers), '--log-level', 'warning', *self.arguments],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'DEBUG': 'False', **self.env},
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise ServerError(f'{self.name} server exited with status {self.process.returncode}')
+            try:
+                asyncio.run(request(self.port, 'GET', '/api/stats/', None))
+                return self.port
+            except (OSError, IndexError, ValueError):
+                time.sleep(0.2)
+        self.__exit__()
+        raise ServerError(f'{self.name} server did not start')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
@@ -0,0 +1,308 @@
+"""
+In-process endpoint benchmarks on a synthetic ``Dataset``.
+
+``run()`` creates a test database (a temporary file on SQLite, so the
+configured PRAGMAs apply), imports the dataset through ``drugs.importer``
+(timed: the import benchmark) and then times every case in ``CASES``
+through Django's test client. The search result and statistics caches
+are cleared before each call unless ``warm``; the per-worker indexes
+(interaction graph, trigram and prefix indexes) stay built, as in a
+running worker. Results are a JSON-serializable dict; ``compare()`` sets
+two of them side by side.
+"""
+import datetime
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from .. import importer, search, searchcache
+from ..models import Drug, DrugInteraction
+from ..views import WEB_SEARCH_LIMIT, web_search_queryset
+from .dataset import INGREDIENT_NAMES
+
+IMPORT_BATCH_SIZE = 1000
+
+# Pages requested by the list cases
+LIST_PAGES = 10
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def run(dataset, repeat=20, warm=False, cases=None, progress=None):
+    """Load ``dataset`` into a fresh test database and time the cases"""
+    progress = progress or (lambda message: None)
+    # Replica routing would send reads to the configured replicas, which do
+    # not have the test data
+    middleware = [name for name in settings.MIDDLEWARE if name != 'drugs.middleware.ReplicaRoutingMiddleware']
+    with tempfile.TemporaryDirectory() as directory:
+        # DEBUG off, as in production (it also logs every query)
+        setup_test_environment(debug=False)
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(MIDDLEWARE=middleware):
+                progress(f'Importing {dataset.interaction_count} interactions...')
+                imported = load(dataset, directory)
+                results = {}
+                for name in cases or CASES:
+                    progress(f'Running {name}...')
+                    results[name] = measure(CALLS[name](dataset, random.Random(f'{dataset.seed}:{name}')), repeat, warm)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+    return {
+        'meta': metadata(dataset, repeat, warm),
+        'import': imported,
+        'cases': results,
+    }
+
+
+def load(dataset, directory):
+    """Write the dataset's files and import them as ``import_drugbank`` does"""
+    drugs_path, interactions_path = dataset.write(directory)
+    timings = {'drugs': import_file(drugs_path, importer.build_drug, importer.write_drugs)}
+    known_drug_ids = importer.load_drug_ids()
+    timings['interactions'] = import_file(
+        interactions_path,
+        lambda record: importer.build_interaction(record, known_drug_ids),
+        importer.write_interactions,
+    )
+    started = time.perf_counter()
+    importer.finalize()
+    timings['finalize'] = {'seconds': round(time.perf_counter() - started, 3)}
+    return timings
+
+
+def import_file(path, build, write):
+    started = time.perf_counter()
+    written = 0
+    batch = []
+    for line_number, record in importer.read_records(path):
+        if isinstance(record, importer.ImportRowError):
+            raise BenchmarkError(f'{path}:{line_number}: {record}')
+        batch.append(build(record))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            written += write(batch)
+            batch = []
+    if batch:
+        written += write(batch)
+    elapsed = time.perf_counter() - started
+    return {'rows': written, 'seconds': round(elapsed, 3), 'rows_per_s': round(written / elapsed, 1)}
+
+
+def measure(calls, repeat, warm):
+    """
+    Time ``repeat`` calls, cycling through ``calls``, after one untimed
+    round that counts the queries of a call and builds the per-worker
+    indexes.
+    """
+    clear_caches()
+    # Every request empties the query log, which the capture slices: start
+    # from an empty log and count before the next request
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        calls[0]()
+    query_count = len(queries)
+    for call in calls[1:]:
+        call()
+    timings = []
+    for index in range(repeat):
+        if not warm:
+            clear_caches()
+        call = calls[index % len(calls)]
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        'calls': repeat,
+        'queries': query_count,
+        'mean_ms': _ms(statistics.fmean(timings)),
+        'p50_ms': _ms(statistics.median(timings)),
+        'p95_ms': _ms(timings[min(len(timings) - 1, int(len(timings) * 0.95))]),
+        'min_ms': _ms(timings[0]),
+        'max_ms': _ms(timings[-1]),
+    }
+
+
+def clear_caches():
+    caches[searchcache.CACHE_ALIAS].clear()
+    cache.clear()
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def metadata(dataset, repeat, warm):
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'interactions': dataset.interaction_count,
+        'drugs': dataset.drug_count,
+        'seed': dataset.seed,
+        'repeat': repeat,
+        'warm': warm,
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+    }
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """
+    Rows of ``(case, baseline p50, current p50, change)`` for the cases and
+    import steps in both results, and the names of those slower by more
+    than ``threshold`` (a fraction)
+    """
+    pairs = [
+        (name, baseline['cases'][name]['p50_ms'], result['p50_ms'])
+        for name, result in current['cases'].items() if name in baseline['cases']
+    ] + [
+        (f'import_{name}', baseline['import'][name]['seconds'] * 1000, result['seconds'] * 1000)
+        for name, result in current['import'].items() if name in baseline['import']
+    ]
+    rows, regressions = [], []
+    for name, before, after in pairs:
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+# Request builders: each returns the calls one case cycles through
+
+def _queries(dataset, rng, count=10):
+    """Search terms: ingredients, brand names and misspelled ingredients"""
+    terms = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            terms.append(rng.choice(INGREDIENT_NAMES))
+        elif kind == 1:
+            terms.append(dataset.drug(rng.randrange(dataset.drug_count))['ten_thuoc'].split()[0])
+        else:
+            word = rng.choice(INGREDIENT_NAMES)
+            cut = rng.randrange(1, len(word) - 1)
+            terms.append(word[:cut] + word[cut + 1:])
+    return terms
+
+
+def _get(client, url):
+    def call():
+        response = client.get(url)
+        if response.status_code != 200:
+            raise BenchmarkError(f'GET {url} returned {response.status_code}')
+    return call
+
+
+def _pages(rng, rows):
+    last = max(1, min(LIST_PAGES * 5, rows // 20))
+    return [rng.randint(1, last) for _ in range(LIST_PAGES)]
+
+
+def search_interactions_calls(dataset, rng):
+    def call(query):
+        return lambda: list(search.search_interactions(web_search_queryset(), query, fuzzy=True)[:WEB_SEARCH_LIMIT])
+    return [call(query) for query in _queries(dataset, rng)]
+
+
+def web_search_calls(dataset, rng):
+    client = Client()
+    return [_get(client, '/search/?' + urlencode({'q': query})) for query in _queries(dataset, rng)]
+
+
+def api_drugs_list_calls(dataset, rng):
+    client = Client()
+    return [_get(client, f'/api/drugs/?page={page}') for page in _pages(rng, dataset.drug_count)]
+
+
+def api_drugs_risk_calls(dataset, rng):
+    client = Client()
+    # Pages of the filtered list, which holds only some of the drugs
+    rows = Drug.objects.filter(risk_level__gte=DrugInteraction.RISK_LEVELS['major']).count()
+    return [
+        _get(client, f'/api/drugs/?ordering=risk&min_severity=major&page={page}')
+        for page in _pages(rng, rows)
+    ]
+
+
+def api_drugs_search_calls(dataset, rng):
+    client = Client()
+    return [_get(client, '/api/drugs/?' + urlencode({'q': query})) for query in _queries(dataset, rng)]
+
+
+def api_interactions_list_calls(dataset, rng):
+    client = Client()
+    return [
+        _get(client, f'/api/interactions/?page={page}')
+        for page in _pages(rng, dataset.interaction_count)
+    ]
+
+
+def api_interactions_search_calls(dataset, rng):
+    client = Client()
+    return [
+        _get(client, '/api/interactions/search/?' + urlencode({'query': query}))
+        for query in _queries(dataset, rng)
+    ]
+
+
+def drug_detail_calls(dataset, rng):
+    client = Client()
+    return [
+        _get(client, f'/drug/{dataset.drug_id(rng.randrange(dataset.drug_count))}/')
+        for _ in range(10)
+    ]
+
+
+def drug_detail_hub_calls(dataset, rng):
+    # The drug with the most interactions
+    return [_get(Client(), f'/drug/{dataset.drug_id(0)}/')]
+
+
+def api_stats_calls(dataset, rng):
+    return [_get(Client(), '/api/stats/')]
+
+
+CALLS = {
+    'search_interactions': search_interactions_calls,
+    'web_search': web_search_calls,
+    'api_drugs_list': api_drugs_list_calls,
+    'api_drugs_risk': api_drugs_risk_calls,
+    'api_drugs_search': api_drugs_search_calls,
+    'api_interactions_list': api_interactions_list_calls,
+    'api_interactions_search': api_interactions_search_calls,
+    'drug_detail': drug_detail_calls,
+    'drug_detail_hub': drug_detail_hub_calls,
+    'api_stats': api_stats_calls,
+}
+CASES = list(CALLS)
@@ -0,0 +1,145 @@
+"""
+Validators for conditional GET (ETag / Last-Modified).
+
+Django's ``condition`` decorator calls these before the view runs and
+answers ``304 Not Modified`` when the client's copy is current, so an
+unchanged resource costs one small query (or a cache hit for the
+statistics) and no rendering or serialization.
+
+* Interaction detail: the page also shows both drugs, whose admin edits
+  do not touch the interaction (nor ``sys_updated_on``, which comes from
+  the source data). The ETag combines the interaction's ``updated_at``
+  with the global ``DataVersion`` and ``Last-Modified`` is the time of the
+  last ``DataVersion`` bump, which every drug or interaction write moves.
+* Statistics: derived from the cached snapshot.
+* Lists, searches and drug pages: the ``DataVersion`` alone (ETag only).
+
+ETags also cover the query string and ``Accept`` header, which select the
+fields and renderer of the same resource.
+
+Django 4.2's ``condition`` only wraps sync views; ``async_condition`` is
+the same logic for the views in ``drugs.async_views``, with async
+validators.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from django.db.models import Subquery
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from . import stats
+from .models import DataVersion, DrugInteraction
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def _representation(request):
+    return request.get_full_path(), request.META.get('HTTP_ACCEPT', '')
+
+
+def _cached(request, key, compute):
+    """Compute once per request; etag_func and last_modified_func share it"""
+    cache = request.__dict__.setdefault('_conditional', {})
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _interaction_validators(request, interaction_id):
+    def compute():
+        data = DataVersion.objects.filter(key=DataVersion.DATA)
+        row = DrugInteraction.objects.filter(id=interaction_id).annotate(
+            data_version=Subquery(data.values('version')[:1]),
+            data_updated_at=Subquery(data.values('updated_at')[:1]),
+        ).values_list('updated_at', 'data_version', 'data_updated_at').first()
+        if row is None:
+            # Let the view answer 404
+            return None, None
+        updated_at, data_version, data_updated_at = row
+        etag = _etag(interaction_id, updated_at.isoformat(), data_version or 0, *_representation(request))
+        return etag, max(updated_at, data_updated_at or updated_at)
+    return _cached(request, ('interaction', interaction_id), compute)
+
+
+def interaction_etag(request, interaction_id=None, pk=None, **kwargs):
+    return _interaction_validators(request, interaction_id or pk)[0]
+
+
+def interaction_last_modified(request, interaction_id=None, pk=None, **kwargs):
+    return _interaction_validators(request, interaction_id or pk)[1]
+
+
+def stats_etag(request, *args, **kwargs):
+    return _stats_etag(stats.get_stats())
+
+
+def _stats_etag(snapshot):
+    return _etag(
+        snapshot['total_drugs'], snapshot['total_interactions'],
+        sorted(snapshot['severity_breakdown'].items()), snapshot['last_updated'],
+    )
+
+
+def stats_last_modified(request, *args, **kwargs):
+    return stats.get_stats()['last_updated']
+
+
+def data_version_etag(request, *args, **kwargs):
+    return _cached(
+        request, 'data_version',
+        lambda: _etag(DataVersion.current(), *_representation(request)),
+    )
+
+
+async def astats_etag(request, *args, **kwargs):
+    return _stats_etag(await stats.aget_stats())
+
+
+async def astats_last_modified(request, *args, **kwargs):
+    return (await stats.aget_stats())['last_updated']
+
+
+async def adata_version_etag(request, *args, **kwargs):
+    return _etag(await DataVersion.acurrent(), *_representation(request))
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """``django.views.decorators.http.condition`` for async views"""
+    def decorator(func):
+        @wraps(func)
+        async def inner(request, *args, **kwargs):
+            res_etag = await etag_func(request, *args, **kwargs) if etag_func else None
+            res_etag = quote_etag(res_etag) if res_etag is not None else None
+            res_last_modified = None
+            if last_modified_func:
+                dt = await last_modified_func(request, *args, **kwargs)
+                if dt:
+                    if not timezone.is_aware(dt):
+                        dt = timezone.make_aware(dt, datetime.timezone.utc)
+                    res_last_modified = int(dt.timestamp())
+
+            response = get_conditional_response(request, etag=res_etag, last_modified=res_last_modified)
+            if response is None:
+                response = await func(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD'):
+                if res_last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(res_last_modified)
+                if res_etag:
+                    response.headers.setdefault('ETag', res_etag)
+            return response
+        return inner
+    return decorator
+
+
+interaction_condition = condition(etag_func=interaction_etag, last_modified_func=interaction_last_modified)
+stats_condition = condition(etag_func=stats_etag, last_modified_func=stats_last_modified)
+data_condition = condition(etag_func=data_version_etag)
+astats_condition = async_condition(etag_func=astats_etag, last_modified_func=astats_last_modified)
+adata_condition = async_condition(etag_func=adata_version_etag)
@@ -0,0 +1,160 @@
+"""
+Streaming NDJSON/CSV export of the full drug and interaction tables.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` and encoded as
+they are produced, so memory use does not depend on table size. Output
+can be gzip-compressed on the fly.
+
+``?since=`` keeps rows whose ``updated_at`` (moved by every write) is at
+or after the given time; ``?deleted=true`` exports the ``Deletion``
+tombstones recorded since then instead, so a client can mirror both.
+"""
+import csv
+import datetime
+import json
+import zlib
+
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+
+from .models import Deletion, Drug, DrugInteraction
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+CHUNK_SIZE = 2000
+# Flush encoded output in pieces of roughly this many bytes
+BUFFER_SIZE = 64 * 1024
+
+DRUG_COLUMNS = [
+    field.name for field in Drug._meta.concrete_fields
+    if field.name not in Drug.NORMALIZED_FIELDS.values() and field.name not in Drug.SUMMARY_FIELDS
+]
+INTERACTION_COLUMNS = [
+    ('id', 'id'),
+    ('drug1_id', 'drug1_id'),
+    ('drug1_name', 'drug1__ten_thuoc'),
+    ('drug2_id', 'drug2_id'),
+    ('drug2_name', 'drug2__ten_thuoc'),
+    ('severity', 'severity'),
+    ('mechanism', 'mechanism'),
+    ('consequence', 'consequence'),
+    ('management', 'management'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+def parse_since(value):
+    """Parse ``?since=`` as an ISO datetime or date; raises ValueError"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid since value: {value!r}')
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+    return parsed
+
+
+DELETION_COLUMNS = ['id', 'deleted_at']
+
+
+def drug_rows(since=None):
+    queryset = Drug.objects.order_by('updated_at', 'id')
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return DRUG_COLUMNS, queryset.values_list(*DRUG_COLUMNS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def interaction_rows(since=None):
+    queryset = DrugInteraction.objects.order_by('updated_at', 'id')
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    names = [name for name, lookup in INTERACTION_COLUMNS]
+    lookups = [lookup for name, lookup in INTERACTION_COLUMNS]
+    return names, queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def deletion_rows(model, since=None):
+    """Ids of deleted ``model`` rows, oldest deletion first"""
+    queryset = Deletion.objects.filter(model=model._meta.model_name).order_by('deleted_at', 'id')
+    if since is not None:
+        queryset = queryset.filter(deleted_at__gte=since)
+    return DELETION_COLUMNS, queryset.values_list('object_id', 'deleted_at').iterator(chunk_size=CHUNK_SIZE)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+class _LineBuffer:
+    """File-like target for csv.writer that just returns the line"""
+
+    def write(self, value):
+        return value
+
+
+def encode_ndjson(columns, rows):
+    for row in rows:
+        record = dict(zip(columns, map(_encode_value, row)))
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def encode_csv(columns, rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_encode_value(value) for value in row])
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Join small text pieces into UTF-8 chunks of about ``size`` bytes"""
+    pending, length = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        pending.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(pending)
+            pending, length = [], 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def streaming_response(request, name, columns, rows, fmt='ndjson'):
+    """
+    Build a StreamingHttpResponse for ``rows`` in the requested format,
+    gzip-encoded when the client sends ``Accept-Encoding: gzip``.
+    """
+    encode = encode_csv if fmt == 'csv' else encode_ndjson
+    chunks = buffered(encode(columns, rows))
+    compress = accepts_gzip(request)
+    if compress:
+        chunks = gzipped(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{name}.{fmt}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    response['Vary'] = 'Accept-Encoding'
+    return response
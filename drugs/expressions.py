@@ -0,0 +1,20 @@
+"""
+Database expressions shared by models and migrations.
+"""
+from django.db.models.functions import Collate
+
+
+class BinaryCollate(Collate):
+    """
+    ``expression`` compared byte-wise, i.e. by code point like Python
+    compares ``str``, whatever the database's default collation
+    """
+    collations = {'sqlite': 'BINARY', 'postgresql': 'C'}
+
+    def __init__(self, expression):
+        super().__init__(expression, 'C')
+
+    def as_sql(self, compiler, connection, **extra_context):
+        collation = self.collations.get(connection.vendor, self.collation)
+        extra_context.setdefault('collation', connection.ops.quote_name(collation))
+        return super().as_sql(compiler, connection, **extra_context)
@@ -0,0 +1,164 @@
+"""
+Fast-path serialization for the hot list endpoints.
+
+``ModelSerializer.to_representation`` walks every field of every row
+through DRF's attribute lookup and ``to_representation`` calls. For list
+and search responses we instead compile a ``ValuesPlan`` from the
+serializer once per request (respecting ``?fields=``), fetch plain dicts
+with ``QuerySet.values()`` and convert only the fields that need it:
+
+* plain strings and numbers are copied as-is;
+* values computed from a column (``severity_display``) come from
+  ``Meta.value_fields`` lookup tables;
+* UTC datetimes are formatted directly in DRF's ISO 8601 style;
+* anything else goes through the DRF field's own ``to_representation``
+  so the output stays identical.
+
+``manage.py benchmark_serializers`` compares both paths and checks that
+they produce the same JSON.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Page
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from . import perf, searchcache
+
+# DRF fields whose to_representation() leaves values() output unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesPlan:
+    """
+    Output names, ``values()`` lookups and converters for one serializer
+    field selection.
+    """
+
+    def __init__(self, serializer, queryset):
+        model = serializer.Meta.model
+        overrides = getattr(serializer.Meta, 'value_fields', {})
+        annotations = queryset.query.annotations
+        self.names, self.lookups, self.converters = [], [], []
+        for name, field in serializer.fields.items():
+            if name in overrides:
+                lookup, convert = overrides[name]
+            else:
+                lookup = field.source.replace('.', '__')
+                convert = _converter(field)
+                if lookup not in annotations and not _is_model_path(model, lookup):
+                    # Attribute absent on these rows (e.g. an annotation only
+                    # fuzzy search adds): DRF skips such read-only fields too
+                    continue
+            self.names.append(name)
+            self.lookups.append(lookup)
+            self.converters.append(convert)
+
+    def values(self, queryset, extra=()):
+        """``queryset.values()`` with the plan's lookups plus ``extra``"""
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def render(self, rows):
+        """Turn ``values()`` dicts into output dicts"""
+        columns = list(zip(self.names, self.lookups, self.converters))
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert in columns:
+                value = row[lookup]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+
+def _converter(field):
+    """Cheapest function producing ``field.to_representation(value)``"""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        # Same timezone resolution as DateTimeField.enforce_timezone()
+        zone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format == ISO_8601 and getattr(zone, 'key', None) == 'UTC':
+            return _utc_isoformat
+    return field.to_representation
+
+
+def _utc_isoformat(value):
+    """DRF's ISO 8601 output for a datetime rendered in UTC"""
+    if value.utcoffset():
+        value = value.astimezone(datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _is_model_path(model, lookup):
+    for part in lookup.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        model = field.related_model
+    return True
+
+
+class FastListMixin:
+    """
+    Viewset mixin rendering ``list`` (and actions that call
+    ``list_response``) from ``values()`` rows instead of model instances.
+
+    Set ``API_FAST_SERIALIZATION = False`` to fall back to the serializer.
+    """
+
+    def use_fast_serialization(self):
+        return getattr(settings, 'API_FAST_SERIALIZATION', True)
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset, cache_key=None):
+        """
+        Paginated response for ``queryset``. With ``cache_key`` the page's
+        ids and total count are stored in ``drugs.searchcache``.
+        """
+        if not self.use_fast_serialization():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                self._store_page(cache_key, page)
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        plan = ValuesPlan(self.get_serializer(), queryset)
+        # Keyset pagination reads its ordering keys from each row
+        ordering = [field.lstrip('-') for field in getattr(self, 'keyset_ordering', None) or ()]
+        rows = plan.values(queryset, extra=ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            self._store_page(cache_key, page)
+            with perf.timed('serialize'):
+                data = plan.render(page)
+            return self.get_paginated_response(data)
+        rows = list(rows)
+        with perf.timed('serialize'):
+            data = plan.render(rows)
+        return Response(data)
+
+    def _store_page(self, cache_key, page):
+        django_page = getattr(self.paginator, 'page', None)
+        if cache_key and isinstance(django_page, Page):
+            offset = max(django_page.start_index() - 1, 0)
+            searchcache.store(cache_key, map(searchcache.row_id, page), django_page.paginator.count, offset)
@@ -0,0 +1,104 @@
+"""
+Typo-tolerant drug lookup over an in-process trigram index.
+
+Every normalized drug name and active ingredient, and each of their
+words, is split into padded trigrams the way PostgreSQL's ``pg_trgm``
+does, and an inverted index maps each trigram to the terms containing
+it. A query only reads the posting lists of its own trigrams to count
+shared trigrams per term, and scores those candidates with trigram
+Jaccard similarity; terms without a shared trigram are never looked at.
+The index is rebuilt when a drug changes (``drugs.workercache``).
+"""
+import heapq
+from collections import Counter
+
+from .models import DataVersion, Drug
+from .text import normalize_text
+from .workercache import WorkerCache
+
+# Minimum similarity for a match (pg_trgm's default)
+THRESHOLD = 0.3
+DEFAULT_LIMIT = 20
+MIN_WORD_LENGTH = 3
+
+
+def trigrams(text):
+    """Padded trigrams of every word: "abc" -> {"  a", " ab", "abc", "bc "}"""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self, rows=(), version=0):
+        self.version = version
+        self.terms = []
+        self.term_drugs = []
+        self.sizes = []
+        self.postings = {}
+        positions = {}
+        for drug_id, *texts in rows:
+            for text in texts:
+                if not text:
+                    continue
+                words = [word for word in text.split() if len(word) >= MIN_WORD_LENGTH]
+                for term in dict.fromkeys([text] + words):
+                    position = positions.get(term)
+                    if position is None:
+                        position = positions[term] = len(self.terms)
+                        self.terms.append(term)
+                        self.term_drugs.append([])
+                        grams = trigrams(term)
+                        self.sizes.append(len(grams))
+                        for gram in grams:
+                            self.postings.setdefault(gram, []).append(position)
+                    drugs = self.term_drugs[position]
+                    if not drugs or drugs[-1] != drug_id:
+                        drugs.append(drug_id)
+
+    @classmethod
+    def load(cls, version):
+        rows = Drug.objects.order_by().values_list(
+            'id', 'ten_thuoc_norm', 'hoat_chat_norm'
+        ).iterator(chunk_size=5000)
+        return cls(rows, version)
+
+    def search(self, query, limit=DEFAULT_LIMIT, threshold=THRESHOLD):
+        """Return up to ``limit`` ``(drug id, similarity)`` pairs, best first"""
+        grams = trigrams(normalize_text(query))
+        if not grams:
+            return []
+        # Shared trigram counts for every term that has any (Counter.update
+        # runs in C, so this is proportional to the posting list lengths)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        # similarity >= t needs at least t * |Q| shared trigrams
+        needed = threshold * len(grams)
+        scores = {}
+        for position, count in shared.items():
+            if count < needed:
+                continue
+            score = count / (len(grams) + self.sizes[position] - count)
+            if score < threshold:
+                continue
+            for drug_id in self.term_drugs[position]:
+                if score > scores.get(drug_id, 0.0):
+                    scores[drug_id] = score
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(drug_id, round(score, 4)) for drug_id, score in ranked]
+
+
+_cache = WorkerCache('fuzzy', TrigramIndex.load, DataVersion.DRUGS)
+
+
+def get_index():
+    """Return this worker's index, rebuilding it if the drugs changed"""
+    return _cache.get()
+
+
+def clear():
+    """Drop the cached index (used after bulk writes in this process)"""
+    _cache.clear()
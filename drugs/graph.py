@@ -0,0 +1,70 @@
+"""
+In-process interaction graph.
+
+Each worker keeps an adjacency map ``drug id -> {neighbour id: Edge}``
+built lazily from ``DrugInteraction``. The map is tagged with the
+``DataVersion`` it was built from; a cheap primary-key read of that
+counter on access tells the worker whether it must rebuild. Signal
+handlers in ``drugs.signals`` bump the counter on every change.
+"""
+from collections import namedtuple
+
+from .models import DrugInteraction
+from .workercache import WorkerCache
+
+Edge = namedtuple('Edge', ['id', 'drug1_id', 'drug2_id', 'severity'])
+
+
+class InteractionGraph:
+    def __init__(self, edges=(), version=0):
+        self.version = version
+        self.adjacency = {}
+        for edge in edges:
+            self.adjacency.setdefault(edge.drug1_id, {})[edge.drug2_id] = edge
+            self.adjacency.setdefault(edge.drug2_id, {})[edge.drug1_id] = edge
+
+    @classmethod
+    def load(cls, version):
+        edges = (
+            Edge(*row) for row in DrugInteraction.objects.order_by().values_list(
+                'id', 'drug1_id', 'drug2_id', 'severity'
+            ).iterator(chunk_size=5000)
+        )
+        return cls(edges, version)
+
+    def neighbours(self, drug_id):
+        """Return ``{neighbour id: Edge}`` for a drug"""
+        return self.adjacency.get(drug_id, {})
+
+    def edges_for(self, drug_id):
+        return list(self.neighbours(drug_id).values())
+
+    def edge(self, drug_a, drug_b):
+        return self.neighbours(drug_a).get(drug_b)
+
+    def edges_among(self, drug_ids):
+        """Return every edge whose two drugs are both in ``drug_ids``"""
+        drug_ids = list(dict.fromkeys(drug_ids))
+        edges = []
+        for index, drug_a in enumerate(drug_ids):
+            neighbours = self.neighbours(drug_a)
+            if not neighbours:
+                continue
+            for drug_b in drug_ids[index + 1:]:
+                edge = neighbours.get(drug_b)
+                if edge is not None:
+                    edges.append(edge)
+        return edges
+
+
+_cache = WorkerCache('graph', InteractionGraph.load)
+
+
+def get_graph():
+    """Return this worker's graph, rebuilding it if the data changed"""
+    return _cache.get()
+
+
+def clear():
+    """Drop the cached graph (used after bulk writes in this process)"""
+    _cache.clear()
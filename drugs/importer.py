@@ -0,0 +1,375 @@
+"""
+Streaming import of DrugBank.vn drug and interaction exports.
+
+Input is CSV or JSON Lines (optionally gzip-compressed) and is read one
+record at a time, validated into unsaved model instances and written in
+batches with ``bulk_create(update_conflicts=True)``, so re-running an
+import updates existing rows instead of failing or duplicating them. An
+update only overwrites the columns the record carries; missing columns and
+blank timestamps keep their stored values.
+
+Large uncompressed files can also be split into line-aligned byte-range
+shards (``shard_file``) that worker processes parse with ``parse_shard``
+while a single writer applies the batches and records a ``Checkpoint``
+after each shard, so an interrupted import resumes where it stopped.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import autocomplete, fuzzy, graph, metrics, search, stats, summaries
+from .models import DataVersion, Drug, DrugInteraction
+
+FORMATS = ('csv', 'jsonl')
+
+DRUG_FIELDS = [
+    field.name for field in Drug._meta.concrete_fields if field.editable
+]
+DRUG_DATETIME_FIELDS = ['sys_created_on', 'sys_updated_on']
+
+INTERACTION_TEXT_FIELDS = ['mechanism', 'consequence', 'management']
+SEVERITIES = {value for value, label in DrugInteraction.SEVERITY_CHOICES}
+
+
+class ImportRowError(ValueError):
+    """A record that cannot be imported"""
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson', 'json'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    raise ValueError(f'Cannot detect format of {path}; pass --format')
+
+
+def open_text(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def parse_line(line, fmt, header=None):
+    """Parse one physical line of input into a record dict"""
+    if fmt == 'jsonl':
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise ImportRowError(f'invalid JSON: {exc}')
+        if not isinstance(record, dict):
+            raise ImportRowError('expected a JSON object')
+        return record
+    try:
+        values = next(csv.reader([line]))
+    except (csv.Error, StopIteration) as exc:
+        raise ImportRowError(f'invalid CSV line: {exc}')
+    if len(values) != len(header):
+        raise ImportRowError(f'expected {len(header)} columns, got {len(values)}')
+    return dict(zip(header, values))
+
+
+def read_records(path, fmt=None):
+    """
+    Yield ``(line_number, record)`` for every record in ``path``.
+
+    Malformed records are yielded as ``(line_number, ImportRowError)`` so
+    the caller can count and report them without stopping the import.
+    """
+    fmt = fmt or detect_format(path)
+    with open_text(path) as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for record in reader:
+                if None in record:
+                    yield reader.line_num, ImportRowError('too many columns')
+                else:
+                    yield reader.line_num, record
+            return
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, parse_line(line, fmt)
+            except ImportRowError as exc:
+                yield line_number, exc
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _parse_datetime(value, field):
+    value = _clean(value)
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ImportRowError(f'invalid datetime for {field}: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+    return parsed
+
+
+def _present(record, names, optional=()):
+    """
+    The ``names`` a record carries, which are the only columns a re-import
+    overwrites; blank ``optional`` values (defaulted on insert) are absent
+    """
+    return [
+        name for name in names
+        if name in record and (name not in optional or _clean(record[name]))
+    ]
+
+
+def build_drug(record):
+    """Validate a record and return an unsaved ``Drug``"""
+    data = {}
+    for name in DRUG_FIELDS:
+        if name in DRUG_DATETIME_FIELDS:
+            data[name] = _parse_datetime(record.get(name), name)
+        else:
+            data[name] = _clean(record.get(name))
+    if not data['id']:
+        raise ImportRowError('missing drug id')
+    if not data['ten_thuoc']:
+        raise ImportRowError(f"drug {data['id']} has no ten_thuoc")
+    for name in DRUG_FIELDS:
+        max_length = Drug._meta.get_field(name).max_length
+        if max_length and isinstance(data[name], str) and len(data[name]) > max_length:
+            raise ImportRowError(f'{name} longer than {max_length} characters')
+    drug = Drug(**data)
+    drug.update_normalized_fields()
+    present = _present(record, [name for name in DRUG_FIELDS if name != 'id'], DRUG_DATETIME_FIELDS)
+    drug._update_fields = tuple(present + [
+        Drug.NORMALIZED_FIELDS[name] for name in present if name in Drug.NORMALIZED_FIELDS
+    ] + ['updated_at'])
+    return drug
+
+
+def build_interaction(record, known_drug_ids):
+    """Validate a record and return an unsaved ``DrugInteraction``"""
+    drug1_id = _clean(record.get('drug1_id') or record.get('drug1'))
+    drug2_id = _clean(record.get('drug2_id') or record.get('drug2'))
+    if not drug1_id or not drug2_id:
+        raise ImportRowError('missing drug1_id/drug2_id')
+    if drug1_id == drug2_id:
+        raise ImportRowError(f'drug {drug1_id} cannot interact with itself')
+    for drug_id in (drug1_id, drug2_id):
+        if drug_id not in known_drug_ids:
+            raise ImportRowError(f'unknown drug id {drug_id}')
+    severity = _clean(record.get('severity')) or 'moderate'
+    if severity not in SEVERITIES:
+        raise ImportRowError(f'invalid severity {severity!r}')
+    data = {name: _clean(record.get(name)) for name in INTERACTION_TEXT_FIELDS}
+    interaction = DrugInteraction(drug1_id=drug1_id, drug2_id=drug2_id, severity=severity, **data)
+    # bulk_create() skips save(), so store the pair in canonical order here
+    interaction.canonicalize()
+    interaction._update_fields = tuple(
+        _present(record, INTERACTION_TEXT_FIELDS + ['severity'], ['severity']) + ['updated_at']
+    )
+    return interaction
+
+
+def _by_update_fields(objects):
+    """Group a batch by the columns each object may overwrite"""
+    groups = defaultdict(list)
+    for obj in objects:
+        groups[obj._update_fields].append(obj)
+    return groups.items()
+
+
+def write_drugs(drugs):
+    """Upsert a batch of drugs keyed on ``Drug.id``"""
+    drugs = list({drug.id: drug for drug in drugs}.values())
+    now = timezone.now()
+    for drug in drugs:
+        drug.updated_at = now
+    with metrics.IMPORT_BATCH_SECONDS.labels('drugs').time(), transaction.atomic():
+        for update_fields, group in _by_update_fields(drugs):
+            Drug.objects.bulk_create(
+                group,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=update_fields,
+            )
+    metrics.record_import('drugs', 'written', len(drugs))
+    return len(drugs)
+
+
+def write_interactions(interactions):
+    """Upsert a batch of interactions keyed on the (drug1, drug2) pair"""
+    interactions = list({
+        (interaction.drug1_id, interaction.drug2_id): interaction for interaction in interactions
+    }.values())
+    now = timezone.now()
+    for interaction in interactions:
+        interaction.created_at = interaction.updated_at = now
+    with metrics.IMPORT_BATCH_SECONDS.labels('interactions').time(), transaction.atomic():
+        for update_fields, group in _by_update_fields(interactions):
+            DrugInteraction.objects.bulk_create(
+                group,
+                update_conflicts=True,
+                unique_fields=['drug1', 'drug2'],
+                update_fields=update_fields,
+            )
+    metrics.record_import('interactions', 'written', len(interactions))
+    return len(interactions)
+
+
+def load_drug_ids():
+    return set(Drug.objects.order_by().values_list('id', flat=True).iterator(chunk_size=10000))
+
+
+def finalize():
+    """
+    Bring derived data up to date after bulk writes, which bypass the
+    model signals: search indexes, statistics, per-drug interaction
+    summaries and cache version.
+    """
+    search.rebuild_index()
+    search.rebuild_drug_words()
+    stats.rebuild_counters()
+    summaries.rebuild()
+    DataVersion.bump()
+    DataVersion.bump(DataVersion.DRUGS)
+    graph.clear()
+    autocomplete.clear()
+    fuzzy.clear()
+
+
+def read_csv_header(path):
+    """Return ``(columns, byte offset of the first data line)``"""
+    with open(path, 'rb') as handle:
+        first = handle.readline()
+    header = next(csv.reader([first.decode('utf-8-sig')]))
+    return [column.strip() for column in header], len(first)
+
+
+def shard_file(path, shard_size, start=0):
+    """
+    Split ``path`` into ``(start, end)`` byte ranges of roughly
+    ``shard_size`` bytes, each ending on a line boundary.
+
+    Sharding assumes one record per line, which holds for JSON Lines and
+    for CSV exports without embedded newlines in quoted values.
+    """
+    if path.endswith('.gz'):
+        raise ValueError('Compressed input cannot be split into shards')
+    size = os.path.getsize(path)
+    shards = []
+    with open(path, 'rb') as handle:
+        while start < size:
+            handle.seek(min(start + shard_size, size))
+            if handle.tell() < size:
+                handle.readline()
+            end = handle.tell()
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+_known_drug_ids = None
+
+
+def init_worker(known_drug_ids):
+    """Process pool initializer: share the drug id set once per worker"""
+    global _known_drug_ids
+    _known_drug_ids = known_drug_ids
+
+
+def parse_shard(kind, path, fmt, start, end, header=None):
+    """
+    Parse and validate the records in one byte range.
+
+    Returns ``(start, end, objects, errors)`` where ``errors`` is a list of
+    ``(byte offset, message)``. Runs in worker processes and never touches
+    the database.
+    """
+    objects, errors = [], []
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        offset = start
+        while offset < end:
+            raw = handle.readline()
+            line_offset, offset = offset, offset + len(raw)
+            if not raw.strip():
+                continue
+            try:
+                try:
+                    line = raw.decode('utf-8')
+                except UnicodeDecodeError as exc:
+                    raise ImportRowError(f'invalid UTF-8: {exc}')
+                record = parse_line(line, fmt, header)
+                if kind == 'drugs':
+                    objects.append(build_drug(record))
+                else:
+                    objects.append(build_interaction(record, _known_drug_ids))
+            except ImportRowError as exc:
+                errors.append((line_offset, str(exc)))
+    return start, end, objects, errors
+
+
+class Checkpoint:
+    """
+    Progress of a sharded import, stored as JSON next to the input.
+
+    The checkpoint records the input file's size and mtime so a resume
+    against a modified file starts over instead of skipping data.
+    """
+
+    def __init__(self, path, input_path, kind):
+        self.path = path
+        self.input_path = input_path
+        self.kind = kind
+        stat = os.stat(input_path)
+        self.fingerprint = {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+        self.offset = 0
+        self.batch = 0
+
+    def load(self):
+        """Restore progress; returns False if there is nothing to resume"""
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return False
+        if data.get('input') != os.path.abspath(self.input_path) or data.get('kind') != self.kind:
+            return False
+        if data.get('fingerprint') != self.fingerprint:
+            return False
+        self.offset = data['offset']
+        self.batch = data['batch']
+        return True
+
+    def save(self, offset, batch):
+        self.offset, self.batch = offset, batch
+        data = {
+            'input': os.path.abspath(self.input_path),
+            'kind': self.kind,
+            'fingerprint': self.fingerprint,
+            'offset': offset,
+            'batch': batch,
+        }
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from drugs import search
+from drugs.models import Drug
+
+
+class Command(BaseCommand):
+    help = 'Recompute the diacritic-free search columns for every drug'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of drugs updated per query (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        source_fields = list(Drug.NORMALIZED_FIELDS)
+        target_fields = list(Drug.NORMALIZED_FIELDS.values())
+
+        self.stdout.write('Backfilling normalized drug fields...')
+        updated = 0
+        batch = []
+        with transaction.atomic():
+            for drug in Drug.objects.only('id', *source_fields).order_by().iterator(chunk_size=batch_size):
+                drug.update_normalized_fields()
+                batch.append(drug)
+                if len(batch) >= batch_size:
+                    Drug.objects.bulk_update(batch, target_fields)
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                Drug.objects.bulk_update(batch, target_fields)
+                updated += len(batch)
+            # The search words are read from the normalized columns
+            search.rebuild_drug_words()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated {updated} drugs.')
+        )
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+from drugs.benchmarks.http import ASGI_APP, WSGI_APP, Server, ServerError, percentiles, request
+from drugs.models import Drug
+
+SERVERS = {
+    'sync': ([WSGI_APP], {'ASYNC_VIEWS': 'False'}),
+    'async': (['-k', 'uvicorn.workers.UvicornWorker', ASGI_APP], {'ASYNC_VIEWS': 'True'}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the home, search, stats and prescription check endpoints '
+        'against gunicorn with sync workers (WSGI) and with uvicorn workers '
+        '(ASGI, async views) at several concurrency levels, optionally while '
+        'slow clients hold connections open. Uses the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 300], help='Concurrent clients (default: 10 100 300)')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per measurement (default: 5)')
+        parser.add_argument('--workers', type=int, default=1, help='Server worker processes (default: 1)')
+        parser.add_argument('--slow-clients', type=int, default=0, help='Extra clients that trickle their request headers (default: 0)')
+        parser.add_argument('--slow-seconds', type=float, default=2.0, help='Time a slow client takes to send its request (default: 2)')
+        parser.add_argument('--server', choices=list(SERVERS), nargs='+', default=list(SERVERS), help='Servers to test (default: both)')
+        parser.add_argument('--query', default='thuoc', help='Search query (default: thuoc)')
+
+    def handle(self, *args, **options):
+        if options['duration'] <= 0 or options['workers'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError('--duration, --workers and --concurrency must be positive')
+        drug_ids = list(Drug.objects.order_by('id').values_list('id', flat=True)[:5])
+        if not drug_ids:
+            raise CommandError('The database has no drugs; load data first')
+        requests = [
+            ('GET', '/', None),
+            ('GET', '/search/?' + urlencode({'q': options['query']}), None),
+            ('GET', '/api/stats/', None),
+            ('POST', '/api/interactions/check/', json.dumps({'drugs': drug_ids}).encode()),
+        ]
+
+        self.stdout.write(
+            f"{'server':<8}{'clients':>8}{'slow':>6}{'requests':>10}{'req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for name in options['server']:
+            arguments, env = SERVERS[name]
+            try:
+                with Server(name, arguments, env, options['workers']) as port:
+                    for concurrency in options['concurrency']:
+                        result = asyncio.run(self.load(
+                            port, requests, concurrency, options['duration'],
+                            options['slow_clients'], options['slow_seconds'],
+                        ))
+                        self.report(name, concurrency, options['slow_clients'], result)
+            except ServerError as exc:
+                raise CommandError(str(exc))
+
+    async def load(self, port, requests, concurrency, duration, slow_clients, slow_seconds):
+        deadline = time.perf_counter() + duration
+        latencies, errors = [], [0]
+
+        async def client(offset):
+            index = offset
+            while time.perf_counter() < deadline:
+                method, path, body = requests[index % len(requests)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    status = await request(port, method, path, body)
+                except (OSError, asyncio.IncompleteReadError):
+                    status = None
+                if status is None or status >= 400:
+                    errors[0] += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+        async def slow_client():
+            while time.perf_counter() < deadline:
+                try:
+                    await request(port, 'GET', '/api/stats/', None, trickle=slow_seconds)
+                except (OSError, asyncio.IncompleteReadError):
+                    pass
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[slow_client() for _ in range(slow_clients)],
+            *[client(offset) for offset in range(concurrency)],
+        )
+        elapsed = time.perf_counter() - started
+        return latencies, errors[0], elapsed
+
+    def report(self, name, concurrency, slow_clients, result):
+        latencies, errors, elapsed = result
+        p50, p95, p99 = percentiles(latencies)
+        self.stdout.write(
+            f'{name:<8}{concurrency:>8}{slow_clients:>6}{len(latencies):>10}{len(latencies) / elapsed:>9.1f}'
+            f'{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{errors:>8}'
+        )
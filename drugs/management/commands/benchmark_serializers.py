@@ -0,0 +1,124 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from drugs.fastserializers import ValuesPlan
+from drugs.models import Drug, DrugInteraction
+from drugs.views import DrugInteractionViewSet, DrugViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare DRF ModelSerializer output with the values() fast path for the '
+        'drug and interaction list endpoints at several page sizes, and check '
+        'that both produce the same data. Missing rows are created inside a '
+        'transaction that is rolled back.'
+    )
+
+    CASES = [
+        ('drugs', DrugViewSet, '/api/drugs/', {}),
+        ('drugs ?expand=all', DrugViewSet, '/api/drugs/', {'fields': None}),
+        ('interactions', DrugInteractionViewSet, '/api/interactions/', {}),
+        ('interactions ?expand=text', DrugInteractionViewSet, '/api/interactions/',
+         {'expand': 'mechanism,consequence,management'}),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[20, 100, 1000], help='Rows per call (default: 20 100 1000)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed calls per measurement (default: 20)')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive')
+        try:
+            with transaction.atomic():
+                self.ensure_rows(max(options['rows']))
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def ensure_rows(self, count):
+        missing = count + 1 - Drug.objects.count()
+        if missing > 0:
+            Drug.objects.bulk_create([
+                Drug(id=f'BENCH-{index:06d}', ten_thuoc=f'Thuốc thử {index}', hoat_chat=f'Hoạt chất {index}')
+                for index in range(missing)
+            ])
+        missing = count - DrugInteraction.objects.count()
+        if missing > 0:
+            hub = Drug.objects.order_by('id').first()
+            drug_ids = Drug.objects.exclude(id=hub.id).exclude(
+                id__in=DrugInteraction.objects.filter(drug1=hub).values('drug2')
+            ).exclude(
+                id__in=DrugInteraction.objects.filter(drug2=hub).values('drug1')
+            ).values_list('id', flat=True)[:missing]
+            severities = list(DrugInteraction.SEVERITY_RANK)
+            interactions = []
+            for index, drug_id in enumerate(drug_ids):
+                interaction = DrugInteraction(
+                    drug1_id=hub.id, drug2_id=drug_id,
+                    severity=severities[index % len(severities)],
+                    mechanism='Cơ chế tương tác ' * 8,
+                    consequence='Hậu quả lâm sàng ' * 8,
+                    management='Theo dõi chặt chẽ ' * 8,
+                )
+                interaction.canonicalize()
+                interactions.append(interaction)
+            DrugInteraction.objects.bulk_create(interactions)
+        if DrugInteraction.objects.count() < count:
+            raise CommandError(f'Could not create {count} interactions for the benchmark')
+
+    def view_for(self, viewset, url, params):
+        view = viewset()
+        view.action = 'list'
+        view.format_kwarg = None
+        view.kwargs = {}
+        if params.get('fields', '') is None:
+            # Every field: pass all serializer field names explicitly
+            params = {'fields': ','.join(viewset.serializer_class().fields)}
+        view.request = Request(APIRequestFactory().get(url, params))
+        return view
+
+    def measure(self, function, repeat):
+        function()  # warm up
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def run(self, sizes, repeat):
+        self.stdout.write(
+            f"{'endpoint':<28}{'rows':>6}{'serializer ms':>15}{'fast ms':>10}{'speedup':>9}"
+        )
+        for label, viewset, url, params in self.CASES:
+            for size in sizes:
+                view = self.view_for(viewset, url, params)
+                queryset = view.get_queryset()
+
+                def slow():
+                    return view.get_serializer(list(queryset[:size]), many=True).data
+
+                def fast():
+                    plan = ValuesPlan(view.get_serializer(), queryset)
+                    return plan.render(plan.values(queryset)[:size])
+
+                if [dict(row) for row in slow()] != fast():
+                    raise CommandError(f'{label}: fast path output differs from the serializer')
+                slow_time = self.measure(slow, repeat)
+                fast_time = self.measure(fast, repeat)
+                self.stdout.write(
+                    f'{label:<28}{size:>6}{slow_time * 1000:>15.2f}{fast_time * 1000:>10.2f}'
+                    f'{slow_time / fast_time:>8.1f}x'
+                )
+        self.stdout.write(self.style.SUCCESS('Fast path output matches the serializer for every case.'))
@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from drugs.backends.sqlite3.base import DatabaseWrapper
+from drugs.search import FTS_TABLE, build_match_expression
+
+# SQLite's own defaults, reconnecting on every request (Django's default
+# CONN_MAX_AGE = 0)
+DEFAULT_PROFILE = {
+    'pragmas': {'journal_mode': 'delete', 'synchronous': 'full', 'busy_timeout': 5000},
+    'persistent': False,
+}
+
+# One read "request": an interaction detail, a search page and the counters
+READ_QUERIES = [
+    "SELECT i.*, d1.ten_thuoc, d2.ten_thuoc FROM drugs_druginteraction i "
+    "JOIN drugs_drug d1 ON d1.id = i.drug1_id JOIN drugs_drug d2 ON d2.id = i.drug2_id "
+    "WHERE i.id = %s",
+    f"SELECT i.id, i.severity FROM drugs_druginteraction i JOIN {FTS_TABLE} "
+    f"ON i.id = +{FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s "
+    f"ORDER BY bm25({FTS_TABLE}) LIMIT 20",
+    "SELECT key, value FROM drugs_statcounter",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure read throughput of concurrent reader processes while a writer '
+        'process keeps committing admin-style edits, with SQLite defaults and '
+        'with the PRAGMAs and CONN_MAX_AGE from settings. Runs on a copy of '
+        'the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes (default: 4)')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile (default: 5)')
+        parser.add_argument('--write-interval', type=float, default=0.01, help='Pause between writes in seconds (default: 0.01)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark needs the SQLite backend')
+        if options['readers'] < 1 or options['duration'] <= 0:
+            raise CommandError('--readers and --duration must be positive')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM drugs_druginteraction')
+            ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute('SELECT ten_thuoc FROM drugs_drug ORDER BY random() LIMIT 200')
+            terms = [build_match_expression(row[0]) for row in cursor.fetchall()]
+            terms = [term for term in terms if term]
+        if not ids:
+            raise CommandError('The database has no interactions; load data first')
+        configured = settings.DATABASES['default']
+        profiles = {
+            'default': DEFAULT_PROFILE,
+            'tuned': {
+                'pragmas': configured.get('OPTIONS', {}).get('pragmas', {}),
+                'persistent': configured.get('CONN_MAX_AGE') != 0,
+            },
+        }
+
+        self.stdout.write(
+            f"{'profile':<9}{'reads/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'writes/s':>10}{'errors':>8}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name, profile in profiles.items():
+                path = os.path.join(directory, f'{name}.sqlite3')
+                self.copy_database(path, profile)
+                self.report(name, self.run(path, profile, ids, terms, options))
+
+    def copy_database(self, path, profile):
+        # The backup API gives a consistent snapshot even with pending WAL
+        # frames; reopening with the profile switches its journal mode
+        connection.ensure_connection()
+        target = open_database(path, {'pragmas': {}})
+        connection.connection.backup(target.connection)
+        target.close()
+        open_database(path, profile).close()
+
+    def run(self, path, profile, ids, terms, options):
+        deadline = time.time() + options['duration']
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        connections.close_all()  # never share a connection with the children
+        processes = [
+            context.Process(target=reader, args=(path, profile, ids, terms, deadline, results, seed))
+            for seed in range(options['readers'])
+        ] + [context.Process(target=writer, args=(path, profile, ids, deadline, options['write_interval'], results))]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return collected, options['duration']
+
+    def report(self, name, result):
+        collected, duration = result
+        latencies = [value for kind, values, errors in collected if kind == 'read' for value in values]
+        writes = sum(len(values) for kind, values, errors in collected if kind == 'write')
+        errors = sum(errors for kind, values, errors in collected)
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = (cuts[index] * 1000 for index in (49, 94, 98))
+        else:
+            p50 = p95 = p99 = float('nan')
+        self.stdout.write(
+            f'{name:<9}{len(latencies) / duration:>9.1f}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}'
+            f'{writes / duration:>10.1f}{errors:>8}'
+        )
+
+
+def open_database(path, profile):
+    wrapper = DatabaseWrapper({
+        **connections['default'].settings_dict,
+        'NAME': path,
+        'OPTIONS': {'pragmas': profile['pragmas']},
+    })
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def reader(path, profile, ids, terms, deadline, results, seed):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    database = open_database(path, profile) if profile['persistent'] else None
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            current = database or open_database(path, profile)
+            with current.cursor() as cursor:
+                cursor.execute(READ_QUERIES[0], [rng.choice(ids)])
+                cursor.fetchall()
+                cursor.execute(READ_QUERIES[1], [rng.choice(terms)])
+                cursor.fetchall()
+                cursor.execute(READ_QUERIES[2])
+                cursor.fetchall()
+            if database is None:
+                current.close()
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.put(('read', latencies, errors))
+
+
+def writer(path, profile, ids, deadline, interval, results):
+    """Admin edits: update a row, reindex it and bump the data version"""
+    rng = random.Random(-1)
+    database = open_database(path, profile)
+    timings, errors = [], 0
+    while time.time() < deadline:
+        interaction_id = rng.choice(ids)
+        started = time.perf_counter()
+        try:
+            with database.cursor() as cursor:
+                cursor.execute('BEGIN')
+                cursor.execute(
+                    'UPDATE drugs_druginteraction SET management = %s, updated_at = %s WHERE id = %s',
+                    [f'Theo dõi {started}', database.ops.adapt_datetimefield_value(timezone.now()), interaction_id],
+                )
+                cursor.execute(
+                    f'UPDATE {FTS_TABLE} SET mechanism = mechanism WHERE rowid = %s', [interaction_id]
+                )
+                cursor.execute("UPDATE drugs_dataversion SET version = version + 1 WHERE key = 'data'")
+                cursor.execute('COMMIT')
+        except Exception:
+            errors += 1
+            database.close()
+            database = open_database(path, profile)
+            continue
+        timings.append(time.perf_counter() - started)
+        time.sleep(interval)
+    results.put(('write', timings, errors))
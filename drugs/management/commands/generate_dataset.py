@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from drugs.benchmarks.dataset import SCALES, Dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Write a deterministic synthetic dataset (drugs.csv and '
+        'interactions.jsonl in the import_drugbank formats) with Vietnamese '
+        'drug data. The same --scale/--interactions and --seed always give '
+        'the same files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Directory to write the files to')
+        parser.add_argument('--scale', choices=list(SCALES), default='10k', help='Number of interactions (default: 10k)')
+        parser.add_argument('--interactions', type=int, help='Exact number of interactions (overrides --scale)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+    def handle(self, *args, **options):
+        try:
+            interactions = options['interactions']
+            if interactions is None:
+                interactions = SCALES[options['scale']]
+            dataset = Dataset(interactions, options['seed'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        drugs_path, interactions_path = dataset.write(options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {dataset.drug_count} drugs to {drugs_path} and '
+            f'{dataset.interaction_count} interactions to {interactions_path}'
+        ))
+        self.stdout.write(
+            f'Load with: manage.py import_drugbank --drugs {drugs_path} --interactions {interactions_path}'
+        )
@@ -0,0 +1,188 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from drugs import importer, metrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a DrugBank.vn export (CSV or JSON Lines, optionally .gz) into the '
+        'database in batches. Re-running with the same input updates rows in place. '
+        'With --workers > 1 the input is split into byte-range shards parsed in a '
+        'process pool while this process writes, checkpointing after every shard.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drugs', help='File with drug records (keyed on id)')
+        parser.add_argument('--interactions', help='File with interaction records (drug1_id, drug2_id, ...)')
+        parser.add_argument('--format', choices=importer.FORMATS, help='Input format (default: from file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per batch (default: 1000)')
+        parser.add_argument('--progress-every', type=int, default=10000, help='Report progress every N rows (default: 10000)')
+        parser.add_argument('--max-errors', type=int, default=20, help='Invalid rows to print before going quiet (default: 20)')
+        parser.add_argument('--strict', action='store_true', help='Abort on the first invalid row')
+        parser.add_argument('--workers', type=int, default=1, help='Parser processes; > 1 enables sharded parallel parsing (default: 1)')
+        parser.add_argument('--shard-size', type=int, default=8 * 1024 * 1024, help='Bytes per shard in sharded mode (default: 8 MiB)')
+        parser.add_argument('--resume', action='store_true', help='Continue a sharded import from its checkpoint')
+        parser.add_argument('--checkpoint', help='Checkpoint file prefix (default: next to each input file)')
+
+    def handle(self, *args, **options):
+        if not options['drugs'] and not options['interactions']:
+            raise CommandError('Pass --drugs and/or --interactions')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be positive')
+        self.options = options
+        self.sharded = options['workers'] > 1 or options['resume']
+
+        started = time.monotonic()
+        try:
+            self.import_files()
+        finally:
+            # Batches are committed as they are written, so derived data is
+            # rebuilt even when --strict or an error stops the import
+            self.stdout.write('Rebuilding search index and statistics...')
+            importer.finalize()
+        self.stdout.write(
+            self.style.SUCCESS(f'Import finished in {time.monotonic() - started:.1f}s')
+        )
+
+    def import_files(self):
+        options = self.options
+        if options['drugs']:
+            if self.sharded:
+                self.run_sharded('drugs', options['drugs'], importer.write_drugs)
+            else:
+                self.run('drugs', options['drugs'], importer.build_drug, importer.write_drugs)
+        if options['interactions']:
+            known_drug_ids = importer.load_drug_ids()
+            self.stdout.write(f'Loaded {len(known_drug_ids)} drug ids')
+            if self.sharded:
+                self.run_sharded(
+                    'interactions', options['interactions'], importer.write_interactions, known_drug_ids
+                )
+            else:
+                self.run(
+                    'interactions',
+                    options['interactions'],
+                    lambda record: importer.build_interaction(record, known_drug_ids),
+                    importer.write_interactions,
+                )
+
+    def run(self, label, path, build, write):
+        options = self.options
+        batch_size = options['batch_size']
+        self.stdout.write(f'Importing {label} from {path}...')
+
+        started = time.monotonic()
+        read = written = errors = 0
+        batch = []
+        for line_number, record in importer.read_records(path, options['format']):
+            read += 1
+            try:
+                if isinstance(record, importer.ImportRowError):
+                    raise record
+                batch.append(build(record))
+            except importer.ImportRowError as exc:
+                errors += 1
+                metrics.record_import(label, 'skipped')
+                if options['strict']:
+                    raise CommandError(f'{path}:{line_number}: {exc}')
+                if errors <= options['max_errors']:
+                    self.stderr.write(f'{path}:{line_number}: skipped: {exc}')
+
+            if len(batch) >= batch_size:
+                written += write(batch)
+                batch = []
+            if read % options['progress_every'] == 0:
+                self.report(label, read, written, errors, started)
+
+        if batch:
+            written += write(batch)
+        self.report(label, read, written, errors, started)
+
+    def run_sharded(self, label, path, write, known_drug_ids=None):
+        """
+        Parse byte-range shards in a process pool and write them here, in
+        file order, one batch at a time. A checkpoint (end offset of the last
+        fully written shard and the batch count) is saved after each shard.
+        """
+        options = self.options
+        batch_size = options['batch_size']
+        fmt = options['format'] or importer.detect_format(path)
+        try:
+            header, data_start = importer.read_csv_header(path) if fmt == 'csv' else (None, 0)
+            checkpoint_path = f"{options['checkpoint'] or path}.{label}.checkpoint.json"
+            checkpoint = importer.Checkpoint(checkpoint_path, path, label)
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        if options['resume'] and checkpoint.load():
+            self.stdout.write(f'Resuming {label} at byte {checkpoint.offset} (batch {checkpoint.batch})')
+            data_start = max(data_start, checkpoint.offset)
+        try:
+            shards = importer.shard_file(path, options['shard_size'], data_start)
+        except ValueError as exc:
+            raise CommandError(f'{exc}; run without --workers/--resume')
+
+        self.stdout.write(
+            f"Importing {label} from {path} in {len(shards)} shards with {options['workers']} workers..."
+        )
+        started = time.monotonic()
+        read = written = errors = 0
+        batch_number = checkpoint.batch
+
+        # Worker processes must not inherit open database connections
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=context,
+            initializer=importer.init_worker,
+            initargs=(known_drug_ids,),
+        ) as executor:
+            pending = deque()
+            shard_iter = iter(shards)
+            # Keep a bounded number of parsed shards in flight so memory stays flat
+            for start, end in shard_iter:
+                pending.append(executor.submit(importer.parse_shard, label, path, fmt, start, end, header))
+                if len(pending) >= options['workers'] * 2:
+                    break
+
+            while pending:
+                start, end, objects, shard_errors = pending.popleft().result()
+                for start_next, end_next in shard_iter:
+                    pending.append(
+                        executor.submit(importer.parse_shard, label, path, fmt, start_next, end_next, header)
+                    )
+                    break
+
+                for offset, message in shard_errors:
+                    errors += 1
+                    metrics.record_import(label, 'skipped')
+                    if options['strict']:
+                        raise CommandError(f'{path}@{offset}: {message}')
+                    if errors <= options['max_errors']:
+                        self.stderr.write(f'{path}@{offset}: skipped: {message}')
+
+                read += len(objects) + len(shard_errors)
+                for index in range(0, len(objects), batch_size):
+                    written += write(objects[index:index + batch_size])
+                    batch_number += 1
+                checkpoint.save(end, batch_number)
+                self.report(label, read, written, errors, started)
+
+        checkpoint.clear()
+
+    def report(self, label, read, written, errors, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'  {label}: {read} read, {written} written, {errors} skipped '
+            f'({read / elapsed:,.0f} rows/s)'
+        )
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+from drugs.benchmarks.http import ASGI_APP, WSGI_APP, Server, ServerError, percentiles, request
+from drugs.models import Drug, DrugInteraction
+
+# Worker class -> gunicorn arguments and environment
+WORKER_CLASSES = {
+    'sync': lambda threads: ([WSGI_APP], {'ASYNC_VIEWS': 'False'}),
+    'gthread': lambda threads: (['-k', 'gthread', '--threads', str(threads), WSGI_APP], {'ASYNC_VIEWS': 'False'}),
+    'uvicorn': lambda threads: (['-k', 'uvicorn.workers.UvicornWorker', ASGI_APP], {'ASYNC_VIEWS': 'True'}),
+}
+
+# Relative weights of the endpoints in each request mix
+MIXES = {
+    'search': {
+        'search': 35, 'api_interactions_search': 25, 'api_drugs_search': 20, 'api_drugs_autocomplete': 20,
+    },
+    'detail': {
+        'drug_detail': 35, 'interaction_detail': 25, 'api_drug': 20, 'api_interaction': 20,
+    },
+    'stats': {
+        'api_stats': 60, 'home': 40,
+    },
+    'mixed': {
+        'home': 10, 'search': 20, 'api_interactions_search': 10, 'api_drugs_autocomplete': 10,
+        'drug_detail': 15, 'interaction_detail': 10, 'api_interaction': 5, 'api_interactions_check': 10,
+        'api_stats': 10,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the site on a local gunicorn: for each worker class and '
+        'worker count, drive a request mix (search-, detail- or stats-heavy, '
+        'or mixed) at stepped concurrency levels and report throughput, '
+        'latency percentiles and errors per endpoint. Uses the configured '
+        'database; --env passes settings (e.g. cache backends) to the server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', choices=list(MIXES), nargs='+', default=['mixed'], help='Request mixes (default: mixed)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50], help='Concurrent clients per step (default: 1 10 50)')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per step (default: 10)')
+        parser.add_argument('--warmup', type=float, default=3.0, help='Unreported seconds of the mix before the first step, so workers build their caches and indexes (default: 3)')
+        parser.add_argument('--worker-class', choices=list(WORKER_CLASSES), nargs='+', default=['sync'], help='Gunicorn worker classes (default: sync)')
+        parser.add_argument('--workers', type=int, nargs='+', default=[3], help='Worker process counts (default: 3)')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker (default: 4)')
+        parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE', help='Extra server environment, repeatable')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the request sequence (default: 0)')
+        parser.add_argument('--output', help='Also write every step as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['duration'] <= 0 or min(options['workers']) < 1 or min(options['concurrency']) < 1:
+            raise CommandError('--duration, --workers and --concurrency must be positive')
+        if options['warmup'] < 0:
+            raise CommandError('--warmup cannot be negative')
+        try:
+            env = dict(item.split('=', 1) for item in options['env'])
+        except ValueError:
+            raise CommandError('--env takes NAME=VALUE')
+        targets = self.targets(random.Random(options['seed']))
+
+        steps = []
+        for worker_class in options['worker_class']:
+            arguments, class_env = WORKER_CLASSES[worker_class](options['threads'])
+            for workers in options['workers']:
+                label = f'{worker_class} x{workers}'
+                try:
+                    with Server(label, arguments, {**class_env, **env}, workers) as port:
+                        for mix in options['mix']:
+                            if options['warmup']:
+                                asyncio.run(self.load(
+                                    port, MIXES[mix], targets, workers, options['warmup'], random.Random(-1),
+                                ))
+                            for concurrency in options['concurrency']:
+                                rng = random.Random(f"{options['seed']}:{mix}:{concurrency}")
+                                result = asyncio.run(self.load(
+                                    port, MIXES[mix], targets, concurrency, options['duration'], rng,
+                                ))
+                                steps.append(self.report(label, mix, concurrency, result))
+                except ServerError as exc:
+                    raise CommandError(str(exc))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'env': env, 'steps': steps}, handle, indent=2, ensure_ascii=False)
+
+    def targets(self, rng, count=200):
+        """Request parameters sampled from the database (the same for a seed and data)"""
+        drug_ids = self.sample(rng, Drug.objects.order_by('id'), count)
+        interaction_ids = self.sample(rng, DrugInteraction.objects.order_by('id'), count)
+        if not drug_ids or not interaction_ids:
+            raise CommandError('The database has no drugs or interactions; load data first')
+        names = {
+            pk: f'{name} {ingredient}'
+            for pk, name, ingredient in Drug.objects.filter(id__in=drug_ids).values_list('id', 'ten_thuoc', 'hoat_chat')
+        }
+        # Search terms: the words of the sampled drugs' names and ingredients
+        words = [word for pk in drug_ids for word in names[pk].split() if len(word) > 3]
+        return {
+            'drug_ids': drug_ids,
+            'interaction_ids': interaction_ids,
+            'queries': words or [names[drug_ids[0]]],
+        }
+
+    def sample(self, rng, queryset, count):
+        ids = list(queryset.values_list('id', flat=True).iterator(chunk_size=10000))
+        return rng.sample(ids, min(count, len(ids)))
+
+    def build(self, endpoint, targets, rng):
+        """``(method, path, body)`` of one request to ``endpoint``"""
+        query = rng.choice(targets['queries'])
+        drug_id = rng.choice(targets['drug_ids'])
+        interaction_id = rng.choice(targets['interaction_ids'])
+        if endpoint == 'api_interactions_check':
+            drug_ids = rng.sample(targets['drug_ids'], min(5, len(targets['drug_ids'])))
+            return 'POST', '/api/interactions/check/', json.dumps({'drugs': drug_ids}).encode()
+        return 'GET', {
+            'home': '/',
+            'search': '/search/?' + urlencode({'q': query}),
+            'api_interactions_search': '/api/interactions/search/?' + urlencode({'query': query}),
+            'api_drugs_search': '/api/drugs/?' + urlencode({'q': query}),
+            'api_drugs_autocomplete': '/api/drugs/autocomplete/?' + urlencode({'prefix': query[:3]}),
+            'drug_detail': f'/drug/{drug_id}/',
+            'interaction_detail': f'/interaction/{interaction_id}/',
+            'api_drug': f'/api/drugs/{drug_id}/',
+            'api_interaction': f'/api/interactions/{interaction_id}/',
+            'api_stats': '/api/stats/',
+        }[endpoint], None
+
+    async def load(self, port, mix, targets, concurrency, duration, rng):
+        endpoints, weights = zip(*mix.items())
+        # The request sequence is drawn up front so it does not depend on timing
+        plan = [
+            (endpoint, self.build(endpoint, targets, rng))
+            for endpoint in rng.choices(endpoints, weights, k=1000)
+        ]
+        deadline = time.perf_counter() + duration
+        latencies = {endpoint: [] for endpoint in endpoints}
+        errors = dict.fromkeys(endpoints, 0)
+
+        async def client(offset):
+            index = offset * len(plan) // concurrency
+            while time.perf_counter() < deadline:
+                endpoint, (method, path, body) = plan[index % len(plan)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    status = await request(port, method, path, body)
+                except (OSError, asyncio.IncompleteReadError, IndexError, ValueError):
+                    status = None
+                if status is None or status >= 400:
+                    errors[endpoint] += 1
+                else:
+                    latencies[endpoint].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[client(offset) for offset in range(concurrency)])
+        return latencies, errors, time.perf_counter() - started
+
+    def report(self, label, mix, concurrency, result):
+        latencies, errors, elapsed = result
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{label}, {mix} mix, {concurrency} clients'))
+        self.stdout.write(
+            f"  {'endpoint':<26}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'errors':>8}{'err %':>7}"
+        )
+        rows = [(endpoint, values, errors[endpoint]) for endpoint, values in latencies.items()]
+        rows.append(('total', [value for values in latencies.values() for value in values], sum(errors.values())))
+        endpoints = {}
+        for endpoint, values, failed in rows:
+            p50, p95, p99 = percentiles(values)
+            total = len(values) + failed
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'per_second': round(len(values) / elapsed, 1),
+                'p50_ms': round(p50, 2),
+                'p95_ms': round(p95, 2),
+                'p99_ms': round(p99, 2),
+                'errors': failed,
+                'error_rate': round(failed / total, 4) if total else 0.0,
+            }
+            self.stdout.write(
+                f'  {endpoint:<26}{len(values):>9}{len(values) / elapsed:>9.1f}{p50:>9.1f}{p95:>9.1f}'
+                f'{p99:>9.1f}{failed:>8}{(failed / total if total else 0.0):>7.1%}'
+            )
+        return {
+            'server': label,
+            'mix': mix,
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 2),
+            'endpoints': endpoints,
+        }
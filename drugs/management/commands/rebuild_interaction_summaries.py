@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from drugs import summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-drug interaction counts, risk levels and timestamps from the interaction table'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding drug interaction summaries...')
+        drugs = summaries.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{drugs} drugs with interactions.'))
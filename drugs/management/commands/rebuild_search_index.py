@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from drugs import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the drug search words and the full-text index for drug interactions'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding drug search words...')
+        count = search.rebuild_drug_words()
+        self.stdout.write(f'Stored {count} words.')
+
+        if not search.fts_enabled():
+            self.stdout.write(
+                self.style.WARNING('Full-text index is only available on SQLite, nothing to do.')
+            )
+            return
+
+        self.stdout.write('Rebuilding interaction search index...')
+        count = search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {count} interactions.')
+        )
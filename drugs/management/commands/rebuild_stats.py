@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from drugs import stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the statistics counters from the drug and interaction tables'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding statistics counters...')
+        snapshot = stats.rebuild_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{snapshot['total_drugs']} drugs, {snapshot['total_interactions']} interactions."
+            )
+        )
@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from drugs.benchmarks import suite
+from drugs.benchmarks.dataset import SCALES, Dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Import a synthetic dataset into a fresh test database and time the '
+        'import, interaction search, drug/interaction list and search API, '
+        'drug detail and statistics endpoints in process. Prints JSON (or '
+        'writes it with --output); --compare reports the change against a '
+        'previous run and fails on regressions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), default='10k', help='Number of interactions (default: 10k)')
+        parser.add_argument('--interactions', type=int, help='Exact number of interactions (overrides --scale)')
+        parser.add_argument('--seed', type=int, default=0, help='Dataset and request seed (default: 0)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed calls per case (default: 20)')
+        parser.add_argument('--case', dest='cases', choices=suite.CASES, nargs='+', help='Cases to run (default: all)')
+        parser.add_argument('--warm', action='store_true', help='Keep the result and statistics caches between calls')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Slowdown counted as a regression (default: 0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive')
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+        try:
+            interactions = options['interactions']
+            if interactions is None:
+                interactions = SCALES[options['scale']]
+            dataset = Dataset(interactions, options['seed'])
+            results = suite.run(
+                dataset, options['repeat'], options['warm'], options['cases'],
+                progress=lambda message: self.stderr.write(message),
+            )
+        except (ValueError, suite.BenchmarkError) as exc:
+            raise CommandError(str(exc))
+
+        output = json.dumps(results, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            self.report(baseline, results, options['threshold'])
+
+    def report(self, baseline, results, threshold):
+        if baseline['meta'].get('interactions') != results['meta']['interactions']:
+            self.stderr.write(self.style.WARNING('The baseline was run on a different dataset size'))
+        rows, regressions = suite.compare(baseline, results, threshold)
+        self.stderr.write(f"{'case':<26}{'before ms':>12}{'after ms':>12}{'change':>9}")
+        for name, before, after, change in rows:
+            self.stderr.write(f'{name:<26}{before:>12.2f}{after:>12.2f}{change:>+9.0%}')
+        if regressions:
+            raise CommandError(f"Slower by more than {threshold:.0%}: {', '.join(regressions)}")
@@ -0,0 +1,137 @@
+"""
+Application metrics in the Prometheus text format, served at ``/metrics``.
+
+Counters and histograms are ``prometheus_client`` objects updated in
+process, so recording costs no I/O and no database access. With
+``PROMETHEUS_MULTIPROC_DIR`` set (as in the Dockerfile) every process,
+gunicorn workers and management commands alike, writes its values to its
+own memory-mapped files in that directory and ``/metrics`` sums the files
+of all of them, so whichever worker answers a scrape returns the same
+totals. ``gunicorn.conf.py`` empties the directory when the server starts.
+Without it values are per process.
+
+Scrapes are only answered for clients in ``METRICS_ALLOWED_IPS``.
+
+Catalogue sizes come from the cached statistics snapshot
+(``drugs.stats``), not from a query per scrape.
+"""
+import ipaddress
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from django.conf import settings
+
+from . import stats
+from .models import DrugInteraction
+
+MULTIPROCESS_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROCESS_DIR:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+SEVERITIES = {value for value, label in DrugInteraction.SEVERITY_CHOICES}
+
+SEARCHES = Counter(
+    'drugs_searches', 'Searches by target and outcome (match, fuzzy fallback or miss)',
+    ['target', 'outcome'],
+)
+CACHE_REQUESTS = Counter(
+    'drugs_cache_requests', 'Lookups in the result caches and per-worker indexes',
+    ['cache', 'result'],
+)
+SEVERITY_LOOKUPS = Counter(
+    'drugs_severity_lookups', 'Interactions looked up, by severity and source',
+    ['severity', 'source'],
+)
+CHECK_INTERACTIONS = Histogram(
+    'drugs_check_interactions', 'Interacting pairs found per prescription check',
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50),
+)
+IMPORT_ROWS = Counter(
+    'drugs_import_rows', 'Rows processed by import_drugbank',
+    ['kind', 'outcome'],
+)
+IMPORT_BATCH_SECONDS = Histogram(
+    'drugs_import_batch_seconds', 'Time to write one import batch',
+    ['kind'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def record_search(target, outcome):
+    SEARCHES.labels(target, outcome).inc()
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_severity(severity, source):
+    # Only known values, so request parameters cannot add label series
+    if severity in SEVERITIES:
+        SEVERITY_LOOKUPS.labels(severity, source).inc()
+
+
+def record_check(pairs):
+    """``pairs``: the interactions (or graph edges) a check found"""
+    CHECK_INTERACTIONS.observe(len(pairs))
+    for pair in pairs:
+        record_severity(pair.severity, 'check')
+
+
+def record_import(kind, outcome, rows=1):
+    IMPORT_ROWS.labels(kind, outcome).inc(rows)
+
+
+class CatalogCollector:
+    """Drug and interaction totals from the statistics snapshot"""
+
+    def describe(self):
+        # Lets the registry learn the names without reading the snapshot
+        return self.families()
+
+    def collect(self):
+        drugs, interactions = self.families()
+        snapshot = stats.get_stats()
+        drugs.add_metric([], snapshot['total_drugs'])
+        for severity, label in DrugInteraction.SEVERITY_CHOICES:
+            interactions.add_metric([severity], snapshot['severity_breakdown'].get(severity, 0))
+        return [drugs, interactions]
+
+    def families(self):
+        return [
+            GaugeMetricFamily('drugs_catalog_drugs', 'Drugs in the database'),
+            GaugeMetricFamily(
+                'drugs_catalog_interactions', 'Interactions in the database by severity', labels=['severity'],
+            ),
+        ]
+
+
+CATALOG = CatalogCollector()
+if not MULTIPROCESS_DIR:
+    REGISTRY.register(CATALOG)
+
+
+def exposition():
+    """Return ``(body, content_type)`` for a scrape"""
+    registry = REGISTRY
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(CATALOG)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def scrape_allowed(request):
+    """True if the client address is in ``METRICS_ALLOWED_IPS``"""
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network.strip(), strict=False)
+        for network in settings.METRICS_ALLOWED_IPS if network.strip()
+    )
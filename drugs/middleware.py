@@ -0,0 +1,110 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import Resolver404, resolve
+
+from . import perf, routers
+
+# Views whose reads may be served by a replica
+REPLICA_VIEW_MODULES = ('drugs.views', 'drugs.async_views')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send the reads of public (``drugs.views``) requests to one read
+    replica, including the body of streaming responses. Installed only
+    when replicas are configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        alias = self.replica_for(request)
+        with routers.use_replica(alias):
+            response = self.get_response(request)
+        return self.stream_from(response, alias)
+
+    async def __acall__(self, request):
+        alias = self.replica_for(request)
+        with routers.use_replica(alias):
+            response = await self.get_response(request)
+        return self.stream_from(response, alias)
+
+    def replica_for(self, request):
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return None
+        if match.func.__module__ in REPLICA_VIEW_MODULES:
+            return routers.choose_replica()
+        return None
+
+    def stream_from(self, response, alias):
+        if alias and isinstance(response, StreamingHttpResponse) and not response.is_async:
+            response.streaming_content = _read_from(response.streaming_content, alias)
+        return response
+
+
+def _read_from(content, alias):
+    """Produce each chunk of ``content`` with reads routed to ``alias``"""
+    iterator = iter(content)
+    while True:
+        with routers.use_replica(alias):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class PerfMiddleware:
+    """
+    Time each request (see ``drugs.perf``): ``Server-Timing`` header, a log
+    line and per-route percentiles. Installed only with
+    ``PERF_INSTRUMENTATION``; for streaming responses only the time until
+    the response starts is measured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.log = getattr(settings, 'PERF_LOG', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        timings, token = perf.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            perf.stop(token)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        timings, token = perf.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perf.stop(token)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    def report(self, request, response, timings, wall):
+        route = perf.route_name(request)
+        response.headers['Server-Timing'] = perf.server_timing(timings, wall)
+        perf.route_stats.record(route, timings, wall)
+        if self.log:
+            perf.log(route, response.status_code, timings, wall)
+        return response
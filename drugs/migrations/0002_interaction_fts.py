@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+# The FTS5 table as drugs.search defined it when this migration was written
+FTS_TABLE = 'drugs_interaction_fts'
+CREATE_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "drug1_name, drug2_name, drug1_hoat_chat, drug2_hoat_chat, mechanism, consequence, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+POPULATE_FTS = (
+    f"INSERT INTO {FTS_TABLE} (rowid, drug1_name, drug2_name, drug1_hoat_chat, drug2_hoat_chat, "
+    "mechanism, consequence) "
+    "SELECT i.id, d1.ten_thuoc, d2.ten_thuoc, d1.hoat_chat, d2.hoat_chat, i.mechanism, i.consequence "
+    "FROM drugs_druginteraction i "
+    "JOIN drugs_drug d1 ON d1.id = i.drug1_id "
+    "JOIN drugs_drug d2 ON d2.id = i.drug2_id"
+)
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_FTS)
+        cursor.execute(POPULATE_FTS)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+from drugs.text import normalize_text
+
+
+def backfill_normalized_fields(apps, schema_editor):
+    Drug = apps.get_model('drugs', 'Drug')
+    drugs = []
+    for drug in Drug.objects.only('id', 'ten_thuoc', 'hoat_chat', 'nhom_thuoc').iterator():
+        drug.ten_thuoc_norm = normalize_text(drug.ten_thuoc)
+        drug.hoat_chat_norm = normalize_text(drug.hoat_chat)
+        drug.nhom_thuoc_norm = normalize_text(drug.nhom_thuoc)
+        drugs.append(drug)
+    Drug.objects.bulk_update(
+        drugs, ['ten_thuoc_norm', 'hoat_chat_norm', 'nhom_thuoc_norm'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0002_interaction_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drug',
+            name='hoat_chat_norm',
+            field=models.TextField(blank=True, db_index=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='nhom_thuoc_norm',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='ten_thuoc_norm',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_normalized_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0003_drug_normalized_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Phiên bản dữ liệu',
+                'verbose_name_plural': 'Phiên bản dữ liệu',
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def populate_counters(apps, schema_editor):
+    Drug = apps.get_model('drugs', 'Drug')
+    DrugInteraction = apps.get_model('drugs', 'DrugInteraction')
+    StatCounter = apps.get_model('drugs', 'StatCounter')
+    now = django.utils.timezone.now()
+
+    drugs = Drug.objects.aggregate(total=models.Count('id'), last=models.Max('sys_updated_on'))
+    interactions = DrugInteraction.objects.aggregate(total=models.Count('id'), last=models.Max('updated_at'))
+    rows = [
+        StatCounter(key='drugs', value=drugs['total'], updated_at=drugs['last'] or now),
+        StatCounter(key='interactions', value=interactions['total'], updated_at=interactions['last'] or now),
+    ]
+    for severity in ['contraindicated', 'major', 'moderate', 'minor']:
+        rows.append(StatCounter(
+            key=f'interactions:{severity}',
+            value=DrugInteraction.objects.filter(severity=severity).count(),
+            updated_at=interactions['last'] or now,
+        ))
+    StatCounter.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0004_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Bộ đếm thống kê',
+                'verbose_name_plural': 'Bộ đếm thống kê',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0005_statcounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='drug',
+            name='sys_updated_on',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Ngày cập nhật'),
+        ),
+        migrations.AlterField(
+            model_name='druginteraction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Ngày cập nhật'),
+        ),
+    ]
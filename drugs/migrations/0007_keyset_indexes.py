@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0006_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='drug',
+            index=models.Index(fields=['ten_thuoc', 'id'], name='drug_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='druginteraction',
+            index=models.Index(fields=['created_at', 'id'], name='interaction_created_id_idx'),
+        ),
+    ]
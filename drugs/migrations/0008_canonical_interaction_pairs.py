@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# The FTS5 table as drugs.search defined it when this migration was written
+FTS_TABLE = 'drugs_interaction_fts'
+CREATE_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "drug1_name, drug2_name, drug1_hoat_chat, drug2_hoat_chat, mechanism, consequence, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+POPULATE_FTS = (
+    f"INSERT INTO {FTS_TABLE} (rowid, drug1_name, drug2_name, drug1_hoat_chat, drug2_hoat_chat, "
+    "mechanism, consequence) "
+    "SELECT i.id, d1.ten_thuoc, d2.ten_thuoc, d1.hoat_chat, d2.hoat_chat, i.mechanism, i.consequence "
+    "FROM drugs_druginteraction i "
+    "JOIN drugs_drug d1 ON d1.id = i.drug1_id "
+    "JOIN drugs_drug d2 ON d2.id = i.drug2_id"
+)
+
+
+def canonicalize_pairs(apps, schema_editor):
+    """
+    Store every pair as (smaller id, larger id). When both A-B and B-A
+    exist, keep the most recently updated row. Self-pairs are dropped.
+    """
+    DrugInteraction = apps.get_model('drugs', 'DrugInteraction')
+    StatCounter = apps.get_model('drugs', 'StatCounter')
+    alias = schema_editor.connection.alias
+    interactions = DrugInteraction.objects.using(alias)
+    counters = StatCounter.objects.using(alias)
+
+    interactions.filter(drug1=models.F('drug2')).delete()
+    reversed_rows = interactions.filter(drug1__gt=models.F('drug2')).order_by('id')
+    for interaction in reversed_rows.iterator():
+        existing = interactions.filter(
+            drug1_id=interaction.drug2_id, drug2_id=interaction.drug1_id
+        ).first()
+        if existing is not None:
+            if existing.updated_at >= interaction.updated_at:
+                interaction.delete()
+                continue
+            existing.delete()
+        interactions.filter(pk=interaction.pk).update(
+            drug1_id=interaction.drug2_id, drug2_id=interaction.drug1_id
+        )
+
+    # Deduplication bypasses signals: refresh the interaction counters
+    counters.filter(key='interactions').update(value=interactions.count())
+    for severity in ['contraindicated', 'major', 'moderate', 'minor']:
+        counters.filter(key=f'interactions:{severity}').update(
+            value=interactions.filter(severity=severity).count()
+        )
+
+
+def rebuild_search_index(apps, schema_editor):
+    """Re-create the FTS index of migration 0002 for the deduplicated rows"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        cursor.execute(CREATE_FTS)
+        cursor.execute(POPULATE_FTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_pairs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='druginteraction',
+            name='drug1',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='interactions_as_drug1', to='drugs.drug', verbose_name='Thuốc 1'),
+        ),
+        migrations.AlterField(
+            model_name='druginteraction',
+            name='drug2',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='interactions_as_drug2', to='drugs.drug', verbose_name='Thuốc 2'),
+        ),
+        migrations.AddIndex(
+            model_name='druginteraction',
+            index=models.Index(fields=['drug2', 'drug1'], name='interaction_drug2_drug1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='druginteraction',
+            index=models.Index(fields=['severity', 'created_at'], name='interaction_severity_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='druginteraction',
+            constraint=models.CheckConstraint(check=models.Q(('drug1__lt', models.F('drug2'))), name='interaction_canonical_pair'),
+        ),
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# Trigram GIN indexes serving the substring searches used on PostgreSQL
+# (SQLite uses the FTS5 index instead). The expressions match the SQL
+# Django generates: "col"::text LIKE ... for contains and
+# UPPER("col"::text) LIKE UPPER(...) for icontains.
+TRIGRAM_INDEXES = [
+    ('drug_ten_thuoc_norm_trgm', 'drugs_drug', '("ten_thuoc_norm"::text) gin_trgm_ops'),
+    ('drug_hoat_chat_norm_trgm', 'drugs_drug', '("hoat_chat_norm"::text) gin_trgm_ops'),
+    ('drug_nhom_thuoc_norm_trgm', 'drugs_drug', '("nhom_thuoc_norm"::text) gin_trgm_ops'),
+    ('drug_ten_thuoc_upper_trgm', 'drugs_drug', '(UPPER("ten_thuoc"::text)) gin_trgm_ops'),
+    ('drug_hoat_chat_upper_trgm', 'drugs_drug', '(UPPER("hoat_chat"::text)) gin_trgm_ops'),
+    ('interaction_mechanism_trgm', 'drugs_druginteraction', '(UPPER("mechanism"::text)) gin_trgm_ops'),
+    ('interaction_consequence_trgm', 'drugs_druginteraction', '(UPPER("consequence"::text)) gin_trgm_ops'),
+]
+
+
+def trigram_available(schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Without the pg_trgm extension (contrib) searches still work, unindexed
+    if not trigram_available(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" USING gin ({expression})')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0008_canonical_interaction_pairs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
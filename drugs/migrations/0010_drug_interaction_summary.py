@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:37
+
+from django.db import migrations, models
+from django.db.models import Case, Count, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+
+# Most severe first, with the Drug.risk_level each one sets
+SEVERITY_LEVELS = [('contraindicated', 4), ('major', 3), ('moderate', 2), ('minor', 1)]
+
+
+def summarize_interactions(apps, schema_editor):
+    """Fill in the summaries of existing drugs (as drugs.summaries.rebuild())"""
+    Drug = apps.get_model('drugs', 'Drug')
+    DrugInteraction = apps.get_model('drugs', 'DrugInteraction')
+    alias = schema_editor.connection.alias
+    interactions = DrugInteraction.objects.using(alias).order_by()
+
+    def side(column, aggregate):
+        rows = interactions.filter(**{column: OuterRef('pk')}).values(column)
+        return Subquery(rows.annotate(value=aggregate).values('value'))
+
+    def total(severity=None):
+        count = Count('id', filter=Q(severity=severity) if severity else None)
+        return (
+            Coalesce(side('drug1', count), 0, output_field=models.IntegerField())
+            + Coalesce(side('drug2', count), 0, output_field=models.IntegerField())
+        )
+
+    first, second = (side(column, Max('updated_at')) for column in ('drug1', 'drug2'))
+    drugs = Drug.objects.using(alias)
+    drugs.update(
+        interaction_count=total(),
+        interactions_updated_at=Greatest(Coalesce(first, second), Coalesce(second, first)),
+        **{f'{severity}_count': total(severity) for severity, level in SEVERITY_LEVELS},
+    )
+    drugs.update(risk_level=Case(
+        *[When(**{f'{severity}_count__gt': 0}, then=Value(level)) for severity, level in SEVERITY_LEVELS],
+        default=Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0009_postgresql_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drug',
+            name='contraindicated_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Chống chỉ định'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='interaction_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Số tương tác'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='interactions_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Tương tác cập nhật lúc'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='major_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nghiêm trọng'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='minor_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nhẹ'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='moderate_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Trung bình'),
+        ),
+        migrations.AddField(
+            model_name='drug',
+            name='risk_level',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Mức nguy cơ'),
+        ),
+        migrations.AddIndex(
+            model_name='drug',
+            index=models.Index(fields=['risk_level', 'interaction_count', 'id'], name='drug_risk_idx'),
+        ),
+        migrations.RunPython(summarize_interactions, migrations.RunPython.noop),
+    ]
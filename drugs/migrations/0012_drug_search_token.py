@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:07
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copy of drugs.text.words() applied to the normalized columns
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+MAX_WORD_LENGTH = 100
+
+
+def index_drug_words(apps, schema_editor):
+    Drug = apps.get_model('drugs', 'Drug')
+    DrugSearchToken = apps.get_model('drugs', 'DrugSearchToken')
+    alias = schema_editor.connection.alias
+    rows = Drug.objects.using(alias).order_by().values_list(
+        'id', 'ten_thuoc_norm', 'hoat_chat_norm', 'nhom_thuoc_norm'
+    )
+    tokens = []
+    for drug_id, *values in rows.iterator(chunk_size=2000):
+        found = {word[:MAX_WORD_LENGTH] for value in values for word in WORD_RE.findall(value)}
+        tokens.extend(DrugSearchToken(drug_id=drug_id, token=token) for token in found)
+        if len(tokens) >= 5000:
+            DrugSearchToken.objects.using(alias).bulk_create(tokens)
+            tokens = []
+    DrugSearchToken.objects.using(alias).bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0011_dataversion_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DrugSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('drug', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='drugs.drug')),
+            ],
+            options={
+                'verbose_name': 'Từ khóa tìm kiếm',
+                'verbose_name_plural': 'Từ khóa tìm kiếm',
+                'indexes': [models.Index(fields=['token', 'drug'], name='drug_search_token_idx', opclasses=['varchar_pattern_ops', 'varchar_pattern_ops'])],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='drugsearchtoken',
+            constraint=models.UniqueConstraint(fields=('drug', 'token'), name='drug_search_token_unique'),
+        ),
+        migrations.RunPython(index_drug_words, migrations.RunPython.noop),
+    ]
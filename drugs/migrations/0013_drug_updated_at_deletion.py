@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0012_drug_search_token'),
+    ]
+
+    operations = [
+        # Existing drugs get the migration time, so the next incremental
+        # export resends them all once
+        migrations.AddField(
+            model_name='drug',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Cập nhật lúc'),
+        ),
+        migrations.CreateModel(
+            name='Deletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.CharField(max_length=50)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Bản ghi đã xóa',
+                'verbose_name_plural': 'Bản ghi đã xóa',
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='deletion_model_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:11
+
+from django.db import migrations, models
+import drugs.expressions
+
+
+def reorder_pairs(apps, schema_editor):
+    """
+    Swap pairs that 0008 ordered by the database collation but are not in
+    code point order. The old constraint left one row per pair, so a swap
+    never collides with an existing row.
+    """
+    DrugInteraction = apps.get_model('drugs', 'DrugInteraction')
+    interactions = DrugInteraction.objects.using(schema_editor.connection.alias)
+    interactions.filter(drug1__gt=drugs.expressions.BinaryCollate(models.F('drug2'))).update(
+        drug1_id=models.F('drug2_id'), drug2_id=models.F('drug1_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drugs', '0013_drug_updated_at_deletion'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='druginteraction',
+            name='interaction_canonical_pair',
+        ),
+        migrations.RunPython(reorder_pairs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='druginteraction',
+            constraint=models.CheckConstraint(check=models.Q(('drug1__lt', drugs.expressions.BinaryCollate(models.F('drug2')))), name='interaction_canonical_pair'),
+        ),
+    ]
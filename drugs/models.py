@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F
 from django.utils import timezone
 
+from .expressions import BinaryCollate
+from .text import MAX_WORD_LENGTH, normalize_text, words
+
 
 class Drug(models.Model):
     """Model for storing drug information"""
@@ -17,18 +21,136 @@ class Drug(models.Model):
     sys_created_by = models.CharField(max_length=100, verbose_name="Tạo bởi", blank=True)
     sys_updated_by = models.CharField(max_length=100, verbose_name="Cập nhật bởi", blank=True)
     sys_created_on = models.DateTimeField(verbose_name="Ngày tạo", default=timezone.now)
-    sys_updated_on = models.DateTimeField(verbose_name="Ngày cập nhật", default=timezone.now)
+    sys_updated_on = models.DateTimeField(verbose_name="Ngày cập nhật", default=timezone.now, db_index=True)
     sys_mod_count = models.CharField(max_length=10, verbose_name="Số lần sửa đổi", blank=True)
     sys_tags = models.TextField(verbose_name="Tags", blank=True)
+    # Moved by every write, unlike sys_updated_on from the source data;
+    # incremental exports (?since=) filter on it
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Cập nhật lúc")
+
+    # Diacritic-free, lowercased copies of the searchable fields
+    ten_thuoc_norm = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    hoat_chat_norm = models.TextField(blank=True, editable=False, db_index=True)
+    nhom_thuoc_norm = models.CharField(max_length=100, blank=True, editable=False, db_index=True)
+
+    # Interaction summary, maintained by drugs.summaries on every interaction
+    # write (see drugs.signals) and recomputed by rebuild_interaction_summaries
+    interaction_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Số tương tác")
+    contraindicated_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Chống chỉ định")
+    major_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nghiêm trọng")
+    moderate_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Trung bình")
+    minor_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Nhẹ")
+    # 0 without interactions, else 1 (minor) .. 4 (contraindicated)
+    risk_level = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Mức nguy cơ")
+    interactions_updated_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Tương tác cập nhật lúc")
+
+    NORMALIZED_FIELDS = {
+        'ten_thuoc': 'ten_thuoc_norm',
+        'hoat_chat': 'hoat_chat_norm',
+        'nhom_thuoc': 'nhom_thuoc_norm',
+    }
+    SUMMARY_FIELDS = [
+        'interaction_count', 'contraindicated_count', 'major_count', 'moderate_count', 'minor_count',
+        'risk_level', 'interactions_updated_at',
+    ]
 
     class Meta:
         verbose_name = "Thuốc"
         verbose_name_plural = "Thuốc"
         ordering = ['ten_thuoc']
+        indexes = [
+            models.Index(fields=['ten_thuoc', 'id'], name='drug_name_id_idx'),
+            models.Index(fields=['risk_level', 'interaction_count', 'id'], name='drug_risk_idx'),
+        ]
 
     def __str__(self):
         return self.ten_thuoc
 
+    @property
+    def worst_severity(self):
+        """Most severe interaction of the drug, or None"""
+        return DrugInteraction.severity_for_risk_level(self.risk_level)
+
+    @property
+    def severity_counts(self):
+        """``{severity: count}`` of the drug's interactions, most severe first"""
+        return {
+            severity: getattr(self, f'{severity}_count')
+            for severity, label in DrugInteraction.SEVERITY_CHOICES
+        }
+
+    def update_normalized_fields(self):
+        """Recompute the normalized search columns from the source fields"""
+        for source, target in self.NORMALIZED_FIELDS.items():
+            setattr(self, target, normalize_text(getattr(self, source)))
+
+    def search_words(self):
+        """Words of the normalized columns, as stored in ``DrugSearchToken``"""
+        found = set()
+        for target in self.NORMALIZED_FIELDS.values():
+            found |= words(getattr(self, target))
+        return found
+
+    def save(self, *args, **kwargs):
+        self.update_normalized_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # The summary may have changed since this instance was loaded
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SUMMARY_FIELDS
+            ]
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'updated_at'}
+            for source, target in self.NORMALIZED_FIELDS.items():
+                if source in update_fields:
+                    update_fields.add(target)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+
+class DrugSearchToken(models.Model):
+    """
+    One word of a drug's normalized name, ingredient or group, so word
+    prefix searches are index range scans (maintained by drugs.search)
+    """
+    drug = models.ForeignKey(Drug, on_delete=models.CASCADE, related_name='search_tokens', db_index=False)
+    token = models.CharField(max_length=MAX_WORD_LENGTH)
+
+    class Meta:
+        verbose_name = "Từ khóa tìm kiếm"
+        verbose_name_plural = "Từ khóa tìm kiếm"
+        constraints = [
+            models.UniqueConstraint(fields=['drug', 'token'], name='drug_search_token_unique'),
+        ]
+        indexes = [
+            # Pattern opclasses let PostgreSQL serve startswith from the index
+            models.Index(
+                fields=['token', 'drug'], name='drug_search_token_idx',
+                opclasses=['varchar_pattern_ops', 'varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.drug_id}: {self.token}"
+
+
+class DrugInteractionQuerySet(models.QuerySet):
+    def with_drugs(self, fields=None, drug_fields=('ten_thuoc',)):
+        """
+        Join both drugs into the same query and load only the columns a
+        listing needs, so rendering rows never triggers per-row queries.
+
+        ``fields`` limits the interaction columns (all by default) and
+        ``drug_fields`` the columns loaded for ``drug1``/``drug2``.
+        """
+        if fields is None:
+            fields = [field.name for field in self.model._meta.concrete_fields]
+        else:
+            fields = ['id', 'drug1', 'drug2', *fields]
+        related = [f'{drug}__{field}' for drug in ('drug1', 'drug2') for field in drug_fields]
+        return self.select_related('drug1', 'drug2').only(*fields, *related)
+
 
 class DrugInteraction(models.Model):
     """Model for storing drug-drug interactions"""
@@ -39,30 +161,158 @@ class DrugInteraction(models.Model):
         ('minor', 'Tương tác nhẹ'),
     ]
 
-    drug1 = models.ForeignKey(Drug, on_delete=models.CASCADE, related_name='interactions_as_drug1', verbose_name="Thuốc 1")
-    drug2 = models.ForeignKey(Drug, on_delete=models.CASCADE, related_name='interactions_as_drug2', verbose_name="Thuốc 2")
+    # Position in SEVERITY_CHOICES, most severe first
+    SEVERITY_RANK = {value: rank for rank, (value, label) in enumerate(SEVERITY_CHOICES)}
+    SEVERITY_LABELS = dict(SEVERITY_CHOICES)
+    # Drug.risk_level of a drug whose worst interaction has this severity
+    RISK_LEVELS = {value: level for level, (value, label) in enumerate(reversed(SEVERITY_CHOICES), start=1)}
+    # Bootstrap color class per severity
+    SEVERITY_COLORS = {
+        'contraindicated': 'danger',
+        'major': 'warning',
+        'moderate': 'info',
+        'minor': 'success',
+    }
+
+    # Pairs are unordered and stored once with drug1_id < drug2_id. The
+    # composite indexes below cover both columns, so no single-column FK indexes.
+    drug1 = models.ForeignKey(Drug, on_delete=models.CASCADE, related_name='interactions_as_drug1', verbose_name="Thuốc 1", db_index=False)
+    drug2 = models.ForeignKey(Drug, on_delete=models.CASCADE, related_name='interactions_as_drug2', verbose_name="Thuốc 2", db_index=False)
     mechanism = models.TextField(verbose_name="Cơ chế tương tác")
     consequence = models.TextField(verbose_name="Hậu quả")
     management = models.TextField(verbose_name="Xử trí")
     severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES, default='moderate', verbose_name="Mức độ")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")
-    updated_at = models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật", db_index=True)
+
+    objects = DrugInteractionQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Tương tác thuốc"
         verbose_name_plural = "Tương tác thuốc"
         unique_together = ['drug1', 'drug2']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='interaction_created_id_idx'),
+            models.Index(fields=['drug2', 'drug1'], name='interaction_drug2_drug1_idx'),
+            models.Index(fields=['severity', 'created_at'], name='interaction_severity_idx'),
+        ]
+        constraints = [
+            # Byte-wise, so the database agrees with canonicalize() under any collation
+            models.CheckConstraint(
+                check=models.Q(drug1__lt=BinaryCollate(F('drug2'))), name='interaction_canonical_pair'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.drug1.ten_thuoc} - {self.drug2.ten_thuoc}"
 
+    def canonicalize(self):
+        """Order the pair so the smaller drug id (by code point) is drug1"""
+        if self.drug1_id and self.drug2_id and self.drug1_id > self.drug2_id:
+            self.drug1_id, self.drug2_id = self.drug2_id, self.drug1_id
+
+    def clean(self):
+        # Runs before validate_unique(), so B-A is reported as a duplicate of A-B
+        self.canonicalize()
+
+    def save(self, *args, **kwargs):
+        self.canonicalize()
+        # The post_save handlers update the drugs' interaction summaries
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
     def get_severity_color(self):
         """Return Bootstrap color class based on severity"""
-        colors = {
-            'contraindicated': 'danger',
-            'major': 'warning',
-            'moderate': 'info',
-            'minor': 'success',
-        }
-        return colors.get(self.severity, 'secondary') 
\ No newline at end of file
+        return self.SEVERITY_COLORS.get(self.severity, 'secondary')
+
+    @classmethod
+    def severity_for_risk_level(cls, level):
+        """Inverse of ``RISK_LEVELS`` (None for 0)"""
+        if not level:
+            return None
+        return cls.SEVERITY_CHOICES[len(cls.SEVERITY_CHOICES) - level][0]
+
+
+class DataVersion(models.Model):
+    """Monotonic counter bumped on every drug/interaction change"""
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    # Time of the last bump: a Last-Modified that admin edits also move
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    DATA = 'data'
+    # Drug rows only, for the drug name indexes
+    DRUGS = 'drugs'
+
+    class Meta:
+        verbose_name = "Phiên bản dữ liệu"
+        verbose_name_plural = "Phiên bản dữ liệu"
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+    @classmethod
+    def current(cls, key=DATA):
+        """Return the current version number (0 if never bumped)"""
+        version = cls.objects.filter(key=key).values_list('version', flat=True).first()
+        return version or 0
+
+    @classmethod
+    async def acurrent(cls, key=DATA):
+        version = await cls.objects.filter(key=key).values_list('version', flat=True).afirst()
+        return version or 0
+
+    @classmethod
+    def bump(cls, key=DATA):
+        """Increment the version inside the caller's transaction"""
+        now = timezone.now()
+        updated = cls.objects.filter(key=key).update(version=F('version') + 1, updated_at=now)
+        if not updated:
+            cls.objects.get_or_create(key=key, defaults={'version': 1, 'updated_at': now})
+
+
+class StatCounter(models.Model):
+    """Incrementally maintained row counts backing the statistics views"""
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Bộ đếm thống kê"
+        verbose_name_plural = "Bộ đếm thống kê"
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+    @classmethod
+    def add(cls, key, delta=0):
+        """Atomically add ``delta`` to a counter and touch its timestamp"""
+        now = timezone.now()
+        updated = cls.objects.filter(key=key).update(value=F('value') + delta, updated_at=now)
+        if not updated:
+            counter, created = cls.objects.get_or_create(key=key, defaults={'value': delta, 'updated_at': now})
+            if not created:
+                cls.objects.filter(key=key).update(value=F('value') + delta, updated_at=now)
+
+
+
+class Deletion(models.Model):
+    """Tombstone of a deleted drug or interaction, for incremental exports"""
+    model = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=50)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Bản ghi đã xóa"
+        verbose_name_plural = "Bản ghi đã xóa"
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='deletion_model_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+    @classmethod
+    def record(cls, instance):
+        cls.objects.create(model=instance._meta.model_name, object_id=str(instance.pk))
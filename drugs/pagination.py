@@ -0,0 +1,185 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+``PageNumberPagination`` runs ``COUNT(*)`` on every page and its OFFSET
+grows with the page number. In keyset mode the cursor carries the sort
+key of the last row seen, so every page is an index range scan of
+``page_size + 1`` rows, and the total count is only computed on request.
+
+The mode is opt-in per request: ``?pagination=cursor`` or any request
+carrying a ``?cursor=`` token. It is refused (400) for querysets ordered
+otherwise, such as search results ranked by relevance.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core import exceptions
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering, page_size):
+        # ordering: e.g. ('ten_thuoc', 'id') or ('-created_at', '-id'); the
+        # last field must be unique so the key identifies exactly one row.
+        self.ordering = list(ordering)
+        self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        if queryset.query.order_by and list(queryset.query.order_by) != self.ordering:
+            # The cursor only knows the keyset ordering, not e.g. the
+            # relevance order of a search
+            raise ValidationError({
+                'pagination': ['Search results (?q=, ?query=) are ordered by relevance; use page numbers'],
+            })
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor['reverse'])
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.order_by().count()
+
+        ordering = self._invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(ordering, cursor['values']))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._key(self.page[0]), reverse=True)
+
+    def _key(self, obj):
+        # Rows are model instances or values() dicts
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in self.ordering]
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    @staticmethod
+    def _invert(ordering):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+    @staticmethod
+    def _after(ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering``, written as
+        ``a >= x AND (a > x OR (a = x AND b > y))`` so the leading column
+        can drive an index range scan.
+        """
+        condition = Q()
+        for index in reversed(range(len(ordering))):
+            field = ordering[index].lstrip('-')
+            lookup = 'lt' if ordering[index].startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            if index < len(ordering) - 1:
+                step |= Q(**{field: values[index]}) & condition
+            condition = step
+        first = ordering[0].lstrip('-')
+        bound = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{first}__{bound}': values[0]}) & condition
+
+    def encode_cursor(self, values, reverse):
+        payload = {
+            'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+            'r': int(reverse),
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        url = replace_query_param(self.base_url, self.cursor_query_param, token)
+        return remove_query_param(url, 'page')
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            values = payload['v']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        for index, field_name in enumerate(self.ordering):
+            field = model._meta.get_field(field_name.lstrip('-'))
+            value = values[index]
+            # Only scalars, converted as the model field would, so a crafted
+            # token cannot reach the query with a value the ORM rejects
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                values[index] = field.to_python(value)
+            except (exceptions.ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if values[index] is None:
+                raise NotFound(self.invalid_cursor_message)
+            if isinstance(values[index], datetime.datetime) and timezone.is_naive(values[index]):
+                values[index] = timezone.make_aware(values[index], datetime.timezone.utc)
+        return {'values': values, 'reverse': reverse}
+
+    def get_schema_operation_parameters(self, view):
+        return []
+
+
+class KeysetPaginationMixin:
+    """
+    Viewset mixin that switches to ``KeysetPagination`` on request.
+
+    Set ``keyset_ordering`` to an indexed, unique ordering.
+    """
+    keyset_ordering = None
+
+    def use_keyset_pagination(self):
+        params = self.request.query_params
+        return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request is not None and self.keyset_ordering and self.use_keyset_pagination():
+                default = self.pagination_class() if self.pagination_class else None
+                page_size = getattr(default, 'page_size', None) or 20
+                self._paginator = KeysetPagination(self.keyset_ordering, page_size)
+            else:
+                return super().paginator
+        return self._paginator
@@ -0,0 +1,221 @@
+"""
+Per-request performance instrumentation (``settings.PERF_INSTRUMENTATION``).
+
+``PerfMiddleware`` opens a ``RequestTimings`` collector for each request;
+while it is active the hooks below add to it:
+
+* database: an execute wrapper on every connection (query count and time);
+* serialization: serializer ``.data``, the values() fast path and JSON
+  rendering (``timed('serialize')``);
+* templates: ``TimedDjangoTemplates``, a template backend timing each render.
+
+The middleware reports them in a ``Server-Timing`` header and a JSON log
+line (logger ``drugs.perf``) and keeps the last ``PERF_BUFFER_SIZE``
+samples per route for percentiles at ``/api/_perf/``. Buffers are per
+process. When instrumentation is off none of the hooks are installed and
+``timed()`` costs one context variable lookup.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger('drugs.perf')
+
+_current = ContextVar('perf_timings', default=None)
+
+KINDS = ('db', 'serialize', 'template')
+
+
+def enabled():
+    return getattr(settings, 'PERF_INSTRUMENTATION', False)
+
+
+class RequestTimings:
+    """Time spent per kind (seconds) and query count of one request"""
+    __slots__ = ('db', 'serialize', 'template', 'queries')
+
+    def __init__(self):
+        self.db = self.serialize = self.template = 0.0
+        self.queries = 0
+
+    def add(self, kind, seconds):
+        setattr(self, kind, getattr(self, kind) + seconds)
+
+
+def start():
+    """Begin collecting for the current request; returns (timings, token)"""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+class timed:
+    """Add the time spent in the block to the current request's ``kind``"""
+    __slots__ = ('kind', 'timings', 'started')
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.kind, time.perf_counter() - self.started)
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_execute_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver"""
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+class TimedSerializerMixin:
+    """Count building ``.data`` as serialization time"""
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class TimedTemplate:
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return self.template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose templates report their render time"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def server_timing(timings, wall):
+    other = max(wall - timings.db - timings.serialize - timings.template, 0.0)
+    return ', '.join([
+        f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+        f'serialize;dur={timings.serialize * 1000:.2f}',
+        f'template;dur={timings.template * 1000:.2f}',
+        f'app;dur={other * 1000:.2f}',
+        f'total;dur={wall * 1000:.2f}',
+    ])
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} {match.view_name if match else "unresolved"}'
+
+
+def log(route, status, timings, wall):
+    logger.info(json.dumps({
+        'route': route,
+        'status': status,
+        'wall_ms': round(wall * 1000, 2),
+        'db_queries': timings.queries,
+        'db_ms': round(timings.db * 1000, 2),
+        'serialize_ms': round(timings.serialize * 1000, 2),
+        'template_ms': round(timings.template * 1000, 2),
+    }))
+
+
+class RouteStats:
+    """Ring buffer of the latest samples per route"""
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = {}
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def record(self, route, timings, wall):
+        sample = (wall, timings.db, timings.queries, timings.serialize, timings.template)
+        with self.lock:
+            buffer = self.samples.get(route)
+            if buffer is None:
+                buffer = self.samples[route] = deque(maxlen=self.size)
+            buffer.append(sample)
+            self.totals[route] = self.totals.get(route, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            samples = {route: list(buffer) for route, buffer in self.samples.items()}
+            totals = dict(self.totals)
+        routes = {}
+        for route, rows in sorted(samples.items()):
+            wall, db, queries, serialize, template = zip(*rows)
+            routes[route] = {
+                'requests': totals[route],
+                'samples': len(rows),
+                'wall_ms': percentiles(wall),
+                'db_ms': percentiles(db),
+                'db_queries_avg': round(sum(queries) / len(queries), 2),
+                'serialize_ms': percentiles(serialize),
+                'template_ms': percentiles(template),
+            }
+        return routes
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+
+
+def percentiles(values):
+    """Nearest-rank p50/p95/p99 in milliseconds"""
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        name: round(ordered[min(last, int(fraction * len(ordered)))] * 1000, 2)
+        for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+    }
+
+
+route_stats = RouteStats(getattr(settings, 'PERF_BUFFER_SIZE', 1000))
@@ -0,0 +1,54 @@
+"""
+Read replica routing.
+
+Every database alias other than ``default`` is a read replica (see
+``DB_REPLICAS`` in settings). Requests served by the public views
+(``drugs.views`` and ``drugs.async_views``) read from one replica, chosen
+per request by ``ReplicaRoutingMiddleware``; everything else (the admin,
+management commands such as imports) and every write uses the primary,
+so editors always read their own writes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_replica = ContextVar('replica', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def choose_replica():
+    aliases = replica_aliases()
+    return random.choice(aliases) if aliases else None
+
+
+@contextmanager
+def use_replica(alias):
+    """Route reads inside the block to ``alias`` (None: the primary)"""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,353 @@
+"""
+Full-text search for drug interactions backed by an SQLite FTS5 index.
+
+The ``drugs_interaction_fts`` virtual table holds one row per interaction
+(rowid = ``DrugInteraction.id``) with the searchable text of both drugs and
+of the interaction itself. It is kept in sync by the signal handlers in
+``drugs.signals`` and can be rebuilt with ``manage.py rebuild_search_index``.
+On other database backends an ``icontains`` filter is used, which
+PostgreSQL answers from the trigram indexes of migration 0009.
+
+Drug lookups use the words of the precomputed ``*_norm`` columns on
+``Drug``, stored one per row in ``DrugSearchToken``, so accent-free input
+such as "thuoc khang nam" matches "Thuốc kháng nấm" through index range
+scans. The words are kept in sync by ``drugs.signals`` and rebuilt with
+the interaction index.
+
+With ``fuzzy=True`` both searches fall back to the trigram index in
+``drugs.fuzzy`` when nothing matches exactly, so misspellings such as
+"itrakonazol" still find "Itraconazol".
+"""
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from . import fuzzy as fuzzy_index
+from . import graph, metrics
+from .models import Drug, DrugSearchToken
+from .text import normalize_text, words
+
+FTS_TABLE = 'drugs_interaction_fts'
+
+FTS_COLUMNS = [
+    'drug1_name',
+    'drug2_name',
+    'drug1_hoat_chat',
+    'drug2_hoat_chat',
+    'mechanism',
+    'consequence',
+]
+
+# Column weights for bm25(): drug names rank above ingredients, which rank
+# above matches in the free-text mechanism/consequence fields.
+FTS_WEIGHTS = [10.0, 10.0, 5.0, 5.0, 1.0, 1.0]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Fuzzy fallback: similar drugs considered per query word, and the most
+# interactions returned for them
+FUZZY_DRUG_LIMIT = 20
+FUZZY_INTERACTION_LIMIT = 500
+
+
+def fts_enabled():
+    """Return True when the interaction FTS index is available"""
+    return connection.vendor == 'sqlite'
+
+
+def create_index(cursor):
+    """Create the FTS5 virtual table if it does not exist"""
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(FTS_COLUMNS)}, "
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_index(cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _select_documents(where=''):
+    return (
+        "SELECT i.id, d1.ten_thuoc, d2.ten_thuoc, d1.hoat_chat, d2.hoat_chat, "
+        "i.mechanism, i.consequence "
+        "FROM drugs_druginteraction i "
+        "JOIN drugs_drug d1 ON d1.id = i.drug1_id "
+        "JOIN drugs_drug d2 ON d2.id = i.drug2_id " + where
+    )
+
+
+def _insert_documents(cursor, where='', params=()):
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+        + _select_documents(where),
+        params,
+    )
+
+
+def rebuild_index():
+    """Drop and repopulate the whole FTS index. Returns the row count."""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        drop_index(cursor)
+        create_index(cursor)
+        _insert_documents(cursor)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def index_drug_words(drug):
+    """Replace the stored search words of one drug"""
+    DrugSearchToken.objects.filter(drug_id=drug.pk).delete()
+    DrugSearchToken.objects.bulk_create(
+        DrugSearchToken(drug_id=drug.pk, token=token) for token in drug.search_words()
+    )
+
+
+def rebuild_drug_words(batch_size=5000):
+    """Recreate every drug's search words. Returns the number of words."""
+    fields = list(Drug.NORMALIZED_FIELDS.values())
+    count = 0
+    with transaction.atomic():
+        DrugSearchToken.objects.all().delete()
+        tokens = []
+        for drug in Drug.objects.order_by().only('id', *fields).iterator(chunk_size=2000):
+            tokens.extend(DrugSearchToken(drug_id=drug.pk, token=token) for token in drug.search_words())
+            if len(tokens) >= batch_size:
+                DrugSearchToken.objects.bulk_create(tokens)
+                count, tokens = count + len(tokens), []
+        DrugSearchToken.objects.bulk_create(tokens)
+    return count + len(tokens)
+
+
+def index_interaction(interaction_id):
+    """(Re)index a single interaction"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [interaction_id])
+        _insert_documents(cursor, "WHERE i.id = %s", [interaction_id])
+
+
+def index_drug_interactions(drug_id):
+    """Reindex every interaction that involves the given drug"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ("
+            "SELECT id FROM drugs_druginteraction WHERE drug1_id = %s OR drug2_id = %s)",
+            [drug_id, drug_id],
+        )
+        _insert_documents(cursor, "WHERE i.drug1_id = %s OR i.drug2_id = %s", [drug_id, drug_id])
+
+
+def unindex_interaction(interaction_id):
+    """Remove an interaction from the FTS index"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [interaction_id])
+
+
+def build_match_expression(query):
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so
+    "itra dabi" finds the Itraconazol - Dabigatran interaction.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _icontains_filter(query):
+    # Drug matches as a subquery rather than conditions on joined tables,
+    # so each part can use the trigram index of its own table
+    drugs = Drug.objects.filter(
+        Q(ten_thuoc__icontains=query) | Q(hoat_chat__icontains=query)
+    ).values('id')
+    return (
+        Q(drug1__in=drugs) |
+        Q(drug2__in=drugs) |
+        Q(mechanism__icontains=query) |
+        Q(consequence__icontains=query)
+    )
+
+
+def search_interactions(queryset, query, fuzzy=False):
+    """
+    Restrict an interaction queryset to rows matching ``query``, best
+    matches first (BM25).
+
+    With ``fuzzy`` an empty result is replaced by the interactions of
+    drugs whose names are similar to the query words.
+    """
+    if not query:
+        return queryset
+    results = _match_interactions(queryset, query)
+    if fuzzy:
+        if not results.exists():
+            results = fuzzy_interactions(queryset, query)
+            _record_fallback('interactions', results)
+        else:
+            metrics.record_search('interactions', 'match')
+    return results
+
+
+async def asearch_interactions(queryset, query, fuzzy=False):
+    """Async counterpart of ``search_interactions()``"""
+    if not query:
+        return queryset
+    results = _match_interactions(queryset, query)
+    if fuzzy:
+        if not await results.aexists():
+            # The trigram index and interaction graph are built synchronously
+            results = await sync_to_async(fuzzy_interactions)(queryset, query)
+            _record_fallback('interactions', results)
+        else:
+            metrics.record_search('interactions', 'match')
+    return results
+
+
+def _record_fallback(target, results):
+    # The fuzzy searches return none() when nothing is similar enough
+    metrics.record_search(target, 'miss' if results.query.is_empty() else 'fuzzy')
+
+
+def _match_interactions(queryset, query):
+    if not fts_enabled():
+        return queryset.filter(_icontains_filter(query))
+
+    expression = build_match_expression(query)
+    if not expression:
+        return queryset.none()
+
+    # The MATCH runs once, as an uncorrelated rowid subquery, and bm25() is
+    # only computed for the matching rows
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    queryset = queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+    )
+    if 'search_rank' in queryset.query.annotations:
+        # Already searched (e.g. ?q= plus a further term): the first search
+        # keeps ranking the rows
+        return queryset
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    rank = RawSQL(
+        f'SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+        [expression],
+        output_field=FloatField(),
+    )
+    return queryset.annotate(search_rank=rank).order_by('search_rank', '-created_at')
+
+
+def _prefix_filter(fields, value):
+    """
+    Indexed equivalent of ``field LIKE 'value%'``: a range scan on SQLite,
+    whose LIKE cannot use the indexes, and ``startswith`` elsewhere (range
+    bounds are collation dependent on PostgreSQL)
+    """
+    sqlite = connection.vendor == 'sqlite'
+    condition = Q()
+    for field in fields:
+        if sqlite:
+            condition |= Q(**{f'{field}__gte': value, f'{field}__lt': value + '\uffff'})
+        else:
+            condition |= Q(**{f'{field}__startswith': value})
+    return condition
+
+
+def search_drugs(queryset, query, fuzzy=False):
+    """
+    Restrict a drug queryset to rows where every word of ``query`` starts
+    a word of the name, active ingredient or group, regardless of case
+    and diacritics.
+
+    Each word is an index range scan over ``DrugSearchToken``, so the
+    second ingredient of a combination product matches without a table
+    scan. Rows where a whole field starts with the query come first. With
+    ``fuzzy`` an empty result falls back to trigram similarity.
+    """
+    normalized = normalize_text(query)
+    query_words = sorted(words(normalized))
+    if not query_words:
+        return queryset
+
+    fields = list(queryset.model.NORMALIZED_FIELDS.values())
+    matches = queryset
+    for word in query_words:
+        tokens = DrugSearchToken.objects.filter(_prefix_filter(['token'], word))
+        matches = matches.filter(id__in=tokens.values('drug_id'))
+    if fuzzy:
+        if not matches.exists():
+            matches = fuzzy_drugs(queryset, query)
+            _record_fallback('drugs', matches)
+            return matches
+        metrics.record_search('drugs', 'match')
+    return matches.annotate(
+        match_rank=Case(When(_prefix_filter(fields, normalized), then=Value(0)), default=Value(1)),
+    ).order_by('match_rank', 'ten_thuoc', 'id')
+
+
+def _ranked(scores, lookup='id'):
+    """``CASE`` expression mapping each key in ``scores`` to its score"""
+    return Case(
+        *[When(**{lookup: key}, then=Value(score)) for key, score in scores.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def fuzzy_drugs(queryset, query, limit=FUZZY_DRUG_LIMIT):
+    """
+    Drugs whose name or active ingredient is most similar to ``query``,
+    annotated with ``similarity`` (0-1) and ordered by it.
+    """
+    scores = dict(fuzzy_index.get_index().search(query, limit))
+    if not scores:
+        return queryset.none()
+    return queryset.filter(id__in=list(scores)).annotate(
+        similarity=_ranked(scores)
+    ).order_by('-similarity', 'ten_thuoc')
+
+
+def fuzzy_interactions(queryset, query, limit=FUZZY_INTERACTION_LIMIT):
+    """
+    Interactions between drugs similar to the words of ``query``: every
+    word must match one of the two drugs. Rows are annotated with a
+    ``search_rank`` (lower is better, as with BM25).
+    """
+    index = fuzzy_index.get_index()
+    words = [dict(index.search(word, FUZZY_DRUG_LIMIT)) for word in dict.fromkeys(_TOKEN_RE.findall(query))]
+    if not words or not all(words):
+        return queryset.none()
+
+    interaction_graph = graph.get_graph()
+    scores = {}
+    for drug_id in min(words, key=len):
+        for edge in interaction_graph.edges_for(drug_id):
+            if edge.id in scores:
+                continue
+            total = 0.0
+            for matches in words:
+                score = max(matches.get(edge.drug1_id, 0.0), matches.get(edge.drug2_id, 0.0))
+                if not score:
+                    break
+                total += score
+            else:
+                scores[edge.id] = -total
+    if not scores:
+        return queryset.none()
+
+    best = dict(sorted(scores.items(), key=lambda item: (item[1], -item[0]))[:limit])
+    return queryset.filter(id__in=list(best)).annotate(
+        search_rank=_ranked(best)
+    ).order_by('search_rank', '-created_at')
@@ -0,0 +1,123 @@
+"""
+Result cache for interaction searches.
+
+Entries hold the ordered ids of one result page and the total match
+count, never rendered output, so any ``?fields=`` selection or template
+can be served from them. They live in the ``search`` cache alias
+(``settings.CACHES``): local memory by default, with LRU eviction past
+``MAX_ENTRIES``, or any other Django cache backend.
+
+Keys contain the current ``DataVersion``, so every write to drugs or
+interactions makes older entries unreachable; they age out through LRU
+eviction or their timeout. Parameters enter the key as sent, with only
+whitespace collapsed: the searches do not fold case or đ, so folding them
+here would serve one query's results for another.
+"""
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from . import metrics
+from .models import DataVersion, DrugInteraction
+
+CACHE_ALIAS = 'search'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def make_key(kind, page=1, page_size=None, **params):
+    """
+    Cache key for one result page, or None when the request must not be
+    cached (an unknown ``severity``). "itraconazol" and " itraconazol "
+    share an entry.
+    """
+    if not cacheable(params):
+        return None
+    return f'search:{DataVersion.current()}:{_digest(kind, page, page_size, params)}'
+
+
+async def amake_key(kind, page=1, page_size=None, **params):
+    if not cacheable(params):
+        return None
+    return f'search:{await DataVersion.acurrent()}:{_digest(kind, page, page_size, params)}'
+
+
+def cacheable(params):
+    severity = params.get('severity')
+    return not severity or severity in DrugInteraction.SEVERITY_RANK
+
+
+def _digest(kind, page, page_size, params):
+    normalized = {name: ' '.join(str(value).split()) for name, value in params.items() if value}
+    payload = json.dumps([kind, page, page_size, sorted(normalized.items())])
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """Return ``(ids, count, offset)`` or None"""
+    entry = get_cache().get(key)
+    metrics.record_cache(CACHE_ALIAS, entry is not None)
+    return entry
+
+
+async def aget(key):
+    entry = await get_cache().aget(key)
+    metrics.record_cache(CACHE_ALIAS, entry is not None)
+    return entry
+
+
+def store(key, ids, count, offset=0):
+    get_cache().set(key, (list(ids), count, offset))
+
+
+async def astore(key, ids, count, offset=0):
+    await get_cache().aset(key, (list(ids), count, offset))
+
+
+def row_id(row):
+    return row['id'] if isinstance(row, dict) else row.pk
+
+
+class CachedResults:
+    """
+    Stand-in for a search queryset on a cache hit.
+
+    It reports the cached total to the paginator and, when the page is
+    sliced, loads just the cached ids from ``queryset`` (an unfiltered
+    projection), in cached order.
+    """
+
+    def __init__(self, queryset, ids, count, offset=0):
+        self.queryset = queryset
+        self.ids = ids
+        self.total = count
+        self.offset = offset
+
+    @property
+    def query(self):
+        return self.queryset.query
+
+    @property
+    def ordered(self):
+        return True
+
+    def values(self, *fields):
+        return CachedResults(self.queryset.values(*fields), self.ids, self.total, self.offset)
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError('CachedResults only supports slicing')
+        start = (item.start or 0) - self.offset
+        stop = self.total if item.stop is None else item.stop - self.offset
+        ids = self.ids[max(start, 0):max(stop, 0)]
+        rows = {row_id(row): row for row in self.queryset.filter(id__in=ids)}
+        return [rows[pk] for pk in ids if pk in rows]
@@ -1,14 +1,41 @@
 from rest_framework import serializers
+from . import autocomplete
 from .models import Drug, DrugInteraction
+from .perf import TimedListSerializer, TimedSerializerMixin
+from .sparse import SparseFieldsSerializerMixin
 
 
-class DrugSerializer(serializers.ModelSerializer):
+class DrugSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    # Only present on fuzzy search results
+    similarity = serializers.FloatField(read_only=True)
+    # From the stored interaction summary (Drug.risk_level)
+    worst_severity = serializers.CharField(read_only=True, allow_null=True)
+
     class Meta:
         model = Drug
-        fields = '__all__'
+        exclude = ['ten_thuoc_norm', 'hoat_chat_norm', 'nhom_thuoc_norm', 'risk_level']
+        # Default for list views; ?expand= adds the source/sys_* fields and
+        # the per-severity interaction counts
+        compact_fields = [
+            'id', 'ten_thuoc', 'hoat_chat', 'phan_loai', 'nhom_thuoc', 'nuoc_dk',
+            'interaction_count', 'worst_severity', 'similarity',
+        ]
+        field_columns = {'similarity': [], 'worst_severity': ['risk_level']}
+        value_fields = {
+            'worst_severity': ('risk_level', DrugInteraction.severity_for_risk_level),
+        }
+        list_serializer_class = TimedListSerializer
+
+
+def severity_label(severity):
+    return DrugInteraction.SEVERITY_LABELS.get(severity, severity)
+
 
+def severity_color(severity):
+    return DrugInteraction.SEVERITY_COLORS.get(severity, 'secondary')
 
-class DrugInteractionSerializer(serializers.ModelSerializer):
+
+class DrugInteractionSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin, serializers.ModelSerializer):
     drug1_name = serializers.CharField(source='drug1.ten_thuoc', read_only=True)
     drug2_name = serializers.CharField(source='drug2.ten_thuoc', read_only=True)
     severity_display = serializers.CharField(source='get_severity_display', read_only=True)
@@ -17,8 +44,39 @@ class DrugInteractionSerializer(serializers.ModelSerializer):
     class Meta:
         model = DrugInteraction
         fields = '__all__'
+        # Default for list views; ?expand= adds mechanism/consequence/management
+        compact_fields = [
+            'id', 'drug1', 'drug1_name', 'drug2', 'drug2_name',
+            'severity', 'severity_display', 'severity_color', 'created_at', 'updated_at',
+        ]
+        field_columns = {'severity_display': ['severity'], 'severity_color': ['severity']}
+        # Lookup tables used instead of the model methods on the fast path
+        value_fields = {
+            'severity_display': ('severity', severity_label),
+            'severity_color': ('severity', severity_color),
+        }
+        list_serializer_class = TimedListSerializer
 
 
 class DrugSearchSerializer(serializers.Serializer):
     query = serializers.CharField(max_length=255, help_text="Tên thuốc hoặc hoạt chất để tìm kiếm")
-    severity = serializers.ChoiceField(choices=DrugInteraction.SEVERITY_CHOICES, required=False, help_text="Lọc theo mức độ tương tác") 
\ No newline at end of file
+    severity = serializers.ChoiceField(choices=DrugInteraction.SEVERITY_CHOICES, required=False, help_text="Lọc theo mức độ tương tác") 
+
+
+class DrugAutocompleteSerializer(serializers.Serializer):
+    prefix = serializers.CharField(max_length=255, allow_blank=True, default='', help_text="Phần đầu tên thuốc hoặc hoạt chất")
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=autocomplete.MAX_LIMIT,
+        default=autocomplete.DEFAULT_LIMIT,
+        help_text="Số gợi ý tối đa"
+    )
+
+
+class InteractionCheckSerializer(serializers.Serializer):
+    drugs = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        min_length=2,
+        max_length=100,
+        help_text="Danh sách mã thuốc (id) hoặc tên thuốc trong đơn"
+    )
@@ -0,0 +1,123 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import search, stats, summaries
+from .models import DataVersion, Deletion, Drug, DrugInteraction
+
+
+@receiver(post_save, sender=DrugInteraction)
+def index_interaction_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the full-text index in sync with interaction edits"""
+    if raw:
+        return
+    search.index_interaction(instance.pk)
+
+
+@receiver(post_delete, sender=DrugInteraction)
+def unindex_interaction_on_delete(sender, instance, **kwargs):
+    search.unindex_interaction(instance.pk)
+
+
+@receiver(post_save, sender=Drug)
+def index_drug_words_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Drug searches read the words of the normalized columns"""
+    if raw or (update_fields is not None and not set(update_fields) & set(Drug.NORMALIZED_FIELDS)):
+        return
+    search.index_drug_words(instance)
+
+
+@receiver(post_save, sender=Drug)
+def reindex_drug_interactions_on_save(sender, instance, created=False, raw=False, **kwargs):
+    """Drug names/ingredients are denormalized into the index"""
+    if raw or created:
+        return
+    search.index_drug_interactions(instance.pk)
+
+
+@receiver(post_save, sender=Drug)
+@receiver(post_delete, sender=Drug)
+@receiver(post_save, sender=DrugInteraction)
+@receiver(post_delete, sender=DrugInteraction)
+def bump_data_version(sender, **kwargs):
+    """Invalidate per-worker caches such as the interaction graph"""
+    DataVersion.bump()
+
+
+@receiver(post_save, sender=Drug)
+@receiver(post_delete, sender=Drug)
+def bump_drug_version(sender, **kwargs):
+    """Invalidate the drug name indexes, which interaction edits leave alone"""
+    DataVersion.bump(DataVersion.DRUGS)
+
+
+@receiver(pre_save, sender=DrugInteraction)
+def remember_previous_state(sender, instance, raw=False, using=None, **kwargs):
+    """Severity and pair before an edit, for the counters and summaries"""
+    instance._previous_severity = None
+    instance._previous_drug_ids = ()
+    if raw or instance.pk is None:
+        return
+    # Read from the database being written, never a replica
+    previous = sender.objects.using(using).filter(pk=instance.pk).values_list(
+        'severity', 'drug1_id', 'drug2_id'
+    ).first()
+    if previous is not None:
+        instance._previous_severity = previous[0]
+        instance._previous_drug_ids = previous[1:]
+
+
+@receiver(post_save, sender=DrugInteraction)
+def count_interaction_on_save(sender, instance, created=False, raw=False, **kwargs):
+    """Fixture loads (raw saves) are counted by ``manage.py rebuild_stats``"""
+    if raw:
+        return
+    if created:
+        stats.record_interaction_change(1, instance.severity)
+    else:
+        stats.record_interaction_change(
+            0, instance.severity, getattr(instance, '_previous_severity', None)
+        )
+
+
+@receiver(post_delete, sender=DrugInteraction)
+def count_interaction_on_delete(sender, instance, **kwargs):
+    stats.record_interaction_change(-1, instance.severity)
+
+
+@receiver(post_save, sender=DrugInteraction)
+def summarize_interaction_on_save(sender, instance, raw=False, **kwargs):
+    """Runs inside DrugInteraction.save()'s transaction"""
+    if raw:
+        return
+    summaries.record_interaction_change(
+        instance.severity,
+        (instance.drug1_id, instance.drug2_id),
+        getattr(instance, '_previous_severity', None),
+        getattr(instance, '_previous_drug_ids', ()),
+    )
+
+
+@receiver(post_delete, sender=DrugInteraction)
+def summarize_interaction_on_delete(sender, instance, **kwargs):
+    summaries.record_interaction_change(
+        None, (), instance.severity, (instance.drug1_id, instance.drug2_id),
+    )
+
+
+@receiver(post_save, sender=Drug)
+def count_drug_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    stats.record_drug_change(1 if created else 0)
+
+
+@receiver(post_delete, sender=Drug)
+def count_drug_on_delete(sender, instance, **kwargs):
+    stats.record_drug_change(-1)
+
+
+@receiver(post_delete, sender=Drug)
+@receiver(post_delete, sender=DrugInteraction)
+def record_deletion(sender, instance, **kwargs):
+    """Tombstones let incremental exports (?since=&deleted=true) report deletions"""
+    Deletion.record(instance)
@@ -0,0 +1,100 @@
+"""
+Sparse field selection for the REST API.
+
+``?fields=a,b`` returns only the named fields and ``?expand=c`` adds
+fields to the default set. List views default to the serializer's
+``Meta.compact_fields``; other views return every field. The selection
+also limits the SQL projection: the viewset hands ``sparse_columns()``
+to ``QuerySet.only()`` so unused text columns are never read.
+"""
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer mixin accepting ``fields=[...]`` to drop every other field.
+
+    ``Meta.field_columns`` maps fields that are not a plain model column
+    (method results, annotations) to the columns they read; dotted sources
+    such as ``drug1.ten_thuoc`` become ``drug1__ten_thuoc``.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_columns(self):
+        """Model lookups needed to render the selected fields"""
+        overrides = getattr(self.Meta, 'field_columns', {})
+        columns = []
+        for name, field in self.fields.items():
+            if name in overrides:
+                columns.extend(overrides[name])
+            elif field.source != '*':
+                columns.append(field.source.replace('.', '__'))
+        return list(dict.fromkeys(columns))
+
+
+class SparseFieldsMixin:
+    """
+    Viewset mixin wiring ``?fields=`` / ``?expand=`` into the serializer
+    and the queryset projection.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    # Actions rendered with the serializer's compact field set by default
+    compact_actions = ('list', 'search')
+
+    def get_field_names(self):
+        """Names of the fields to render, or None for all of them"""
+        if hasattr(self, '_field_names'):
+            return self._field_names
+        names = None
+        request = getattr(self, 'request', None)
+        if request is not None and not getattr(self, 'swagger_fake_view', False):
+            serializer_class = self.get_serializer_class()
+            available = list(serializer_class().fields)
+            params = request.query_params
+            if self.fields_query_param in params:
+                names = self._validate(self.fields_query_param, params[self.fields_query_param], available)
+            elif self.action in self.compact_actions:
+                names = list(getattr(serializer_class.Meta, 'compact_fields', available))
+            if self.expand_query_param in params:
+                expand = self._validate(self.expand_query_param, params[self.expand_query_param], available)
+                if names is not None:
+                    names += [name for name in expand if name not in names]
+            if names is not None:
+                # The primary key is always included
+                pk = serializer_class.Meta.model._meta.pk.name
+                names = [pk] + [name for name in names if name != pk]
+        self._field_names = names
+        return names
+
+    @staticmethod
+    def _validate(param, value, available):
+        names = _split(value)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: [f'Unknown field(s): {", ".join(unknown)}']})
+        return names
+
+    def sparse_columns(self, required=()):
+        """
+        Model lookups to pass to ``only()`` for the selected fields, plus
+        ``required`` (e.g. ordering keys), or None to load every column.
+        """
+        names = self.get_field_names()
+        if names is None:
+            return None
+        columns = self.get_serializer_class()(fields=names).get_columns()
+        return list(dict.fromkeys([*columns, *(field.lstrip('-') for field in required)]))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_field_names())
+        return super().get_serializer(*args, **kwargs)
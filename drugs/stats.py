@@ -0,0 +1,131 @@
+"""
+Application statistics shared by the home page and ``/api/stats/``.
+
+Totals are kept in ``StatCounter`` rows that the signal handlers in
+``drugs.signals`` adjust on every save/delete, so building a snapshot is a
+single read of a handful of rows. The snapshot itself is cached for
+``settings.STATS_CACHE_TTL`` seconds under a key carrying the
+``DataVersion``, which the same writes bump, so every worker (each with its
+own local cache) stops serving it once they commit. ``aget_stats()`` is the
+async ORM counterpart used by ``drugs.async_views``. Bulk writes that
+bypass signals must call ``rebuild_counters()`` (or run
+``manage.py rebuild_stats``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import metrics
+from .models import DataVersion, Drug, DrugInteraction, StatCounter
+
+CACHE_KEY = 'drugs:stats'
+
+DRUGS = 'drugs'
+INTERACTIONS = 'interactions'
+
+
+def severity_key(severity):
+    return f'{INTERACTIONS}:{severity}'
+
+
+def cache_key(version):
+    return f'{CACHE_KEY}:{version}'
+
+
+def get_stats():
+    """
+    Return ``{'total_drugs', 'total_interactions', 'severity_breakdown',
+    'last_updated'}`` where ``severity_breakdown`` maps severity -> count.
+    """
+    key = cache_key(DataVersion.current())
+    stats = cache.get(key)
+    metrics.record_cache('stats', stats is not None)
+    if stats is None:
+        stats = _read_counters()
+        cache.set(key, stats, settings.STATS_CACHE_TTL)
+    return stats
+
+
+async def aget_stats():
+    """Async counterpart of ``get_stats()``"""
+    key = cache_key(await DataVersion.acurrent())
+    stats = await cache.aget(key)
+    metrics.record_cache('stats', stats is not None)
+    if stats is None:
+        stats = _snapshot([counter async for counter in StatCounter.objects.all()])
+        await cache.aset(key, stats, settings.STATS_CACHE_TTL)
+    return stats
+
+
+def _read_counters():
+    return _snapshot(list(StatCounter.objects.all()))
+
+
+def _snapshot(counters):
+    values = {counter.key: counter.value for counter in counters}
+    breakdown = {}
+    for severity, label in DrugInteraction.SEVERITY_CHOICES:
+        count = values.get(severity_key(severity), 0)
+        if count:
+            breakdown[severity] = count
+    return {
+        'total_drugs': values.get(DRUGS, 0),
+        'total_interactions': values.get(INTERACTIONS, 0),
+        'severity_breakdown': breakdown,
+        'last_updated': max((counter.updated_at for counter in counters), default=None),
+    }
+
+
+def invalidate():
+    """Drop this worker's snapshot; run after commit, never inside the write"""
+    cache.delete(cache_key(DataVersion.current()))
+
+
+def record_drug_change(delta=0):
+    StatCounter.add(DRUGS, delta)
+    transaction.on_commit(invalidate)
+
+
+def record_interaction_change(delta=0, severity=None, previous_severity=None):
+    """
+    Adjust interaction counters. ``delta`` is +1 for a new row and -1 for a
+    deleted one; a severity edit moves one row between severity counters.
+    """
+    StatCounter.add(INTERACTIONS, delta)
+    if previous_severity and previous_severity != severity:
+        StatCounter.add(severity_key(previous_severity), -1)
+        StatCounter.add(severity_key(severity), 1)
+    elif severity and delta:
+        StatCounter.add(severity_key(severity), delta)
+    transaction.on_commit(invalidate)
+
+
+def rebuild_counters():
+    """Recompute every counter from the source tables"""
+    now = timezone.now()
+    drugs = Drug.objects.aggregate(total=Count('id'), last=Max('sys_updated_on'))
+    interactions = DrugInteraction.objects.aggregate(total=Count('id'), last=Max('updated_at'))
+    by_severity = dict(
+        DrugInteraction.objects.order_by().values_list('severity').annotate(count=Count('id'))
+    )
+
+    rows = [
+        StatCounter(key=DRUGS, value=drugs['total'], updated_at=drugs['last'] or now),
+        StatCounter(key=INTERACTIONS, value=interactions['total'], updated_at=interactions['last'] or now),
+    ]
+    for severity, label in DrugInteraction.SEVERITY_CHOICES:
+        rows.append(StatCounter(
+            key=severity_key(severity),
+            value=by_severity.get(severity, 0),
+            updated_at=interactions['last'] or now,
+        ))
+
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(rows)
+        # Moves every worker's snapshot key
+        DataVersion.bump()
+    invalidate()
+    return _read_counters()
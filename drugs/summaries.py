@@ -0,0 +1,105 @@
+"""
+Per-drug interaction summaries stored on ``Drug``.
+
+Each drug carries its interaction count per severity, the total, a
+``risk_level`` (the rank of its worst severity, 0 without interactions)
+and the time its interactions last changed, so pages and API listings can
+show, sort and filter by interaction risk without aggregating
+``DrugInteraction``. The signal handlers in ``drugs.signals`` call
+``record_interaction_change()`` inside the interaction's write
+transaction; the counters are adjusted with ``F()`` expressions, so
+concurrent writers never overwrite each other. Bulk writes that bypass
+signals must call ``rebuild()`` (or run
+``manage.py rebuild_interaction_summaries``).
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Drug, DrugInteraction
+
+
+def count_field(severity):
+    return f'{severity}_count'
+
+
+def record_interaction_change(severity, drug_ids, previous_severity=None, previous_drug_ids=()):
+    """
+    Move one interaction from ``previous_drug_ids``/``previous_severity``
+    (empty for a new row) to ``drug_ids``/``severity`` (empty for a
+    deleted one) and touch both sets of drugs.
+    """
+    deltas = defaultdict(Counter)
+    for drug_id in previous_drug_ids:
+        deltas[drug_id][previous_severity] -= 1
+    for drug_id in drug_ids:
+        deltas[drug_id][severity] += 1
+    # One UPDATE per distinct change, usually one for both drugs
+    groups = defaultdict(list)
+    for drug_id, delta in deltas.items():
+        groups[tuple(sorted((key, value) for key, value in delta.items() if value))].append(drug_id)
+    now = timezone.now()
+    with transaction.atomic():
+        for delta, group in groups.items():
+            Drug.objects.filter(id__in=group).update(**_changes(dict(delta)), interactions_updated_at=now)
+
+
+def _changes(delta):
+    """``update()`` arguments applying ``{severity: delta}`` to the counters"""
+    changes = {count_field(severity): F(count_field(severity)) + value for severity, value in delta.items()}
+    if not changes:
+        return changes
+    changes['interaction_count'] = F('interaction_count') + sum(delta.values())
+    # An UPDATE reads the old counts: count + delta > 0 <=> count > -delta
+    changes['risk_level'] = _risk_level(delta)
+    return changes
+
+
+def _risk_level(delta):
+    """Level of the most severe counter above zero after adding ``delta``"""
+    levels = sorted(DrugInteraction.RISK_LEVELS.items(), key=lambda item: -item[1])
+    return Case(
+        *[
+            When(**{f'{count_field(severity)}__gt': -delta.get(severity, 0)}, then=Value(level))
+            for severity, level in levels
+        ],
+        default=Value(0),
+    )
+
+
+def _side(column, severity=None, aggregate=None):
+    """Correlated subquery aggregating the interactions with the drug as ``column``"""
+    interactions = DrugInteraction.objects.order_by().filter(**{column: OuterRef('pk')})
+    if aggregate is None:
+        # A conditional count rather than a severity filter, which could send
+        # the planner to the severity index instead of the pair indexes
+        aggregate = Count('id', filter=Q(severity=severity) if severity else None)
+    return Subquery(interactions.values(column).annotate(value=aggregate).values('value'))
+
+
+def _total(severity=None):
+    return (
+        Coalesce(_side('drug1', severity), 0, output_field=IntegerField())
+        + Coalesce(_side('drug2', severity), 0, output_field=IntegerField())
+    )
+
+
+def rebuild():
+    """
+    Recompute every drug's summary from the interaction table; returns
+    the number of drugs with interactions
+    """
+    first, second = (_side(column, aggregate=Max('updated_at')) for column in ('drug1', 'drug2'))
+    changes = {count_field(severity): _total(severity) for severity in DrugInteraction.RISK_LEVELS}
+    with transaction.atomic():
+        Drug.objects.update(
+            interaction_count=_total(),
+            # Greatest() is NULL on SQLite when either side is
+            interactions_updated_at=Greatest(Coalesce(first, second), Coalesce(second, first)),
+            **changes,
+        )
+        Drug.objects.update(risk_level=_risk_level({}))
+    return Drug.objects.filter(interaction_count__gt=0).count()
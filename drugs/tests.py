@@ -0,0 +1,474 @@
+import importlib
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import connection, reset_queries, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import api_urls, async_views, autocomplete, fuzzy, graph, importer, search, searchcache, stats, views
+from .models import DataVersion, Drug, DrugInteraction, StatCounter
+
+
+class QueryCountTests(TestCase):
+    """
+    Every drug/interaction endpoint issues the same number of SQL queries
+    regardless of how many rows it renders (N+1 regression check).
+    """
+    SIZES = (3, 60)
+    HUB_ID = 'QC-HUB'
+    QUERY = 'querycheck'
+    TYPO = 'querychek'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('querycheck', 'querycheck@example.com', 'querycheck')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def endpoints(self):
+        interaction_id = DrugInteraction.objects.filter(
+            Q(drug1_id=self.HUB_ID) | Q(drug2_id=self.HUB_ID)
+        ).values_list('id', flat=True).first()
+        drug_ids = [self.HUB_ID] + list(
+            Drug.objects.filter(id__startswith='QC-').exclude(id=self.HUB_ID).values_list('id', flat=True)[:19]
+        )
+        return [
+            ('home', 'get', '/', None),
+            ('search', 'get', f'/search/?q={self.QUERY}', None),
+            ('search_fuzzy', 'get', f'/search/?q={self.TYPO}', None),
+            ('drug_detail', 'get', f'/drug/{self.HUB_ID}/', None),
+            ('interaction_detail', 'get', f'/interaction/{interaction_id}/', None),
+            ('api_drugs', 'get', '/api/drugs/', None),
+            ('api_drugs_search', 'get', f'/api/drugs/?q={self.QUERY}', None),
+            ('api_drugs_fuzzy', 'get', f'/api/drugs/?q={self.TYPO}', None),
+            ('api_drugs_risk', 'get', '/api/drugs/?ordering=risk&min_severity=minor', None),
+            ('api_drugs_autocomplete', 'get', f'/api/drugs/autocomplete/?prefix={self.QUERY}', None),
+            ('api_interactions', 'get', '/api/interactions/', None),
+            ('api_interactions_q', 'get', f'/api/interactions/?q={self.QUERY}', None),
+            ('api_interactions_fuzzy', 'get', f'/api/interactions/?q={self.TYPO}', None),
+            ('api_interactions_drug', 'get', f'/api/interactions/?drug={self.HUB_ID}', None),
+            ('api_interactions_search', 'get', f'/api/interactions/search/?query={self.QUERY}', None),
+            ('api_interaction_detail', 'get', f'/api/interactions/{interaction_id}/', None),
+            ('api_interactions_check', 'post', '/api/interactions/check/', {'drugs': drug_ids}),
+            ('api_stats', 'get', '/api/stats/', None),
+            ('admin_drugs', 'get', '/admin/drugs/drug/', None),
+            ('admin_interactions', 'get', '/admin/drugs/druginteraction/', None),
+        ]
+
+    def create_data(self, size):
+        hub = Drug.objects.create(id=self.HUB_ID, ten_thuoc=f'{self.QUERY} hub', hoat_chat=self.QUERY)
+        for index in range(size):
+            drug = Drug.objects.create(
+                id=f'QC-{index:05d}',
+                ten_thuoc=f'{self.QUERY} {index}',
+                hoat_chat=f'{self.QUERY} hoạt chất {index}',
+            )
+            DrugInteraction.objects.create(
+                drug1=hub,
+                drug2=drug,
+                mechanism=f'{self.QUERY} cơ chế',
+                consequence=f'{self.QUERY} hậu quả',
+                management='Theo dõi',
+                severity=DrugInteraction.SEVERITY_CHOICES[index % len(DrugInteraction.SEVERITY_CHOICES)][0],
+            )
+
+    def clear_caches(self):
+        graph.clear()
+        autocomplete.clear()
+        fuzzy.clear()
+        caches[searchcache.CACHE_ALIAS].clear()
+        cache.clear()
+
+    def measure(self, size):
+        """Query count per endpoint with ``size`` interactions, rolled back afterwards"""
+        counts = {}
+        with transaction.atomic():
+            self.create_data(size)
+            for name, method, url, data in self.endpoints():
+                request = getattr(self.client, method)
+                kwargs = {'content_type': 'application/json'} if data is not None else {}
+                # Warm per-worker caches first so only steady-state queries are counted
+                request(url, data, **kwargs)
+                # Each request empties the query log the capture slices
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    response = request(url, data, **kwargs)
+                counts[name] = len(queries)
+                self.assertEqual(response.status_code, 200, f'{method.upper()} {url}')
+            transaction.set_rollback(True)
+        self.clear_caches()
+        return counts
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        self.clear_caches()
+        small, large = (self.measure(size) for size in self.SIZES)
+        for name, count in small.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(large[name], count, f'{name} query count grows with row count')
+
+
+class WorkerCacheTests(TestCase):
+    """Interaction edits leave the drug name indexes alone"""
+
+    def setUp(self):
+        autocomplete.clear()
+        fuzzy.clear()
+        graph.clear()
+        self.first = Drug.objects.create(id='WC-1', ten_thuoc='Workercache một')
+        self.second = Drug.objects.create(id='WC-2', ten_thuoc='Workercache hai')
+
+    def test_interaction_edit_keeps_drug_indexes(self):
+        prefix, trigram, adjacency = autocomplete.get_index(), fuzzy.get_index(), graph.get_graph()
+        DrugInteraction.objects.create(drug1=self.first, drug2=self.second, severity='minor')
+        self.assertIs(autocomplete.get_index(), prefix)
+        self.assertIs(fuzzy.get_index(), trigram)
+        self.assertIsNot(graph.get_graph(), adjacency)
+
+    def test_drug_edit_rebuilds_drug_indexes(self):
+        prefix, trigram = autocomplete.get_index(), fuzzy.get_index()
+        self.first.ten_thuoc = 'Workercache ba'
+        self.first.save()
+        self.assertIsNot(autocomplete.get_index(), prefix)
+        self.assertIsNot(fuzzy.get_index(), trigram)
+
+
+class ImportUpdateTests(TestCase):
+    """A re-import only overwrites the columns its records carry"""
+
+    def test_missing_columns_keep_existing_values(self):
+        importer.write_drugs([importer.build_drug({
+            'id': 'IM-1', 'ten_thuoc': 'Importthuoc', 'hoat_chat': 'Hoạt chất',
+            'nuoc_dk': 'Việt Nam', 'sys_created_on': '2020-01-02T03:04:05Z',
+        })])
+        before = Drug.objects.get(id='IM-1')
+        importer.write_drugs([importer.build_drug({'id': 'IM-1', 'ten_thuoc': 'Importthuoc mới', 'sys_updated_on': ''})])
+        after = Drug.objects.get(id='IM-1')
+        self.assertEqual(after.ten_thuoc_norm, 'importthuoc moi')
+        self.assertEqual((after.hoat_chat, after.nuoc_dk), ('Hoạt chất', 'Việt Nam'))
+        self.assertEqual(after.sys_created_on, before.sys_created_on)
+        self.assertEqual(after.sys_updated_on, before.sys_updated_on)
+
+    def test_missing_interaction_columns_keep_existing_values(self):
+        for drug_id in ('IM-2', 'IM-3'):
+            Drug.objects.create(id=drug_id, ten_thuoc=drug_id)
+        known = {'IM-2', 'IM-3'}
+        importer.write_interactions([importer.build_interaction({
+            'drug1_id': 'IM-2', 'drug2_id': 'IM-3', 'severity': 'major', 'mechanism': 'Cơ chế',
+        }, known)])
+        importer.write_interactions([importer.build_interaction({
+            'drug1_id': 'IM-3', 'drug2_id': 'IM-2', 'management': 'Theo dõi',
+        }, known)])
+        interaction = DrugInteraction.objects.get()
+        self.assertEqual(
+            (interaction.severity, interaction.mechanism, interaction.management),
+            ('major', 'Cơ chế', 'Theo dõi'),
+        )
+
+
+class SearchCacheTests(TestCase):
+    """Cached search pages are only served for the query that produced them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        first = Drug.objects.create(id='SC-1', ten_thuoc='Cachethuoc một')
+        second = Drug.objects.create(id='SC-2', ten_thuoc='Cachethuoc hai')
+        DrugInteraction.objects.create(drug1=first, drug2=second, severity='major', consequence='Gây đau đầu')
+
+    def setUp(self):
+        caches[searchcache.CACHE_ALIAS].clear()
+
+    def found(self, url):
+        return len(self.client.get(url).context['interactions'])
+
+    def test_query_without_d_stroke_does_not_answer_for_it(self):
+        self.assertEqual(self.found('/search/?q=đau'), 1)
+        caches[searchcache.CACHE_ALIAS].clear()
+        self.found('/search/?q=dau')
+        self.assertEqual(self.found('/search/?q=đau'), 1)
+
+    def test_unknown_severity_is_not_cached(self):
+        self.assertEqual(self.found('/search/?q=cachethuoc&severity=MAJOR'), 0)
+        self.assertEqual(self.found('/search/?q=cachethuoc&severity=major'), 1)
+        self.assertIsNone(searchcache.make_key('web', q='cachethuoc', severity='MAJOR'))
+
+    def test_whitespace_shares_an_entry(self):
+        self.assertEqual(
+            searchcache.make_key('web', q=' cachethuoc  hai '),
+            searchcache.make_key('web', q='cachethuoc hai'),
+        )
+
+
+class DrugSearchTests(TestCase):
+    """Accent-free word prefix search over drug names, ingredients and groups"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Drug.objects.create(id='DS-1', ten_thuoc='Đông máu Plus', hoat_chat='Paracetamol; Cafein', nhom_thuoc='Thuốc giảm đau')
+        Drug.objects.create(id='DS-2', ten_thuoc='Cafein Đơn', hoat_chat='Cafein')
+
+    def found(self, query):
+        return list(search.search_drugs(Drug.objects.all(), query).values_list('id', flat=True))
+
+    def test_accent_free_words_match(self):
+        self.assertEqual(self.found('dong mau'), ['DS-1'])
+        self.assertEqual(self.found('THUOC giam'), ['DS-1'])
+
+    def test_later_words_match_and_field_prefixes_rank_first(self):
+        self.assertEqual(self.found('cafe'), ['DS-2', 'DS-1'])
+
+    def test_edits_replace_the_words(self):
+        drug = Drug.objects.get(id='DS-2')
+        drug.ten_thuoc = 'Caffeine Đơn'
+        drug.hoat_chat = 'Caffeine'
+        drug.save()
+        self.assertEqual(self.found('cafein'), ['DS-1'])
+        self.assertEqual(self.found('caffeine'), ['DS-2'])
+
+
+class InteractionSearchTests(TestCase):
+    """FTS search ranks drug name matches first and composes with filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        warfarin = Drug.objects.create(id='FS-1', ten_thuoc='Warfarin')
+        aspirin = Drug.objects.create(id='FS-2', ten_thuoc='Aspirin')
+        other = Drug.objects.create(id='FS-3', ten_thuoc='Omeprazol')
+        cls.by_name = DrugInteraction.objects.create(drug1=warfarin, drug2=aspirin, severity='major', consequence='Chảy máu')
+        cls.by_text = DrugInteraction.objects.create(
+            drug1=aspirin, drug2=other, severity='minor', consequence='Giảm tác dụng của warfarin'
+        )
+
+    def found(self, queryset):
+        return list(queryset.values_list('id', flat=True))
+
+    def test_name_matches_rank_first(self):
+        results = search.search_interactions(DrugInteraction.objects.all(), 'warfarin')
+        self.assertEqual(self.found(results), [self.by_name.id, self.by_text.id])
+
+    def test_searches_and_filters_compose(self):
+        results = search.search_interactions(DrugInteraction.objects.all(), 'aspirin')
+        results = search.search_interactions(results, 'warfarin')
+        self.assertEqual(self.found(results), [self.by_name.id, self.by_text.id])
+        self.assertEqual(self.found(results.filter(severity='minor')), [self.by_text.id])
+        self.assertEqual(self.found(search.search_interactions(results, 'chảy')), [self.by_name.id])
+
+    def test_search_action_reads_query_only(self):
+        response = self.client.get('/api/interactions/search/?query=warfarin&q=chảy')
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.by_name.id, self.by_text.id])
+        self.assertEqual(self.client.get('/api/interactions/search/?q=warfarin').status_code, 400)
+
+
+class ExportSinceTests(TestCase):
+    """Incremental exports see every write and report deletions"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('exporter', 'exporter@example.com', 'exporter')
+        Drug.objects.create(id='EX-1', ten_thuoc='Exportthuoc một')
+        Drug.objects.create(id='EX-2', ten_thuoc='Exportthuoc hai')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, since, deleted=False):
+        params = {'since': since.isoformat()}
+        if deleted:
+            params['deleted'] = 'true'
+        response = self.client.get('/api/drugs/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line)['id'] for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_edits_and_deletions_after_since_are_exported(self):
+        since = timezone.now()
+        drug = Drug.objects.get(id='EX-1')
+        drug.ten_thuoc = 'Exportthuoc sửa'
+        drug.save()
+        Drug.objects.filter(id='EX-2').delete()
+        self.assertEqual(self.export(since), ['EX-1'])
+        self.assertEqual(self.export(since, deleted=True), ['EX-2'])
+        self.assertEqual(self.export(timezone.now()), [])
+
+
+class StatsCacheTests(TestCase):
+    """Cached statistics follow writes made by any worker, once committed"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_write_from_another_worker_is_seen(self):
+        before = stats.get_stats()['total_drugs']
+        # Another worker's write: its counters and version, not our cache
+        StatCounter.add(stats.DRUGS, 1)
+        DataVersion.bump()
+        self.assertEqual(stats.get_stats()['total_drugs'], before + 1)
+
+    def test_invalidation_waits_for_commit(self):
+        before = stats.get_stats()['total_drugs']
+        with self.captureOnCommitCallbacks() as callbacks:
+            Drug.objects.create(id='ST-1', ten_thuoc='Statsthuoc')
+        self.assertIn(stats.invalidate, callbacks)
+        self.assertEqual(stats.get_stats()['total_drugs'], before + 1)
+
+
+class StrictImportTests(TestCase):
+    """An aborted import still brings derived data up to date"""
+
+    def test_strict_abort_finalizes_written_batches(self):
+        lines = [
+            json.dumps({'id': 'SI-1', 'ten_thuoc': 'Strictthuoc'}),
+            json.dumps({'id': 'SI-2'}),
+        ]
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(handle, 'w', encoding='utf-8') as output:
+            output.write('\n'.join(lines) + '\n')
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(CommandError):
+            call_command('import_drugbank', drugs=path, strict=True, batch_size=1, stdout=io.StringIO())
+        self.assertEqual(list(search.search_drugs(Drug.objects.all(), 'strict').values_list('id', flat=True)), ['SI-1'])
+        self.assertEqual(stats.get_stats()['total_drugs'], Drug.objects.count())
+
+
+class CanonicalPairTests(TestCase):
+    """Pairs are stored in code point order, which the constraint checks"""
+
+    def test_mixed_case_ids_save_in_either_order(self):
+        lower = Drug.objects.create(id='cp-1', ten_thuoc='Cặp một')
+        upper = Drug.objects.create(id='CP-2', ten_thuoc='Cặp hai')
+        interaction = DrugInteraction(
+            drug1=lower, drug2=upper, severity='minor',
+            mechanism='Cơ chế', consequence='Hậu quả', management='Theo dõi',
+        )
+        interaction.full_clean()
+        interaction.save()
+        self.assertEqual((interaction.drug1_id, interaction.drug2_id), ('CP-2', 'cp-1'))
+
+
+class AsyncRoutingTests(TestCase):
+    """ASYNC_VIEWS swaps in async views without bypassing DRF"""
+
+    def routes(self):
+        with override_settings(ASYNC_VIEWS=True):
+            module = importlib.reload(api_urls)
+        self.addCleanup(importlib.reload, api_urls)
+        return module
+
+    def test_check_stays_on_the_drf_action(self):
+        match = resolve('/interactions/check/', self.routes())
+        self.assertEqual(match.func.cls, views.DrugInteractionViewSet)
+        self.assertEqual(match.func.actions, {'post': 'check'})
+
+    def test_stats_is_async(self):
+        self.assertIs(resolve('/stats/', self.routes()).func, async_views.api_stats)
+
+
+class AutocompleteTests(TestCase):
+    """Type-ahead over names, ingredients and their later words"""
+
+    def test_later_words_match_single_and_multi_word_prefixes(self):
+        index = autocomplete.PrefixIndex([
+            ('AC-1', 'Viên nang Amoxicillin 500', 'Amoxicillin', 'vien nang amoxicillin 500', 'amoxicillin'),
+            ('AC-2', 'Cafein', 'Paracetamol cafein 65 mg', 'cafein', 'paracetamol cafein 65 mg'),
+        ])
+        ids = lambda prefix: [row[0] for row in index.search(prefix)]
+        self.assertEqual(ids('nang amox'), ['AC-1'])
+        self.assertEqual(ids('nang b'), [])
+        self.assertEqual(ids('caf'), ['AC-2'])
+        self.assertEqual(ids('cafein 65 m'), ['AC-2'])
+        self.assertEqual(ids('mg'), ['AC-2'])
+
+
+class MetricsAccessTests(TestCase):
+    """/metrics only answers clients in METRICS_ALLOWED_IPS"""
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1', '10.0.0.0/8'])
+    def test_allowlist(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, 403)
+
+
+class PrescriptionCheckTests(TestCase):
+    """The check endpoint resolves ids and names and returns every pair"""
+
+    @classmethod
+    def setUpTestData(cls):
+        first = Drug.objects.create(id='PC-1', ten_thuoc='Warfarin')
+        second = Drug.objects.create(id='PC-2', ten_thuoc='Aspirin')
+        third = Drug.objects.create(id='PC-3', ten_thuoc='Omeprazol')
+        cls.pairs = [
+            DrugInteraction.objects.create(drug1=first, drug2=second, severity='major'),
+            DrugInteraction.objects.create(drug1=second, drug2=third, severity='minor'),
+        ]
+
+    def check(self, drugs):
+        return self.client.post('/api/interactions/check/', {'drugs': drugs}, content_type='application/json')
+
+    def test_ids_and_names(self):
+        body = self.check(['PC-1', 'aspirin', 'PC-3', 'Không có']).json()
+        self.assertEqual([drug['id'] for drug in body['drugs']], ['PC-1', 'PC-2', 'PC-3'])
+        self.assertEqual(body['unresolved'], ['Không có'])
+        self.assertEqual(sorted(row['id'] for row in body['interactions']), sorted(pair.id for pair in self.pairs))
+
+    def test_needs_two_drugs(self):
+        self.assertEqual(self.check(['PC-1']).status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    """API responses carry an ETag and answer 304 until the data changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Drug.objects.create(id='CG-1', ten_thuoc='Warfarin')
+
+    def test_not_modified_until_a_write(self):
+        etag = self.client.get('/api/drugs/')['ETag']
+        self.assertEqual(self.client.get('/api/drugs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Drug.objects.create(id='CG-2', ten_thuoc='Aspirin')
+        response = self.client.get('/api/drugs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= selects the serialized fields and the columns read"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Drug.objects.create(id='SF-1', ten_thuoc='Warfarin', hoat_chat='Warfarin natri')
+
+    def test_only_the_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get('/api/drugs/?fields=id,ten_thuoc').json()
+        self.assertEqual(body['results'], [{'id': 'SF-1', 'ten_thuoc': 'Warfarin'}])
+        self.assertFalse(any('hoat_chat' in query['sql'] for query in queries))
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages cover every row once, in order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(25):
+            Drug.objects.create(id=f'KP-{number:02}', ten_thuoc=f'Thuốc {number:02}')
+
+    def test_pages_cover_every_row(self):
+        seen = []
+        url = '/api/drugs/?pagination=cursor'
+        while url:
+            body = self.client.get(url).json()
+            seen += [row['id'] for row in body['results']]
+            url = body['next']
+        self.assertEqual(seen, [f'KP-{number:02}' for number in range(25)])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/drugs/?cursor=bad').status_code, 404)
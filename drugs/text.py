@@ -0,0 +1,29 @@
+"""
+Text normalization helpers for Vietnamese drug data.
+"""
+import re
+import unicodedata
+
+# Longest word kept by ``words()``, the width of DrugSearchToken.token
+MAX_WORD_LENGTH = 100
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_text(value):
+    """
+    Fold Vietnamese text for diacritic-insensitive matching.
+
+    "Thuốc kháng nấm" -> "thuoc khang nam", "Đông máu" -> "dong mau".
+    """
+    if not value:
+        return ''
+    value = value.replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', value)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.lower().split())
+
+
+def words(value):
+    """Distinct words of the normalized ``value``, cut to ``MAX_WORD_LENGTH``"""
+    return {word[:MAX_WORD_LENGTH] for word in _WORD_RE.findall(normalize_text(value))}
@@ -1,88 +1,132 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.db.models import Q, Count
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.vary import vary_on_headers
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from . import autocomplete, checker, export, graph, metrics, perf, search, searchcache, stats
 from .models import Drug, DrugInteraction
-from .serializers import DrugSerializer, DrugInteractionSerializer, DrugSearchSerializer
+from .conditional import data_condition, interaction_condition, stats_condition
+from .fastserializers import FastListMixin
+from .pagination import KeysetPaginationMixin
+from .sparse import SparseFieldsMixin
+from .serializers import (
+    DrugSerializer, DrugInteractionSerializer, DrugSearchSerializer, DrugAutocompleteSerializer,
+    InteractionCheckSerializer,
+)
 
 
+@stats_condition
 def home(request):
     """Home page with search functionality and dynamic statistics"""
-    # Get dynamic statistics from database
-    total_drugs = Drug.objects.count()
-    total_interactions = DrugInteraction.objects.count()
-    
-    # Get severity breakdown
-    severity_stats = DrugInteraction.objects.values('severity').annotate(
-        count=Count('severity')
-    ).order_by('severity')
-    
-    # Convert to dictionary for easy template access
-    severity_breakdown = {}
-    for stat in severity_stats:
-        severity_breakdown[stat['severity']] = stat['count']
+    # Cached statistics snapshot, shared with /api/stats/
+    snapshot = stats.get_stats()
     
     context = {
-        'total_drugs': total_drugs,
-        'total_interactions': total_interactions,
-        'severity_breakdown': severity_breakdown,
+        'total_drugs': snapshot['total_drugs'],
+        'total_interactions': snapshot['total_interactions'],
+        'severity_breakdown': snapshot['severity_breakdown'],
     }
     return render(request, 'drugs/home.html', context)
 
 
+# Web search shows the best matches only
+WEB_SEARCH_LIMIT = 50
+
+
+def web_search_queryset():
+    return DrugInteraction.objects.with_drugs(
+        fields=['severity', 'mechanism', 'consequence'],
+        drug_fields=['ten_thuoc', 'hoat_chat'],
+    )
+
+
+def web_search_context(results, query, severity):
+    return {
+        'interactions': results,
+        'query': query,
+        'severity': severity,
+        'severity_choices': DrugInteraction.SEVERITY_CHOICES,
+    }
+
+
+@data_condition
 def search_interactions(request):
     """Search for drug interactions"""
     query = request.GET.get('q', '')
     severity = request.GET.get('severity', '')
     
-    interactions = DrugInteraction.objects.all()
-    
-    if query:
-        # Search in drug names and active ingredients
-        interactions = interactions.filter(
-            Q(drug1__ten_thuoc__icontains=query) |
-            Q(drug2__ten_thuoc__icontains=query) |
-            Q(drug1__hoat_chat__icontains=query) |
-            Q(drug2__hoat_chat__icontains=query) |
-            Q(mechanism__icontains=query) |
-            Q(consequence__icontains=query)
-        )
-    
-    if severity:
-        interactions = interactions.filter(severity=severity)
+    interactions = web_search_queryset()
+    metrics.record_severity(severity, 'filter')
     
-    context = {
-        'interactions': interactions[:50],  # Limit to 50 results
-        'query': query,
-        'severity': severity,
-        'severity_choices': DrugInteraction.SEVERITY_CHOICES,
-    }
+    # Ids of the result are cached per query and severity
+    cache_key = searchcache.make_key('web', page_size=WEB_SEARCH_LIMIT, q=query, severity=severity)
+    cached = searchcache.get(cache_key) if cache_key else None
+    if cached is not None:
+        ids = cached[0]
+        rows = interactions.in_bulk(ids)
+        results = [rows[pk] for pk in ids if pk in rows]
+    else:
+        if query:
+            # Full-text search over drug names, active ingredients, mechanism
+            # and consequence, ranked by relevance; misspelled drug names fall
+            # back to trigram similarity
+            interactions = search.search_interactions(interactions, query, fuzzy=True)
+        
+        if severity:
+            interactions = interactions.filter(severity=severity)
+        
+        results = list(interactions[:WEB_SEARCH_LIMIT])
+        if cache_key:
+            searchcache.store(cache_key, [interaction.id for interaction in results], len(results))
     
-    return render(request, 'drugs/search.html', context)
+    return render(request, 'drugs/search.html', web_search_context(results, query, severity))
+
+
+# Interactions listed on a drug page; the totals come from its summary
+DRUG_DETAIL_LIMIT = 100
 
 
+@data_condition
 def drug_detail(request, drug_id):
-    """Show drug details and its interactions"""
+    """Show drug details, its interaction summary and most severe interactions"""
     drug = get_object_or_404(Drug, id=drug_id)
-    interactions = DrugInteraction.objects.filter(
-        Q(drug1=drug) | Q(drug2=drug)
+    # Most severe first, from the in-process graph, so only the shown rows are read
+    rank = DrugInteraction.SEVERITY_RANK
+    edges = sorted(
+        graph.get_graph().edges_for(drug.id),
+        key=lambda edge: (rank.get(edge.severity, len(rank)), -edge.id),
     )
+    interaction_ids = [edge.id for edge in edges[:DRUG_DETAIL_LIMIT]]
+    rows = DrugInteraction.objects.with_drugs(
+        fields=['severity', 'consequence'],
+    ).in_bulk(interaction_ids)
     
     context = {
         'drug': drug,
-        'interactions': interactions,
+        'interactions': [rows[pk] for pk in interaction_ids if pk in rows],
+        # (label, color, count) per severity, from the stored summary
+        'severity_summary': [
+            (DrugInteraction.SEVERITY_LABELS[severity], DrugInteraction.SEVERITY_COLORS[severity], count)
+            for severity, count in drug.severity_counts.items()
+        ],
     }
     
     return render(request, 'drugs/drug_detail.html', context)
 
 
+@interaction_condition
 def interaction_detail(request, interaction_id):
     """Show detailed interaction information"""
-    interaction = get_object_or_404(DrugInteraction, id=interaction_id)
+    interaction = get_object_or_404(
+        DrugInteraction.objects.select_related('drug1', 'drug2'), id=interaction_id
+    )
+    metrics.record_severity(interaction.severity, 'detail')
     
     context = {
         'interaction': interaction,
@@ -91,107 +135,322 @@ def interaction_detail(request, interaction_id):
     return render(request, 'drugs/interaction_detail.html', context)
 
 
+@stats_condition
 def api_stats(request):
     """API endpoint for getting application statistics"""
-    total_drugs = Drug.objects.count()
-    total_interactions = DrugInteraction.objects.count()
-    
-    # Get severity breakdown
-    severity_stats = DrugInteraction.objects.values('severity').annotate(
-        count=Count('severity')
-    ).order_by('severity')
+    return JsonResponse(stats_payload(stats.get_stats()))
+
+
+@swagger_auto_schema(method='get', auto_schema=None)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_perf(request):
+    """Per-route timing percentiles of this worker process (staff only)"""
+    return Response({
+        'enabled': perf.enabled(),
+        'buffer_size': perf.route_stats.size,
+        'routes': perf.route_stats.snapshot(),
+    })
+
+
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint (all worker processes, see drugs.metrics)"""
+    if not metrics.scrape_allowed(request):
+        return HttpResponseForbidden()
+    body, content_type = metrics.exposition()
+    return HttpResponse(body, content_type=content_type)
+
+
+def stats_payload(snapshot):
+    """JSON body of /api/stats/ for a statistics snapshot"""
+    severity_labels = DrugInteraction.SEVERITY_LABELS
     
     # Convert to list for JSON response
     severity_breakdown = []
-    for stat in severity_stats:
+    for severity, count in sorted(snapshot['severity_breakdown'].items()):
         severity_breakdown.append({
-            'severity': stat['severity'],
-            'count': stat['count'],
-            'label': dict(DrugInteraction.SEVERITY_CHOICES)[stat['severity']]
+            'severity': severity,
+            'count': count,
+            'label': severity_labels[severity]
         })
     
-    stats = {
-        'total_drugs': total_drugs,
-        'total_interactions': total_interactions,
+    return {
+        'total_drugs': snapshot['total_drugs'],
+        'total_interactions': snapshot['total_interactions'],
         'severity_breakdown': severity_breakdown,
-        'last_updated': DrugInteraction.objects.aggregate(
-            last_updated=Count('updated_at')
-        )['last_updated']
+        'last_updated': snapshot['last_updated'],
+    }
+
+
+def check_payload(drugs, unresolved, interactions):
+    """Response body of the prescription check (``interactions`` serialized)"""
+    return {
+        'drugs': [{'id': drug.id, 'ten_thuoc': drug.ten_thuoc} for drug in drugs],
+        'unresolved': unresolved,
+        'count': len(interactions),
+        'interactions': interactions,
     }
-    
-    return JsonResponse(stats)
 
 
-class DrugViewSet(viewsets.ReadOnlyModelViewSet):
+EXPORT_PARAMETERS = [
+    openapi.Parameter(
+        'output',
+        openapi.IN_QUERY,
+        description="Định dạng xuất (ndjson hoặc csv), mặc định ndjson",
+        type=openapi.TYPE_STRING,
+        required=False,
+        enum=list(export.FORMATS)
+    ),
+    openapi.Parameter(
+        'since',
+        openapi.IN_QUERY,
+        description="Chỉ xuất các bản ghi cập nhật từ thời điểm này (ISO 8601)",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+    openapi.Parameter(
+        'deleted',
+        openapi.IN_QUERY,
+        description="true: xuất id các bản ghi đã xóa (kèm thời điểm xóa) thay cho dữ liệu",
+        type=openapi.TYPE_BOOLEAN,
+        required=False
+    ),
+]
+
+
+def export_response(request, name, rows, model):
+    """
+    Stream ``rows(since)`` as NDJSON/CSV for an ``export`` action, or the
+    tombstones of deleted ``model`` rows with ``?deleted=true``
+    """
+    fmt = request.query_params.get('output', 'ndjson')
+    if fmt not in export.FORMATS:
+        return Response(
+            {'output': [f'Must be one of: {", ".join(export.FORMATS)}']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = export.parse_since(since)
+        except ValueError as exc:
+            return Response({'since': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+    if request.query_params.get('deleted') in ('1', 'true'):
+        columns, iterator = export.deletion_rows(model, since or None)
+        name = f'{name}-deleted'
+    else:
+        columns, iterator = rows(since or None)
+    return export.streaming_response(request, name, columns, iterator, fmt)
+
+
+SPARSE_PARAMETERS = [
+    openapi.Parameter(
+        'fields',
+        openapi.IN_QUERY,
+        description="Chỉ trả về các trường này (phân cách bằng dấu phẩy)",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+    openapi.Parameter(
+        'expand',
+        openapi.IN_QUERY,
+        description="Thêm các trường này vào bộ trường mặc định (phân cách bằng dấu phẩy)",
+        type=openapi.TYPE_STRING,
+        required=False
+    ),
+]
+
+
+DRUG_LIST_PARAMETERS = SPARSE_PARAMETERS + [
+    openapi.Parameter(
+        'ordering',
+        openapi.IN_QUERY,
+        description="risk: sắp xếp theo mức độ tương tác nặng nhất rồi số tương tác (giảm dần)",
+        type=openapi.TYPE_STRING,
+        required=False,
+        enum=['risk']
+    ),
+    openapi.Parameter(
+        'min_severity',
+        openapi.IN_QUERY,
+        description="Chỉ trả về thuốc có tương tác từ mức độ này trở lên",
+        type=openapi.TYPE_STRING,
+        required=False,
+        enum=list(DrugInteraction.RISK_LEVELS)
+    ),
+]
+
+
+# Conditional GET: API representations depend on Accept, hence the Vary header
+API_DATA_CONDITION = [vary_on_headers('Accept'), data_condition]
+
+
+@method_decorator(name='list', decorator=API_DATA_CONDITION)
+@method_decorator(name='retrieve', decorator=API_DATA_CONDITION)
+@method_decorator(name='list', decorator=swagger_auto_schema(manual_parameters=DRUG_LIST_PARAMETERS))
+@method_decorator(name='retrieve', decorator=swagger_auto_schema(manual_parameters=SPARSE_PARAMETERS))
+class DrugViewSet(FastListMixin, SparseFieldsMixin, KeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint cho danh sách thuốc
     
     list:
-        Trả về danh sách tất cả thuốc
+        Trả về danh sách tất cả thuốc dạng rút gọn (?fields= / ?expand= để chọn trường,
+        ?pagination=cursor để phân trang theo con trỏ, ?ordering=risk / ?min_severity=
+        để sắp xếp / lọc theo mức độ tương tác)
     retrieve:
-        Trả về thông tin chi tiết của một thuốc
+        Trả về thông tin chi tiết của một thuốc, kèm số tương tác theo mức độ
+    autocomplete:
+        Gợi ý thuốc theo phần đầu tên hoặc hoạt chất
+    export:
+        Xuất toàn bộ danh sách thuốc dạng luồng
     """
     queryset = Drug.objects.all()
     serializer_class = DrugSerializer
     lookup_field = 'id'
+    # ?ordering=risk: most severe worst interaction first, then the most
+    # interactions, over the (risk_level, interaction_count, id) index
+    RISK_ORDERING = ('-risk_level', '-interaction_count', '-id')
+    
+    @property
+    def keyset_ordering(self):
+        """?pagination=cursor: keyset pages over the index of the ordering"""
+        if self.risk_ordered():
+            return self.RISK_ORDERING
+        return ('ten_thuoc', 'id')
+    
+    def risk_ordered(self):
+        request = getattr(self, 'request', None)
+        return request is not None and request.query_params.get('ordering') == 'risk'
     
     def get_queryset(self):
-        """Filter drugs by search query"""
+        """Filter drugs by search query and interaction risk"""
         queryset = Drug.objects.all()
+        columns = self.sparse_columns(required=self.keyset_ordering)
+        if columns is not None:
+            queryset = queryset.only(*columns)
         query = self.request.query_params.get('q', None)
+        min_severity = self.request.query_params.get('min_severity', None)
+        if min_severity:
+            if min_severity not in DrugInteraction.RISK_LEVELS:
+                raise ValidationError({'min_severity': [f'Must be one of: {", ".join(DrugInteraction.RISK_LEVELS)}']})
+            queryset = queryset.filter(risk_level__gte=DrugInteraction.RISK_LEVELS[min_severity])
         if query:
-            queryset = queryset.filter(
-                Q(ten_thuoc__icontains=query) |
-                Q(hoat_chat__icontains=query) |
-                Q(nhom_thuoc__icontains=query)
-            )
+            queryset = search.search_drugs(queryset, query, fuzzy=True)
+        if self.risk_ordered():
+            queryset = queryset.order_by(*self.RISK_ORDERING)
         return queryset
+    
+    @swagger_auto_schema(
+        operation_description="Gợi ý thuốc theo phần đầu tên thuốc hoặc hoạt chất (không phân biệt dấu)",
+        query_serializer=DrugAutocompleteSerializer,
+        responses={
+            200: "Danh sách gợi ý (id, name, ingredient)",
+            400: "Bad Request"
+        }
+    )
+    @action(detail=False, methods=['get'], pagination_class=None)
+    @method_decorator(API_DATA_CONDITION)
+    def autocomplete(self, request):
+        """Type-ahead suggestions from the in-process prefix index"""
+        serializer = DrugAutocompleteSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = autocomplete.get_index().search(
+            serializer.validated_data['prefix'], serializer.validated_data['limit']
+        )
+        return Response([
+            {'id': drug_id, 'name': name, 'ingredient': ingredient}
+            for drug_id, name, ingredient in matches
+        ])
+
+    @swagger_auto_schema(
+        operation_description="Xuất toàn bộ danh sách thuốc dạng luồng (NDJSON/CSV, hỗ trợ gzip)",
+        manual_parameters=EXPORT_PARAMETERS
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every drug as NDJSON or CSV"""
+        return export_response(request, 'drugs', export.drug_rows, Drug)
 
 
-class DrugInteractionViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(name='list', decorator=API_DATA_CONDITION)
+@method_decorator(name='retrieve', decorator=[vary_on_headers('Accept'), interaction_condition])
+@method_decorator(name='list', decorator=swagger_auto_schema(manual_parameters=SPARSE_PARAMETERS))
+@method_decorator(name='retrieve', decorator=swagger_auto_schema(manual_parameters=SPARSE_PARAMETERS))
+class DrugInteractionViewSet(FastListMixin, SparseFieldsMixin, KeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint cho danh sách tương tác thuốc
     
     list:
-        Trả về danh sách tất cả tương tác thuốc
+        Trả về danh sách tất cả tương tác thuốc dạng rút gọn (?fields= / ?expand= để chọn trường,
+        ?pagination=cursor để phân trang theo con trỏ)
     retrieve:
         Trả về thông tin chi tiết của một tương tác
     search:
         Tìm kiếm tương tác theo từ khóa
+    check:
+        Kiểm tra tương tác giữa các thuốc trong một đơn thuốc
+    export:
+        Xuất toàn bộ tương tác thuốc dạng luồng
     """
     queryset = DrugInteraction.objects.all()
     serializer_class = DrugInteractionSerializer
+    # ?pagination=cursor: keyset pages over the (created_at, id) index
+    keyset_ordering = ('-created_at', '-id')
+    
+    def get_base_queryset(self):
+        """Interactions with the requested fields' columns, unfiltered"""
+        columns = self.sparse_columns(required=self.keyset_ordering)
+        if columns is None:
+            return DrugInteraction.objects.with_drugs()
+        # Split into interaction columns and drug1__/drug2__ columns
+        drug_fields = [column.split('__', 1)[1] for column in columns if '__' in column]
+        return DrugInteraction.objects.with_drugs(
+            fields=[column for column in columns if '__' not in column],
+            drug_fields=list(dict.fromkeys(drug_fields)) or ['ten_thuoc'],
+        )
     
     def get_queryset(self):
         """Filter interactions by search query and severity"""
-        queryset = DrugInteraction.objects.all()
-        query = self.request.query_params.get('q', None)
+        return self.filter_interactions(self.request.query_params.get('q', None))
+    
+    def filter_interactions(self, query):
+        """Interactions of ?drug= and ?severity= matching ``query``"""
+        queryset = self.get_base_queryset()
         severity = self.request.query_params.get('severity', None)
+        drug_id = self.request.query_params.get('drug', None)
+        
+        if drug_id:
+            # Interactions of one drug, looked up in the in-process graph
+            interaction_ids = [edge.id for edge in graph.get_graph().edges_for(drug_id)]
+            queryset = queryset.filter(id__in=interaction_ids)
         
         if query:
-            queryset = queryset.filter(
-                Q(drug1__ten_thuoc__icontains=query) |
-                Q(drug2__ten_thuoc__icontains=query) |
-                Q(drug1__hoat_chat__icontains=query) |
-                Q(drug2__hoat_chat__icontains=query) |
-                Q(mechanism__icontains=query) |
-                Q(consequence__icontains=query)
-            )
+            queryset = search.search_interactions(queryset, query, fuzzy=True)
         
         if severity:
+            metrics.record_severity(severity, 'filter')
             queryset = queryset.filter(severity=severity)
         
         return queryset
     
+    def get_object(self):
+        interaction = super().get_object()
+        # Unless ?fields= left it out (reading it would cost a query)
+        if 'severity' not in interaction.get_deferred_fields():
+            metrics.record_severity(interaction.severity, 'detail')
+        return interaction
+    
     @swagger_auto_schema(
         operation_description="Tìm kiếm tương tác thuốc theo từ khóa",
         manual_parameters=[
             openapi.Parameter(
-                'q',
+                'query',
                 openapi.IN_QUERY,
                 description="Từ khóa tìm kiếm (tên thuốc, hoạt chất, cơ chế, hậu quả)",
                 type=openapi.TYPE_STRING,
-                required=False
+                required=True
             ),
             openapi.Parameter(
                 'severity',
@@ -200,7 +459,8 @@ class DrugInteractionViewSet(viewsets.ReadOnlyModelViewSet):
                 type=openapi.TYPE_STRING,
                 required=False,
                 enum=['contraindicated', 'major', 'moderate', 'minor']
-            )
+            ),
+            *SPARSE_PARAMETERS
         ],
         responses={
             200: DrugInteractionSerializer(many=True),
@@ -208,34 +468,68 @@ class DrugInteractionViewSet(viewsets.ReadOnlyModelViewSet):
         }
     )
     @action(detail=False, methods=['get'])
+    @method_decorator(API_DATA_CONDITION)
     def search(self, request):
         """Search for drug interactions"""
         serializer = DrugSearchSerializer(data=request.query_params)
         if serializer.is_valid():
-            query = serializer.validated_data.get('q', '')
-            severity = serializer.validated_data.get('severity', '')
-            
-            queryset = self.get_queryset()
-            
-            if query:
-                queryset = queryset.filter(
-                    Q(drug1__ten_thuoc__icontains=query) |
-                    Q(drug2__ten_thuoc__icontains=query) |
-                    Q(drug1__hoat_chat__icontains=query) |
-                    Q(drug2__hoat_chat__icontains=query) |
-                    Q(mechanism__icontains=query) |
-                    Q(consequence__icontains=query)
-                )
+            query = serializer.validated_data.get('query', '')
             
-            if severity:
-                queryset = queryset.filter(severity=severity)
+            # Result pages are cached as id lists; a hit skips the search
+            cache_key = self.search_cache_key(query)
+            cached = searchcache.get(cache_key) if cache_key else None
+            if cached is not None:
+                queryset = searchcache.CachedResults(self.get_base_queryset(), *cached)
+                return self.list_response(queryset)
             
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                return self.get_paginated_response(serializer.data)
-            
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            # ?q= is not applied here: the action searches ``query`` only
+            queryset = self.filter_interactions(query)
+            return self.list_response(queryset, cache_key=cache_key)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST) 
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def search_cache_key(self, query):
+        """Result cache key for a page-number search request (None for cursors)"""
+        if self.use_keyset_pagination():
+            return None
+        params = self.request.query_params
+        return searchcache.make_key(
+            'api:interactions',
+            page=params.get(self.paginator.page_query_param, 1),
+            page_size=self.paginator.page_size,
+            query=query,
+            severity=params.get('severity'),
+            drug=params.get('drug'),
+        )
+
+    @swagger_auto_schema(
+        operation_description="Kiểm tra tất cả các cặp tương tác giữa các thuốc trong đơn, sắp xếp theo mức độ",
+        request_body=InteractionCheckSerializer,
+        responses={
+            200: DrugInteractionSerializer(many=True),
+            400: "Bad Request"
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def check(self, request):
+        """Check a prescription for interacting drug pairs"""
+        serializer = InteractionCheckSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        drugs, unresolved = checker.resolve_drugs(serializer.validated_data['drugs'])
+        interactions = checker.find_interactions(drug.id for drug in drugs)
+
+        return Response(check_payload(
+            drugs, unresolved, self.get_serializer(interactions, many=True).data
+        ))
+
+    @swagger_auto_schema(
+        operation_description="Xuất toàn bộ tương tác thuốc dạng luồng (NDJSON/CSV, hỗ trợ gzip)",
+        manual_parameters=EXPORT_PARAMETERS
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every interaction as NDJSON or CSV"""
+        return export_response(request, 'interactions', export.interaction_rows, DrugInteraction)
+
@@ -1,11 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'drugs'
 
+# Async home and search pages for ASGI deployments (ASYNC_VIEWS)
+pages = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('search/', views.search_interactions, name='search'),
+    path('', pages.home, name='home'),
+    path('search/', pages.search_interactions, name='search'),
     path('drug/<str:drug_id>/', views.drug_detail, name='drug_detail'),
     path('interaction/<int:interaction_id>/', views.interaction_detail, name='interaction_detail'),
 ] 
\ No newline at end of file
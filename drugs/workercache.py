@@ -0,0 +1,44 @@
+"""
+Per-worker structures rebuilt lazily when the data they derive from changes.
+
+A ``WorkerCache`` holds one object built from the database (the
+interaction graph, the drug prefix and trigram indexes) tagged with the
+``DataVersion`` it was built from. Every access reads that counter, a
+cheap primary-key lookup, and rebuilds the object once it has moved. The
+key selects which writes count: ``DataVersion.DATA`` moves on every drug
+or interaction change, ``DataVersion.DRUGS`` only on drug changes, so
+interaction edits leave the drug indexes alone.
+"""
+import threading
+
+from . import metrics
+from .models import DataVersion
+
+
+class WorkerCache:
+    def __init__(self, name, load, key=DataVersion.DATA):
+        # name: the metrics label; load(version) builds the object, which
+        # must keep the version in a ``version`` attribute
+        self.name = name
+        self.load = load
+        self.key = key
+        self._lock = threading.Lock()
+        self._value = None
+
+    def get(self):
+        """Return this worker's object, rebuilding it if the data changed"""
+        version = DataVersion.current(self.key)
+        value = self._value
+        if value is not None and value.version == version:
+            metrics.record_cache(self.name, True)
+            return value
+        metrics.record_cache(self.name, False)
+        with self._lock:
+            if self._value is None or self._value.version != version:
+                self._value = self.load(version)
+            return self._value
+
+    def clear(self):
+        """Drop the object (used after bulk writes in this process)"""
+        with self._lock:
+            self._value = None
@@ -0,0 +1,26 @@
+"""
+Gunicorn hooks, loaded automatically from the working directory.
+
+With PROMETHEUS_MULTIPROC_DIR set, metric files left by a previous server
+are removed at start so counters begin at zero, and the files of a worker
+that exits are marked dead so its gauges drop out (see drugs.metrics).
+"""
+import os
+import shutil
+
+# Not "from decouple import config": gunicorn reads "config" as a setting
+import decouple
+
+
+def on_starting(server):
+    directory = decouple.config('PROMETHEUS_MULTIPROC_DIR', default='')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    directory = decouple.config('PROMETHEUS_MULTIPROC_DIR', default='')
+    if directory:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid, directory)
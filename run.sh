@@ -25,11 +25,14 @@ echo "🔐 Setting proper permissions..."
 chmod 755 static staticfiles media
 chown -R 1000:1000 static staticfiles media 2>/dev/null || true
 
-# Create database file with proper permissions
-echo "💾 Creating database file..."
-touch db.sqlite3
-chmod 644 db.sqlite3
-chown 1000:1000 db.sqlite3 2>/dev/null || true
+# Database directory, mounted whole so SQLite's -wal/-shm files persist
+echo "💾 Creating database directory..."
+mkdir -p data
+if [ -f db.sqlite3 ] && [ ! -e data/db.sqlite3 ]; then
+    mv db.sqlite3 data/db.sqlite3
+fi
+chmod 755 data
+chown -R 1000:1000 data 2>/dev/null || true
 
 # Create static files structure
 echo "📁 Creating static files structure..."
@@ -62,7 +65,7 @@ if curl -f http://localhost:8001/ > /dev/null 2>&1; then
     echo "   Username: admin"
     echo "   Password: admin123456"
     echo ""
-    echo "💾 Database: SQLite (db.sqlite3 file)"
+    echo "💾 Database: SQLite (data/db.sqlite3 file)"
     echo ""
     echo "🛑 To stop the application: docker-compose down"
     echo "🔄 To restart: docker-compose up -d"
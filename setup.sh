@@ -18,7 +18,8 @@ echo "✅ Docker and Docker Compose are available"
 
 # Create necessary directories
 echo "📁 Creating necessary directories..."
-mkdir -p media staticfiles
+mkdir -p media staticfiles data
+chown 1000:1000 data 2>/dev/null || true
 
 # Set proper permissions
 echo "🔐 Setting proper permissions..."
@@ -50,15 +51,15 @@ if curl -f http://localhost:8001/ > /dev/null 2>&1; then
     echo "   Username: admin"
     echo "   Password: admin123456"
     echo ""
-    echo "💾 Database: SQLite (db.sqlite3 file)"
+    echo "💾 Database: SQLite (data/db.sqlite3 file)"
     echo "🛑 To stop the application: docker-compose down"
     echo "🔄 To restart: docker-compose up -d"
     echo "📋 To view logs: docker-compose logs -f"
     echo ""
     echo "💡 Tips:"
-    echo "   - Database file: ./db.sqlite3"
-    echo "   - Backup database: cp db.sqlite3 backup.sqlite3"
-    echo "   - Restore database: cp backup.sqlite3 db.sqlite3"
+    echo "   - Database file: ./data/db.sqlite3"
+    echo "   - Backup database: sqlite3 data/db.sqlite3 \".backup backup.sqlite3\""
+    echo "   - Restore database: docker-compose stop web && rm -f data/db.sqlite3-* && cp backup.sqlite3 data/db.sqlite3"
 else
     echo "❌ Application failed to start. Check the logs:"
     echo "   docker-compose logs -f"